@@ -0,0 +1,250 @@
+"""
+Cryorithm™ | Analysis | Signals
+"""
+
+# MIT License
+#
+# Copyright © 2024 Joshua M. Dotson (contact@jmdots.com)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import time
+
+import numpy as np
+import pandas as pd
+
+
+class Panel:
+    """
+    Dense time x ticker matrix of one field.
+
+    Attributes:
+        field (str): Name of the field.
+        values (np.ndarray): float64 array of shape (len(timestamps),
+            len(tickers)); NaN where a ticker has no snapshot.
+        timestamps (np.ndarray): Start of each time bin, in epoch seconds.
+        tickers (np.ndarray): Ticker symbols, one per column.
+    """
+
+    __slots__ = ("field", "values", "timestamps", "tickers")
+
+    def __init__(self, field, values, timestamps, tickers):
+        self.field = field
+        self.values = values
+        self.timestamps = timestamps
+        self.tickers = tickers
+
+
+def build_panel(columns, field, freq=60.0, ffill=True):
+    """
+    Pivots columnar snapshots into a time x ticker panel without Python loops.
+
+    Snapshots are assigned to `freq`-second time bins; when a ticker has
+    several snapshots in one bin, the latest wins. The panel has a row for
+    every bin from the first to the last one, including bins without any
+    snapshot, so rows are evenly spaced in time.
+
+    Args:
+        columns (dict): Column arrays as returned by `HistoryStore.query()`,
+            including 'ticker', 'timestamp' and `field`.
+        field (str): Field to pivot.
+        freq (float, optional): Bin width in seconds (default: 60.0).
+        ffill (bool, optional): Carry the last value forward over bins without
+            a snapshot (default: True).
+
+    Returns:
+        Panel: The pivoted field.
+    """
+    timestamps = np.asarray(columns["timestamp"], dtype="f8")
+    values = pd.to_numeric(pd.Series(columns[field]), errors="coerce").to_numpy("f8")
+    ticker_idx, tickers = pd.factorize(
+        pd.Series(columns["ticker"]).astype(str),
+        sort=True,
+    )
+    tickers = np.asarray(tickers)
+    bin_numbers = np.floor(timestamps / freq).astype(np.int64)
+    if len(bin_numbers):
+        bins = np.arange(bin_numbers.min(), bin_numbers.max() + 1)
+        bin_idx = bin_numbers - bins[0]
+    else:
+        bins = bin_idx = np.empty(0, dtype=np.int64)
+
+    # Keep only the latest snapshot per (bin, ticker) cell.
+    cells = pd.Series(bin_idx * len(tickers) + ticker_idx)
+    latest = timestamps.argsort(kind="stable")
+    latest = latest[~cells.iloc[latest].duplicated(keep="last").to_numpy()]
+
+    panel = np.full((len(bins), len(tickers)), np.nan)
+    panel[bin_idx[latest], ticker_idx[latest]] = values[latest]
+    if ffill:
+        panel = pd.DataFrame(panel).ffill().to_numpy()
+    return Panel(field, panel, bins * freq, tickers)
+
+
+def pct_change(values, periods=1):
+    """Percent change over `periods` rows, per column."""
+    result = np.full(values.shape, np.nan)
+    if len(values) > periods:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result[periods:] = values[periods:] / values[:-periods] - 1.0
+    result[~np.isfinite(result)] = np.nan
+    return result
+
+
+def rolling_zscore(values, window):
+    """Z-score of each value against its trailing `window` rows, per column."""
+    frame = pd.DataFrame(values)
+    rolling = frame.rolling(window, min_periods=window)
+    std = rolling.std().to_numpy()
+    std[std == 0] = np.nan
+    return (values - rolling.mean().to_numpy()) / std
+
+
+def cross_sectional_rank(values):
+    """Percentile rank of each ticker within its row, in (0, 1]."""
+    return pd.DataFrame(values).rank(axis=1, pct=True).to_numpy()
+
+
+def threshold_crossings(values, threshold):
+    """
+    Marks where a series crosses a symmetric threshold between two rows.
+
+    Returns:
+        np.ndarray: int8 array with +1 where a value rises through
+        `threshold`, -1 where it falls through `-threshold`, 0 elsewhere.
+    """
+    result = np.zeros(values.shape, dtype=np.int8)
+    previous, current = values[:-1], values[1:]
+    with np.errstate(invalid="ignore"):
+        result[1:][(previous < threshold) & (current >= threshold)] = 1
+        result[1:][(previous > -threshold) & (current <= -threshold)] = -1
+    return result
+
+
+class SignalEngine:
+    """
+    Computes cross-ticker signals from snapshot history in vectorized form.
+
+    For every configured field the snapshots of all tickers are pivoted into
+    one panel; rolling z-scores, percent changes and cross-sectional ranks are
+    then computed over the whole panel at once. A signal record is emitted
+    wherever the z-score crosses the threshold.
+
+    Attributes:
+        fields (list): Numeric fields to analyse.
+        window (int): Rolling window, in bins, for z-scores.
+        zscore_threshold (float): Absolute z-score that triggers a signal.
+        freq (float): Bin width in seconds.
+    """
+
+    def __init__(self, fields, window=20, zscore_threshold=2.0, freq=60.0):
+        self.fields = list(fields)
+        self.window = window
+        self.zscore_threshold = zscore_threshold
+        self.freq = freq
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Builds a signal engine from a ConfigManager configuration dict.
+        """
+        fields = config.get("signal_fields") or ["currentPrice"]
+        if isinstance(fields, str):
+            fields = [f.strip() for f in fields.split(",") if f.strip()]
+        return cls(
+            fields,
+            window=int(config.get("signal_window", 20)),
+            zscore_threshold=float(config.get("signal_zscore_threshold", 2.0)),
+            freq=float(config.get("signal_freq", 60.0)),
+        )
+
+    @property
+    def lookback(self):
+        """Seconds of history needed to score the latest bin."""
+        return (self.window + 1) * self.freq
+
+    def compute(self, columns, since=None):
+        """
+        Computes signal records for all tickers and bins in `columns`.
+
+        Args:
+            columns (dict): Column arrays as returned by `HistoryStore.query()`.
+            since (float, optional): Only emit signals for bins starting at or
+                after this epoch time (default: None, all bins).
+
+        Returns:
+            list: Compact signal records as dicts.
+        """
+        records = []
+        if not len(columns.get("timestamp", ())):
+            return records
+
+        for field in self.fields:
+            if field not in columns:
+                continue
+            panel = build_panel(columns, field, freq=self.freq)
+            zscores = rolling_zscore(panel.values, self.window)
+            crossings = threshold_crossings(zscores, self.zscore_threshold)
+            if since is not None:
+                crossings[panel.timestamps < since] = 0
+
+            rows, cols = np.nonzero(crossings)
+            if not len(rows):
+                continue
+            changes = pct_change(panel.values)[rows, cols]
+            ranks = cross_sectional_rank(panel.values)[rows, cols]
+            for row, col, change, rank in zip(rows, cols, changes, ranks):
+                records.append(
+                    {
+                        "type": "signal",
+                        "ticker": str(panel.tickers[col]),
+                        "timestamp": float(panel.timestamps[row]),
+                        "field": field,
+                        "signal": (
+                            "zscore_cross_up"
+                            if crossings[row, col] > 0
+                            else "zscore_cross_down"
+                        ),
+                        "value": float(panel.values[row, col]),
+                        "zscore": float(zscores[row, col]),
+                        "pct_change": float(change),
+                        "rank": float(rank),
+                    },
+                )
+        return records
+
+    def latest_signals(self, history, tickers=None, now=None):
+        """
+        Computes the signals of the most recent bin from a HistoryStore.
+
+        Args:
+            history (HistoryStore): Snapshot history.
+            tickers (list, optional): Tickers to analyse (default: all).
+            now (float, optional): Current epoch time (default: time.time()).
+
+        Returns:
+            list: Signal records for the bin containing `now`.
+        """
+        now = time.time() if now is None else now
+        columns = history.query(
+            tickers,
+            start=now - self.lookback,
+            fields=self.fields,
+        )
+        return self.compute(columns, since=np.floor(now / self.freq) * self.freq)
@@ -0,0 +1,486 @@
+"""
+Cryorithm™ | Bench | Fakes
+"""
+
+# MIT License
+#
+# Copyright © 2024 Joshua M. Dotson (contact@jmdots.com)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import asyncio
+import json
+import random
+import threading
+import time
+import zlib
+from types import SimpleNamespace
+
+import httpx
+from confluent_kafka import TopicPartition
+
+
+class FakeYahoo:
+    """
+    Blocking stand-in for `fetch_ticker_info` with configurable latency.
+
+    Each call returns `fields` numeric fields that random-walk between calls,
+    so a share of them changes every fetch, plus a few static text fields like
+    a real yfinance `info` dict.
+
+    Attributes:
+        latency (float): Seconds each fetch sleeps.
+        fields (int): Number of numeric fields per snapshot.
+        change_rate (float): Probability that a numeric field moves per fetch.
+        calls (int): Number of fetches served.
+    """
+
+    def __init__(self, latency=0.05, fields=150, change_rate=0.1, seed=0):
+        self.latency = latency
+        self.fields = fields
+        self.change_rate = change_rate
+        self.calls = 0
+        self._seed = seed
+        self._state = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, ticker):
+        time.sleep(self.latency)
+        with self._lock:
+            self.calls += 1
+            values = self._state.get(ticker)
+            if values is None:
+                rng = random.Random(zlib.crc32(ticker.encode()) ^ self._seed)
+                values = [rng.uniform(1, 1000) for _ in range(self.fields)]
+                self._state[ticker] = values
+            else:
+                for i in range(self.fields):
+                    if random.random() < self.change_rate:
+                        values[i] *= 1 + random.gauss(0, 0.01)
+
+            info = {f"field{i}": value for i, value in enumerate(values)}
+        info.update(
+            symbol=ticker,
+            shortName=f"{ticker} Inc.",
+            currency="USD",
+            exchange="NMS",
+            currentPrice=info.get("field0", 0.0),
+        )
+        return info
+
+
+class FakeProducer:
+    """
+    In-process stand-in for `confluent_kafka.Producer`.
+
+    Messages are acknowledged on the next `poll()`, after an optional
+    simulated broker round trip.
+
+    Attributes:
+        latency (float): Seconds each poll with pending messages sleeps.
+        delivered (int): Number of acknowledged messages.
+        delivered_bytes (int): Payload bytes of acknowledged messages.
+    """
+
+    def __init__(self, config, latency=0.0, broker=None):
+        self.config = config
+        self.latency = latency
+        self.broker = broker
+        self.delivered = 0
+        self.delivered_bytes = 0
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def produce(self, topic, value=None, key=None, headers=None, on_delivery=None):
+        if self.broker is not None:
+            self.broker.append(topic, value, key, headers)
+        with self._lock:
+            self._pending.append((value, on_delivery))
+
+    def poll(self, timeout=None):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            if timeout:
+                time.sleep(min(timeout, 0.01))
+            return 0
+        if self.latency:
+            time.sleep(self.latency)
+        for value, on_delivery in pending:
+            self.delivered += 1
+            self.delivered_bytes += len(value or b"")
+            if on_delivery is not None:
+                on_delivery(None, value)
+        return len(pending)
+
+    def flush(self, timeout=None):
+        while self._pending:
+            self.poll()
+        return 0
+
+
+class FakeMessage:
+    """Message returned by FakeConsumer, mirroring `confluent_kafka.Message`."""
+
+    __slots__ = ("_topic", "_partition", "_offset", "_key", "_value", "_headers")
+
+    def __init__(self, topic, partition, offset, key, value, headers):
+        self._topic = topic
+        self._partition = partition
+        self._offset = offset
+        self._key = key
+        self._value = value
+        self._headers = headers
+
+    def topic(self):
+        return self._topic
+
+    def partition(self):
+        return self._partition
+
+    def offset(self):
+        return self._offset
+
+    def key(self):
+        return self._key
+
+    def value(self):
+        return self._value
+
+    def headers(self):
+        return self._headers
+
+    def error(self):
+        return None
+
+
+class FakeBroker:
+    """
+    In-process stand-in for a single Kafka broker with consumer groups.
+
+    Topics are created on first use with `partitions` partitions. Consumer
+    groups use an eager round-robin assignment: every join or leave bumps the
+    group generation, and each member revokes and re-assigns on its next
+    `poll()`, like a real rebalance.
+
+    Attributes:
+        partitions (int): Partition count of auto-created topics.
+    """
+
+    def __init__(self, partitions=6):
+        self.partitions = partitions
+        self._logs = {}
+        self._groups = {}
+        self._committed = {}
+        self._lock = threading.RLock()
+
+    def _log(self, topic):
+        return self._logs.setdefault(
+            topic,
+            [[] for _ in range(self.partitions)],
+        )
+
+    def append(self, topic, value, key=None, headers=None, partition=None):
+        """Appends a message, partitioned by key like the default partitioner."""
+        with self._lock:
+            log = self._log(topic)
+            if partition is None:
+                if key is None:
+                    partition = random.randrange(len(log))
+                else:
+                    if isinstance(key, str):
+                        key = key.encode()
+                    partition = zlib.crc32(key) % len(log)
+            log[partition].append((key, value, headers))
+            return partition, len(log[partition]) - 1
+
+    def list_topics(self, topic=None, timeout=None):
+        with self._lock:
+            topics = {
+                name: SimpleNamespace(partitions=dict(enumerate(log)))
+                for name, log in self._logs.items()
+                if topic is None or name == topic
+            }
+            if topic is not None and topic not in topics:
+                topics[topic] = SimpleNamespace(
+                    partitions=dict(enumerate(self._log(topic))),
+                )
+        return SimpleNamespace(topics=topics)
+
+    def join(self, group, member):
+        with self._lock:
+            state = self._groups.setdefault(group, {"generation": 0, "members": []})
+            state["members"].append(member)
+            state["generation"] += 1
+
+    def leave(self, group, member):
+        with self._lock:
+            state = self._groups[group]
+            state["members"].remove(member)
+            state["generation"] += 1
+
+    def assignment(self, group, member, topics):
+        """Returns the group generation and the partitions of one member."""
+        with self._lock:
+            state = self._groups[group]
+            members = sorted(state["members"], key=lambda m: m.member_id)
+            partitions = [
+                (topic, partition)
+                for topic in sorted(topics)
+                for partition in range(len(self._log(topic)))
+            ]
+            index = members.index(member)
+            mine = [p for i, p in enumerate(partitions) if i % len(members) == index]
+            return state["generation"], mine
+
+    def fetch(self, topic, partition, offset, max_messages):
+        with self._lock:
+            log = self._log(topic)[partition]
+            entries = log[offset:][:max_messages]
+        return [
+            FakeMessage(topic, partition, offset + i, key, value, headers)
+            for i, (key, value, headers) in enumerate(entries)
+        ]
+
+    def commit(self, group, topic, partition, offset):
+        with self._lock:
+            self._committed[(group, topic, partition)] = offset
+
+    def committed(self, group, topic, partition):
+        with self._lock:
+            return self._committed.get((group, topic, partition), 0)
+
+
+class FakeConsumer:
+    """
+    In-process stand-in for `confluent_kafka.Consumer` backed by a FakeBroker.
+
+    Attributes:
+        member_id (str): Group member id, from 'client.id' when configured.
+    """
+
+    _next_id = 0
+
+    def __init__(self, config, broker):
+        FakeConsumer._next_id += 1
+        self.config = config
+        self.broker = broker
+        self.group = config["group.id"]
+        self.member_id = config.get("client.id") or f"member-{self._next_id}"
+        self._topics = []
+        self._callbacks = {}
+        self._generation = None
+        self._assignment = []
+        self._positions = {}
+
+    def subscribe(self, topics, on_assign=None, on_revoke=None, on_lost=None):
+        self._topics = list(topics)
+        self._callbacks = {"assign": on_assign, "revoke": on_revoke}
+        self.broker.join(self.group, self)
+
+    def list_topics(self, topic=None, timeout=None):
+        return self.broker.list_topics(topic, timeout)
+
+    def _rebalance(self):
+        generation, partitions = self.broker.assignment(
+            self.group,
+            self,
+            self._topics,
+        )
+        if generation == self._generation:
+            return
+        if self._assignment and self._callbacks.get("revoke"):
+            self._callbacks["revoke"](self, self._assignment)
+        self._generation = generation
+        self._assignment = [TopicPartition(t, p) for t, p in partitions]
+        self._positions = {
+            (t, p): self.broker.committed(self.group, t, p) for t, p in partitions
+        }
+        if self._callbacks.get("assign"):
+            self._callbacks["assign"](self, self._assignment)
+
+    def consume(self, num_messages=1, timeout=-1):
+        self._rebalance()
+        messages = []
+        for key, position in self._positions.items():
+            batch = self.broker.fetch(*key, position, num_messages - len(messages))
+            self._positions[key] = position + len(batch)
+            messages.extend(batch)
+            if len(messages) >= num_messages:
+                break
+        if not messages and timeout and timeout > 0:
+            time.sleep(min(timeout, 0.01))
+        return messages
+
+    def poll(self, timeout=None):
+        messages = self.consume(1, timeout)
+        return messages[0] if messages else None
+
+    def commit(self, message=None, offsets=None, asynchronous=True):
+        if message is not None:
+            offsets = [
+                TopicPartition(
+                    message.topic(),
+                    message.partition(),
+                    message.offset() + 1,
+                ),
+            ]
+        elif offsets is None:
+            offsets = [TopicPartition(t, p, o) for (t, p), o in self._positions.items()]
+        for tp in offsets:
+            self.broker.commit(self.group, tp.topic, tp.partition, tp.offset)
+        return offsets
+
+    def assignment(self):
+        return list(self._assignment)
+
+    def close(self):
+        if self._topics:
+            self.broker.leave(self.group, self)
+            self._topics = []
+
+
+def _sse_event(content):
+    chunk = {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion.chunk",
+        "created": 0,
+        "model": "bench",
+        "choices": [
+            {"index": 0, "delta": {"content": content}, "finish_reason": None},
+        ],
+    }
+    return f"data: {json.dumps(chunk)}\n\n".encode()
+
+
+def fake_openai_analyst_http_client(latency=0.0, chunk_chars=16, state=None):
+    """
+    Builds an httpx client whose transport plays an OpenAI streaming server
+    answering batched analysis prompts.
+
+    Every line of the last user message that is a JSON object with a
+    'ticker' gets one JSON line back with a signal and a summary. The answer
+    is streamed in `chunk_chars`-character chunks; a client that stops
+    reading early stops the stream.
+
+    Args:
+        latency (float, optional): Seconds between two chunks (default: 0.0).
+        chunk_chars (int, optional): Characters per content chunk
+            (default: 16).
+        state (dict, optional): Receives 'requests', 'prompt_chars' and
+            'streamed_chars' counters (default: None).
+
+    Returns:
+        httpx.AsyncClient: Client to pass to `OpenAIClientWrapper`.
+    """
+    state = state if state is not None else {}
+    for counter in ("requests", "prompt_chars", "streamed_chars"):
+        state.setdefault(counter, 0)
+
+    def answer(prompt):
+        lines = []
+        for line in prompt.splitlines():
+            try:
+                ticker = json.loads(line)["ticker"]
+            except (ValueError, KeyError, TypeError):
+                continue
+            signal = ("bullish", "bearish", "neutral")[zlib.crc32(ticker.encode()) % 3]
+            lines.append(
+                json.dumps(
+                    {
+                        "ticker": ticker,
+                        "signal": signal,
+                        "summary": f"{ticker} looks {signal}.",
+                    },
+                ),
+            )
+        return "\n".join(lines) + "\n"
+
+    async def handler(request):
+        messages = json.loads(request.content)["messages"]
+        prompt = messages[-1]["content"]
+        state["requests"] += 1
+        state["prompt_chars"] += sum(len(m["content"]) for m in messages)
+        text = answer(prompt)
+
+        async def stream():
+            for start in range(0, len(text), chunk_chars):
+                if latency:
+                    await asyncio.sleep(latency)
+                content = text[start:][:chunk_chars]
+                state["streamed_chars"] += len(content)
+                yield _sse_event(content)
+            yield b"data: [DONE]\n\n"
+
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/event-stream"},
+            content=stream(),
+        )
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def fake_openai_http_client(latency=0.2, chunks=20, concurrency=None):
+    """
+    Builds an httpx client whose transport plays an OpenAI streaming server.
+
+    Args:
+        latency (float, optional): Seconds before the first chunk
+            (default: 0.2).
+        chunks (int, optional): Number of content chunks per completion
+            (default: 20).
+        concurrency (dict, optional): Receives 'active' and 'peak' counters of
+            concurrent requests (default: None).
+
+    Returns:
+        httpx.AsyncClient: Client to pass to `OpenAIClientWrapper`.
+    """
+    state = concurrency if concurrency is not None else {}
+    state.setdefault("active", 0)
+    state.setdefault("peak", 0)
+
+    def event(content):
+        chunk = {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "bench",
+            "choices": [
+                {"index": 0, "delta": {"content": content}, "finish_reason": None},
+            ],
+        }
+        return f"data: {json.dumps(chunk)}\n\n"
+
+    body = "".join(event(f"token{i} ") for i in range(chunks)) + "data: [DONE]\n\n"
+
+    async def handler(request):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        try:
+            await asyncio.sleep(latency)
+        finally:
+            state["active"] -= 1
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/event-stream"},
+            content=body.encode(),
+        )
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
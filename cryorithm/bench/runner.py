@@ -0,0 +1,217 @@
+"""
+Cryorithm™ | Bench | Runner
+"""
+
+# MIT License
+#
+# Copyright © 2024 Joshua M. Dotson (contact@jmdots.com)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import platform
+import resource
+import sys
+import time
+from pathlib import Path
+
+from cryorithm.bench.fakes import FakeProducer, FakeYahoo, fake_openai_http_client
+from cryorithm.clients.kafka import KafkaDestination, KafkaProducerClient
+from cryorithm.clients.llm import LLMDestination
+from cryorithm.clients.openai import OpenAIClientWrapper
+from cryorithm.managers.job import JobManager
+from cryorithm.schemas.sensor_status import StatusCodec
+from cryorithm.sensors.stock.fundamentals import StockBatchSensor
+from cryorithm.transforms.diff import SnapshotDiffer
+
+# Headline metrics compared against a baseline, and whether lower is better.
+COMPARED_METRICS = {
+    "elapsed_s": True,
+    "tickers_per_sec": False,
+    "job_latency_p50_ms": True,
+    "job_latency_p99_ms": True,
+    "peak_rss_mb": True,
+}
+
+
+def percentile(values, q):
+    """Returns the q-th percentile (0-100) of values, by nearest rank."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb():
+    """Returns the peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere.
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+async def run_benchmark(
+    log_manager,
+    tickers=500,
+    rounds=5,
+    fetch_latency=0.05,
+    payload_fields=150,
+    fetch_concurrency=64,
+    snapshot_diff=False,
+    kafka=True,
+    kafka_latency=0.0,
+    message_format="json",
+    openai=False,
+    openai_latency=0.2,
+    openai_concurrency=8,
+):
+    """
+    Drives the sensor -> job -> destination path against in-process fakes.
+
+    Every round runs one `JobManager.job` over a StockBatchSensor of
+    `tickers` symbols, served by FakeYahoo. Records go to a KafkaDestination
+    on a FakeProducer and/or an LLMDestination on an OpenAIClientWrapper
+    talking to a fake streaming server.
+
+    Returns:
+        dict: Benchmark parameters and results.
+    """
+    params = {
+        "tickers": tickers,
+        "rounds": rounds,
+        "fetch_latency": fetch_latency,
+        "payload_fields": payload_fields,
+        "fetch_concurrency": fetch_concurrency,
+        "snapshot_diff": snapshot_diff,
+        "kafka": kafka,
+        "kafka_latency": kafka_latency,
+        "message_format": message_format,
+        "openai": openai,
+        "openai_latency": openai_latency,
+        "openai_concurrency": openai_concurrency,
+    }
+
+    yahoo = FakeYahoo(latency=fetch_latency, fields=payload_fields)
+    sensor = StockBatchSensor(
+        [f"T{i:05d}" for i in range(tickers)],
+        max_concurrency=fetch_concurrency,
+        fetcher=yahoo,
+    )
+
+    destinations = []
+    fake_producers = []
+    producer = None
+    if kafka:
+
+        def producer_factory(config):
+            fake_producers.append(FakeProducer(config, latency=kafka_latency))
+            return fake_producers[-1]
+
+        producer = KafkaProducerClient(
+            "bench.local:9092",
+            "cryorithm-bench",
+            producer_factory=producer_factory,
+        )
+        await producer.start()
+        destinations.append(KafkaDestination(producer, StatusCodec(message_format)))
+
+    llm_client = None
+    llm_destination = None
+    if openai:
+        llm_client = OpenAIClientWrapper(
+            api_key="bench",
+            base_url="http://bench.local/v1",
+            max_concurrency=openai_concurrency,
+            http_client=fake_openai_http_client(latency=openai_latency),
+        )
+        llm_destination = LLMDestination(llm_client, "bench")
+        destinations.append(llm_destination)
+
+    job_manager = JobManager(
+        [sensor],
+        log_manager,
+        differ=SnapshotDiffer() if snapshot_diff else None,
+        destinations=destinations,
+    )
+
+    latencies = []
+    started = time.perf_counter()
+    try:
+        for _ in range(rounds):
+            job_started = time.perf_counter()
+            await job_manager.job(sensor)
+            latencies.append(time.perf_counter() - job_started)
+        if producer is not None:
+            await producer.flush()
+    finally:
+        elapsed = time.perf_counter() - started
+        sensor.close()
+        if producer is not None:
+            await producer.close()
+        if llm_client is not None:
+            await llm_client.close()
+            await llm_client.http_client.aclose()
+
+    results = {
+        "elapsed_s": elapsed,
+        "tickers_per_sec": tickers * rounds / elapsed if elapsed else 0.0,
+        "job_latency_p50_ms": percentile(latencies, 50) * 1000,
+        "job_latency_p99_ms": percentile(latencies, 99) * 1000,
+        "peak_rss_mb": peak_rss_mb(),
+        "fetches": yahoo.calls,
+        "kafka_messages": sum(p.delivered for p in fake_producers),
+        "kafka_bytes": sum(p.delivered_bytes for p in fake_producers),
+        "llm_completions": llm_destination.completed if llm_destination else 0,
+    }
+    return {
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params,
+        "results": results,
+    }
+
+
+def save_report(report, path):
+    """Writes a benchmark report as JSON."""
+    path = Path(path).expanduser()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w") as f:
+        json.dump(report, f, indent=2)
+
+
+def compare_reports(report, baseline):
+    """
+    Compares a benchmark report with a baseline report.
+
+    Returns:
+        list: (metric, baseline value, current value, change) tuples, where a
+        positive change is an improvement.
+    """
+    rows = []
+    for metric, lower_is_better in COMPARED_METRICS.items():
+        value = report["results"].get(metric)
+        previous = baseline.get("results", {}).get(metric)
+        if value is None or not previous:
+            continue
+        change = (value - previous) / previous
+        if lower_is_better:
+            change = -change
+        rows.append((metric, previous, value, change))
+    return rows
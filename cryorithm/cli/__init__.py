@@ -0,0 +1,3 @@
+from cryorithm.cli.main import main
+
+__all__ = ["main"]
@@ -0,0 +1,132 @@
+"""
+Cryorithm™ | CLI | Imports
+"""
+
+# MIT License
+#
+# Copyright © 2024 Joshua M. Dotson (contact@jmdots.com)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import subprocess
+import sys
+
+
+class ImportTiming:
+    """
+    One line of a `python -X importtime` report.
+
+    Attributes:
+        module (str): Imported module name.
+        self_us (int): Microseconds spent in the module itself.
+        cumulative_us (int): Microseconds including its own imports.
+        depth (int): Nesting level; 0 for modules imported directly.
+    """
+
+    __slots__ = ("module", "self_us", "cumulative_us", "depth")
+
+    def __init__(self, module, self_us, cumulative_us, depth):
+        self.module = module
+        self.self_us = self_us
+        self.cumulative_us = cumulative_us
+        self.depth = depth
+
+    def __repr__(self):
+        return f"ImportTiming({self.module!r}, cumulative_us={self.cumulative_us})"
+
+
+def parse_importtime(text):
+    """
+    Parses the stderr output of `python -X importtime`.
+
+    Args:
+        text (str): Raw output; lines that are not timings are ignored.
+
+    Returns:
+        list: ImportTiming per imported module, in import completion order.
+    """
+    timings = []
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line.split(":", 1)[1].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # The header line.
+        name = fields[2].rstrip()
+        module = name.lstrip()
+        timings.append(
+            ImportTiming(
+                module,
+                int(fields[0]),
+                int(fields[1]),
+                (len(name) - len(module) - 1) // 2,
+            ),
+        )
+    return timings
+
+
+def measure_imports(modules, python=sys.executable):
+    """
+    Imports modules in a fresh interpreter and times every import.
+
+    A fresh process is needed because modules already imported by the
+    current one would be reported as free.
+
+    Args:
+        modules (list): Module names, imported in order.
+        python (str, optional): Interpreter to run (default: the current one).
+
+    Returns:
+        tuple: (timings, total_seconds), where timings is the parsed report
+            and total_seconds the cumulative time of the top-level imports.
+    """
+    code = "\n".join(f"import {module}" for module in modules)
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    timings = parse_importtime(result.stderr)
+    total_us = sum(t.cumulative_us for t in timings if t.depth == 0)
+    return timings, total_us / 1e6
+
+
+def format_report(timings, top=20):
+    """
+    Formats the slowest imports by cumulative time as a text table.
+
+    Args:
+        timings (list): ImportTiming records from `parse_importtime`.
+        top (int, optional): Number of rows (default: 20).
+
+    Returns:
+        str: The table, one module per line.
+    """
+    rows = sorted(timings, key=lambda t: t.cumulative_us, reverse=True)[:top]
+    width = max((len(t.module) for t in rows), default=6)
+    lines = [f"{'module':<{width}}  {'cumulative':>10}  {'self':>8}"]
+    for t in rows:
+        lines.append(
+            f"{t.module:<{width}}  {t.cumulative_us / 1000:>8.1f}ms  "
+            f"{t.self_us / 1000:>6.1f}ms",
+        )
+    return "\n".join(lines)
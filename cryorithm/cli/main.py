@@ -35,16 +35,38 @@ Cryorithm™ | CLI | Main
 # TODO: Allow override of default log file location via Click.
 
 
+import asyncio
+import json
+import signal
+import socket
+import time
+from contextlib import asynccontextmanager
+from datetime import timezone
+from pathlib import Path
+
 import click
 
-# from cryorithm.clients.openai import OpenAIClientWrapper
+# Modules that pull in heavy stacks (pandas, openai, confluent_kafka,
+# apscheduler) are imported by the commands and destinations that use them,
+# so `--help` and log-only runs start quickly. See cryorithm/cli/imports.py.
+from cryorithm.clients.ratelimit import CircuitBreaker, get_upstream
 from cryorithm.managers.config import ConfigManager
 from cryorithm.managers.log import LogManager
-
-# from cryorithm.sensors.stock.fundamentals import StockFundamentalsSensor
+from cryorithm.managers.metrics import MetricsManager
+from cryorithm.managers.replay import Replayer, iter_capture
+from cryorithm.managers.router import Router
+from cryorithm.managers.workers import WorkerPool
+from cryorithm.schemas.sensor_status import StatusCodec
+from cryorithm.sensors.stock.fundamentals import (
+    YAHOO_HOST,
+    StockBatchSensor,
+    StockSensor,
+)
+from cryorithm.stores.spool import Spool
+from cryorithm.transforms.diff import SnapshotDiffer
 
 
-@click.command()
+@click.group(invoke_without_command=True)
 @click.option(
     "--config-path",
     type=click.Path(),
@@ -77,32 +99,144 @@ from cryorithm.managers.log import LogManager
     default="10 MB",
     show_default=True,
     envvar="CRYORITHM_LOG_ROTATION",
-    help="Log rotation configuration for the log file.",
+    help="Log rotation by size or age, e.g. '10 MB' or '1 day'.",
+)
+@click.option(
+    "--log-format",
+    type=click.Choice(["text", "json"], case_sensitive=False),
+    default="text",
+    show_default=True,
+    envvar="CRYORITHM_LOG_FORMAT",
+    help="Log file format; 'json' writes JSON lines from a background thread.",
+)
+@click.option(
+    "--log-queue-size",
+    type=int,
+    default=10000,
+    show_default=True,
+    envvar="CRYORITHM_LOG_QUEUE_SIZE",
+    help="Capacity of the JSON log queue.",
+)
+@click.option(
+    "--log-overflow",
+    type=click.Choice(["drop", "block"], case_sensitive=False),
+    default="drop",
+    show_default=True,
+    envvar="CRYORITHM_LOG_OVERFLOW",
+    help="What to do when the JSON log queue is full.",
+)
+@click.option(
+    "--log-sampling",
+    envvar="CRYORITHM_LOG_SAMPLING",
+    help="Fraction of data events kept per level, e.g. 'DEBUG=0.1,INFO=0.5'.",
 )
 @click.option("--ticker", help="Stock ticker symbol.")
 @click.option(
     "--destination",
-    type=click.Choice(["kafka", "log", "openai"]),
-    help="Destination system where signals will be sent.",
+    help="Destinations where signals are sent: kafka, log and/or openai, "
+    "comma-separated.",
 )
 @click.option(
     "--kafka-bootstrap-servers",
     help="Kafka bootstrap servers connection string.",
 )
 @click.option("--kafka-topic", help="Kafka topic where signals are sent.")
+@click.option(
+    "--kafka-spool-path",
+    type=click.Path(),
+    help="Spool Kafka messages to this directory before delivery (disabled if unset).",
+)
+@click.option("--schedule-time", help="Cron expression for sensor fetches.")
+@click.option(
+    "--fetch-concurrency",
+    type=int,
+    help="Maximum number of concurrent ticker fetches in batch mode.",
+)
+@click.option(
+    "--workers",
+    type=int,
+    help="Shard tickers across this many worker processes.",
+)
+@click.option(
+    "--cluster/--no-cluster",
+    default=None,
+    help="Share ticker ownership with other nodes through a Kafka control topic.",
+)
+@click.option(
+    "--cluster-member-id",
+    help="Identifier of this node in cluster mode, used as its Kafka client id.",
+)
+@click.option(
+    "--adaptive-polling/--no-adaptive-polling",
+    default=None,
+    help="Poll each ticker by market session and change rate instead of on "
+    "every scheduled run.",
+)
+@click.option(
+    "--fetch-cache/--no-fetch-cache",
+    default=None,
+    help="Serve repeated ticker fetches from a memory and on-disk cache.",
+)
+@click.option(
+    "--history-path",
+    type=click.Path(),
+    help="Directory of the columnar snapshot history store (disabled if unset).",
+)
+@click.option(
+    "--metrics-port",
+    type=int,
+    help="Serve Prometheus metrics on this local port (disabled if unset).",
+)
+@click.option(
+    "--metrics-textfile",
+    type=click.Path(),
+    help="Periodically write Prometheus metrics to this file (disabled if unset).",
+)
+@click.pass_context
 def main(
+    ctx,
     config_path,
     log_path,
     log_level,
     log_rotation,
+    log_format,
+    log_queue_size,
+    log_overflow,
+    log_sampling,
     ticker,
     destination,
     kafka_bootstrap_servers,
     kafka_topic,
+    kafka_spool_path,
+    schedule_time,
+    fetch_concurrency,
+    workers,
+    cluster,
+    cluster_member_id,
+    adaptive_polling,
+    fetch_cache,
+    history_path,
+    metrics_port,
+    metrics_textfile,
 ):
 
     # Initialize LogManager
-    log_manager = LogManager(sink=log_path, level=log_level, rotation=log_rotation)
+    sampling = None
+    if log_sampling:
+        sampling = {
+            level.strip(): float(rate)
+            for level, rate in (pair.split("=") for pair in log_sampling.split(","))
+        }
+    log_settings = {
+        "sink": log_path,
+        "level": log_level,
+        "rotation": log_rotation,
+        "structured": log_format.lower() == "json",
+        "queue_size": log_queue_size,
+        "overflow": log_overflow.lower(),
+        "sampling": sampling,
+    }
+    log_manager = LogManager(**log_settings)
     log_manager.info("Application started", event="startup")
     log_manager.info(f"Log level set to {log_level}")
 
@@ -119,16 +253,674 @@ def main(
         "destination": destination,
         "kafka_bootstrap_servers": kafka_bootstrap_servers,
         "kafka_topic": kafka_topic,
+        "kafka_spool_path": kafka_spool_path,
+        "schedule_time": schedule_time,
+        "fetch_concurrency": fetch_concurrency,
+        "workers": workers,
+        "cluster": cluster,
+        "cluster_member_id": cluster_member_id,
+        "adaptive_polling": adaptive_polling,
+        "fetch_cache": fetch_cache,
+        "history_path": history_path,
+        "metrics_port": metrics_port,
+        "metrics_textfile": metrics_textfile,
     }
     config_manager.update_from_cli(cli_args)
     config = config_manager.get_config()  # Returns the final version of the config.
     log_manager.info("ConfigManager activated.", extra=config, event="startup")
 
-    # Initialize sensors
-    # stock_fundamentals_sensor = StockFundamentalsSensor(ticker)
-    # sensors = [
-    #    stock_fundamentals_sensor,
-    # ]
+    ctx.obj = {
+        "log_manager": log_manager,
+        "config_manager": config_manager,
+        "log_settings": log_settings,
+    }
+    ctx.call_on_close(log_manager.close)
+
+    # Without a subcommand, run the scheduled sensor pipeline.
+    if ctx.invoked_subcommand is None:
+        if int(config["workers"]) > 1:
+            if config["cluster"]:
+                raise click.UsageError("--workers cannot be combined with --cluster.")
+            run_worker_pool(config_manager, log_manager, log_settings)
+        else:
+            run_pipeline(config_manager, log_manager)
+
+
+def run_worker_pool(config_manager, log_manager, log_settings):
+    config = config_manager.get_config()
+    # Workers log to their own file; only the parent exports metrics.
+    worker_config = dict(
+        config,
+        log_settings=log_settings,
+        metrics_port=None,
+        metrics_textfile=None,
+    )
+    pool = WorkerPool(
+        run_worker,
+        worker_config,
+        config_manager.get_tickers(),
+        int(config["workers"]),
+        log_manager,
+    )
+    metrics_manager = MetricsManager(
+        registry=pool.registry,
+        port=int(config["metrics_port"]) if config["metrics_port"] else None,
+        textfile=config["metrics_textfile"],
+    )
+    metrics_manager.start()
+    # Supervisors are stopped with SIGTERM; pool.run() then stops the workers
+    # with SIGTERM too, which they handle as an interrupt and shut down on.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        pool.run()
+    except KeyboardInterrupt:
+        log_manager.info("Worker pool stopped", event="shutdown")
+    finally:
+        metrics_manager.stop()
+
+
+def run_worker(name, config):
+    """Entry point of a worker process started by run_worker_pool."""
+    log_settings = dict(config.pop("log_settings"))
+    if log_settings["sink"]:
+        sink = Path(log_settings["sink"])
+        log_settings["sink"] = str(sink.with_name(f"{sink.stem}.{name}{sink.suffix}"))
+    if config.get("kafka_spool_path"):
+        # A spool directory belongs to one process; each worker drains its own.
+        config["kafka_spool_path"] = str(Path(config["kafka_spool_path"]) / name)
+    log_manager = LogManager(**log_settings)
+    config_manager = ConfigManager()
+    config_manager.config = config
+    try:
+        run_pipeline(config_manager, log_manager)
+    finally:
+        log_manager.close()
+
+
+def run_pipeline(config_manager, log_manager):
+    from cryorithm.managers.job import JobManager
+
+    config = config_manager.get_config()
+
+    # Initialize sensors. Several tickers share one batched sensor.
+    # Every sensor talking to Yahoo shares one rate limiter and circuit breaker.
+    tickers = config_manager.get_tickers()
+    guard = get_upstream(
+        YAHOO_HOST,
+        rate=float(config["upstream_rate"]),
+        burst=int(config["upstream_burst"]),
+        max_retries=int(config["upstream_max_retries"]),
+        breaker=CircuitBreaker(
+            failure_threshold=int(config["upstream_failure_threshold"]),
+            reset_timeout=float(config["upstream_reset_timeout"]),
+        ),
+    )
+    # In cluster mode, the tickers fetched per run depend on ownership, so a
+    # batch sensor is used even for a single ticker.
+    cluster = None
+    if config["cluster"]:
+        from cryorithm.managers.cluster import ClusterManager
+
+        cluster = ClusterManager.from_config(config, tickers)
+    # Only the projected fields are kept, as compact records.
+    fields = config_manager.get_sensor_fields("stock")
+    # Shared by every process on the host through its on-disk tier.
+    cache = None
+    if config["fetch_cache"]:
+        from cryorithm.sensors.stock.cache import FetchCache
+
+        # Only the projected fields are cached.
+        cache = FetchCache.from_config(config, fields=fields)
+    if len(tickers) == 1 and cluster is None:
+        stock_sensor = StockSensor(
+            tickers[0],
+            schedule_time=config["schedule_time"],
+            guard=guard,
+            fields=fields,
+            cache=cache,
+        )
+    else:
+        stock_sensor = StockBatchSensor(
+            tickers,
+            schedule_time=config["schedule_time"],
+            max_concurrency=int(config["fetch_concurrency"]),
+            guard=guard,
+            fields=fields,
+            cache=cache,
+        )
+    sensors = [
+        stock_sensor,
+    ]
+
+    # Only changed fields are forwarded, plus periodic full keyframes.
+    differ = SnapshotDiffer.from_config(config) if config["snapshot_diff"] else None
+
+    router, producer, llm_client, drainer = build_outputs(config_manager, log_manager)
+
+    history, analyzer = build_history(config)
+    # Tickers are skipped on runs where they are not due; the cron expression
+    # sets the fastest rate.
+    poller = None
+    if config["adaptive_polling"]:
+        from cryorithm.managers.polling import AdaptivePoller
+
+        poller = AdaptivePoller.from_config(config)
+
+    job_manager = JobManager(
+        sensors,
+        log_manager,
+        differ=differ,
+        destinations=[router] if router.lanes else [],
+        history=history,
+        analyzer=analyzer,
+        cluster=cluster,
+        schedule_options=config["schedule_options"],
+        max_concurrent_jobs=int(config["job_concurrency"] or 0) or None,
+        # Hosts sharing a schedule fire at different points of the interval.
+        jitter_seed=cluster.member_id if cluster is not None else socket.gethostname(),
+        poller=poller,
+    )
+    metrics_manager = MetricsManager(
+        port=int(config["metrics_port"]) if config["metrics_port"] else None,
+        textfile=config["metrics_textfile"],
+    )
+    metrics_manager.start()
+    if cluster is not None:
+        cluster.start()
+        log_manager.info(
+            "Joined cluster group {group} as {member}",
+            group=cluster.group_id,
+            member=cluster.member_id,
+            event="startup",
+        )
+    try:
+        asyncio.run(
+            run_jobs(job_manager, producer, llm_client, drainer, router, cache),
+        )
+    finally:
+        if cluster is not None:
+            cluster.stop()
+        metrics_manager.stop()
+
+
+def build_history(config):
+    """
+    Builds the history store and signal engine configured in 'history_path'
+    and 'signals'.
+
+    Returns:
+        tuple: The HistoryStore and SignalEngine, each None when disabled.
+    """
+    history = None
+    if config["history_path"]:
+        from cryorithm.stores.history import HistoryStore
+
+        history = HistoryStore(config["history_path"])
+    analyzer = None
+    if config["signals"]:
+        if history is None:
+            raise click.UsageError("Signal analysis requires a history path.")
+        from cryorithm.analysis.signals import SignalEngine
+
+        analyzer = SignalEngine.from_config(config)
+    return history, analyzer
+
+
+def build_outputs(config_manager, log_manager, overflow=None):
+    """
+    Builds the destinations configured in 'destination', behind a Router.
+
+    Returns:
+        tuple: The router and the producer, LLM client and spool drainer it
+            depends on (each None when unused).
+    """
+    config = config_manager.get_config()
+    try:
+        destination_names = config_manager.get_destinations()
+    except ValueError as e:
+        raise click.UsageError(str(e))
+
+    producer = None
+    drainer = None
+    llm_client = None
+    destinations = {}
+    if "kafka" in destination_names:
+        from cryorithm.clients.kafka import (
+            KafkaDestination,
+            KafkaProducerClient,
+            SpoolDestination,
+            SpoolDrainer,
+        )
+    if "kafka" in destination_names and config["kafka_spool_path"]:
+        # Jobs only wait for the local disk; a drainer forwards to Kafka.
+        spool = Spool(
+            config["kafka_spool_path"],
+            segment_bytes=int(config["kafka_spool_segment_bytes"]),
+            segment_age=float(config["kafka_spool_segment_age"]),
+        )
+        producer = KafkaProducerClient.from_config(
+            config,
+            extra_config={"enable.idempotence": True},
+        )
+        drainer = SpoolDrainer(spool, producer, log_manager=log_manager)
+        destinations["kafka"] = SpoolDestination(
+            spool,
+            StatusCodec(config["message_format"]),
+        )
+    elif "kafka" in destination_names:
+        producer = KafkaProducerClient.from_config(config)
+        destinations["kafka"] = KafkaDestination(
+            producer,
+            StatusCodec(config["message_format"]),
+        )
+    if "openai" in destination_names:
+        if not config.get("api_key"):
+            raise click.UsageError("The openai destination requires an api_key.")
+        from cryorithm.clients.llm import (
+            DEFAULT_ANALYSIS_FIELDS,
+            LLMBatchDestination,
+            LLMDestination,
+        )
+        from cryorithm.clients.openai import OpenAIClientWrapper
+
+        llm_client = OpenAIClientWrapper(
+            config["api_key"],
+            max_concurrency=int(config["openai_concurrency"]),
+        )
+        if config["llm_cache"]:
+            # Identical prompts, e.g. unchanged tickers, are answered locally.
+            from cryorithm.clients.llm_cache import CachedLLMClient
+
+            llm_client = CachedLLMClient.from_config(llm_client, config)
+        if config["llm_batch"]:
+            # Many tickers per request, demultiplexed into per-ticker results.
+            destinations["openai"] = LLMBatchDestination(
+                llm_client,
+                config["openai_model"],
+                fields=config["llm_fields"] or DEFAULT_ANALYSIS_FIELDS,
+                token_budget=int(config["llm_token_budget"]),
+                on_result=lambda record, result: log_manager.info(
+                    "Analysis of {ticker}: {analysis}",
+                    ticker=record.get("ticker"),
+                    analysis=result.get("summary"),
+                    event="analysis",
+                    data=result,
+                ),
+            )
+        else:
+            destinations["openai"] = LLMDestination(
+                llm_client,
+                config["openai_model"],
+                on_result=lambda record, text: log_manager.info(
+                    "Analysis of {ticker}: {analysis}",
+                    ticker=record.get("ticker"),
+                    analysis=text,
+                    event="analysis",
+                ),
+            )
+
+    # Every destination gets its own queue, so a slow one never delays another.
+    router = Router(log_manager)
+    for name, destination in destinations.items():
+        options = config_manager.get_destination_options(name)
+        if overflow is not None:
+            options["overflow"] = overflow
+        if name == "openai":
+            # Match the client's own limit on concurrent completions.
+            options.setdefault("concurrency", int(config["openai_concurrency"]))
+        router.add(destination, name=name, **options)
+
+    return router, producer, llm_client, drainer
+
+
+@asynccontextmanager
+async def running_outputs(
+    producer=None,
+    llm_client=None,
+    drainer=None,
+    router=None,
+    drain_timeout=10.0,
+):
+    """
+    Starts the outputs built by `build_outputs` and closes them on exit,
+    waiting up to `drain_timeout` seconds (None: until done) for the router's
+    queued records.
+    """
+    if producer is not None:
+        await producer.start()
+    if drainer is not None:
+        drainer.start()
+    if router is not None:
+        router.start()
+    try:
+        yield
+    finally:
+        if router is not None:
+            await router.close(timeout=drain_timeout)
+        if drainer is not None:
+            await drainer.stop()
+            drainer.spool.close()
+        if producer is not None:
+            await producer.close()
+        if llm_client is not None:
+            await llm_client.close()
+
+
+async def run_jobs(
+    job_manager,
+    producer=None,
+    llm_client=None,
+    drainer=None,
+    router=None,
+    cache=None,
+):
+    async with running_outputs(producer, llm_client, drainer, router):
+        await job_manager.start_jobs()
+        try:
+            await job_manager.run_continuously()
+        finally:
+            job_manager.log_manager.info(
+                "Scheduler stopped",
+                event="shutdown",
+                extra=job_manager.get_stats(),
+            )
+            # Background refreshes still run on this loop.
+            if cache is not None:
+                await cache.close()
+
+
+@main.command()
+@click.option(
+    "--group",
+    default="cryorithm-consume",
+    show_default=True,
+    help="Kafka consumer group.",
+)
+@click.option(
+    "--batch-size",
+    default=10000,
+    show_default=True,
+    help="Maximum messages per consume() call.",
+)
+@click.option(
+    "--output",
+    type=click.Path(),
+    help="Append records to this JSON lines file instead of the history store.",
+)
+@click.option(
+    "--analyze/--no-analyze",
+    default=False,
+    show_default=True,
+    help="Compute signals from the history store after every batch.",
+)
+@click.option(
+    "--max-messages",
+    type=int,
+    help="Stop after this many messages.",
+)
+@click.pass_obj
+def consume(obj, group, batch_size, output, analyze, max_messages):
+    """Consume sensor status messages from Kafka into a local store."""
+    from cryorithm.clients.kafka_consumer import (
+        HistorySink,
+        JsonLinesSink,
+        KafkaBatchConsumer,
+        run_consumer,
+    )
+
+    log_manager = obj["log_manager"]
+    config = obj["config_manager"].get_config()
+
+    if output:
+        sink = JsonLinesSink(output)
+    elif config["history_path"]:
+        history, analyzer = build_history(dict(config, signals=analyze))
+        sink = HistorySink(history, analyzer=analyzer, log_manager=log_manager)
+    else:
+        raise click.UsageError("consume requires --output or a history path.")
+
+    consumer = KafkaBatchConsumer.from_config(
+        config,
+        group_id=group,
+        batch_size=batch_size,
+    )
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        stats = run_consumer(consumer, sink, log_manager, max_messages=max_messages)
+    except KeyboardInterrupt:
+        stats = None
+    finally:
+        consumer.close()
+    if stats is not None:
+        log_manager.info("Consumer stopped", event="shutdown", extra=stats)
+        click.echo(
+            f"Consumed {stats['consumed']:,} messages "
+            f"({stats['per_second']:,.0f}/s), skipped {stats['invalid']:,} "
+            f"invalid and {stats['duplicates']:,} duplicate(s).",
+        )
+
+
+@main.command()
+@click.option(
+    "--capture",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Replay this JSON lines capture instead of the history store.",
+)
+@click.option(
+    "--start",
+    type=click.DateTime(formats=["%Y-%m-%d", "%Y-%m-%dT%H:%M:%S"]),
+    help="Replay snapshots from this UTC time on.",
+)
+@click.option(
+    "--end",
+    type=click.DateTime(formats=["%Y-%m-%d", "%Y-%m-%dT%H:%M:%S"]),
+    help="Replay snapshots before this UTC time.",
+)
+@click.option(
+    "--speed",
+    type=float,
+    help="Time compression factor, e.g. 60 replays an hour per minute. "
+    "Unthrottled when omitted.",
+)
+@click.option(
+    "--tickers",
+    help="Comma-separated tickers to replay (default: all stored tickers).",
+)
+@click.pass_obj
+def replay(obj, capture, start, end, speed, tickers):
+    """Replay stored snapshots through the configured pipeline."""
+    from cryorithm.managers.job import JobManager
+
+    config_manager = obj["config_manager"]
+    log_manager = obj["log_manager"]
+    config = config_manager.get_config()
+
+    start = start.replace(tzinfo=timezone.utc).timestamp() if start else None
+    end = end.replace(tzinfo=timezone.utc).timestamp() if end else None
+    tickers = [t.strip() for t in tickers.split(",") if t.strip()] if tickers else None
+    history, analyzer = build_history(config)
+    if capture:
+        snapshots = (
+            row
+            for row in iter_capture(capture)
+            if (tickers is None or row[1] in tickers)
+            and (start is None or row[0] >= start)
+            and (end is None or row[0] < end)
+        )
+    elif history is not None:
+        snapshots = history.iter_snapshots(tickers, start, end)
+    else:
+        raise click.UsageError("replay requires --capture or a history path.")
+
+    # A backfill must not lose records to a full lane, so every lane blocks.
+    router, producer, llm_client, drainer = build_outputs(
+        config_manager,
+        log_manager,
+        overflow="block",
+    )
+    job_manager = JobManager(
+        [],
+        log_manager,
+        differ=SnapshotDiffer.from_config(config) if config["snapshot_diff"] else None,
+        destinations=[router] if router.lanes else [],
+        history=history,
+        analyzer=analyzer,
+    )
+    replayer = Replayer(job_manager, speed=speed)
+
+    async def run_replay():
+        # Every queued record is delivered, however long a backfill takes.
+        async with running_outputs(
+            producer,
+            llm_client,
+            drainer,
+            router,
+            drain_timeout=None,
+        ):
+            return await replayer.run(snapshots)
+
+    started = time.perf_counter()
+    count = asyncio.run(run_replay())
+    elapsed = time.perf_counter() - started
+    log_manager.info(
+        "Replayed {count} snapshot(s)",
+        count=count,
+        event="shutdown",
+    )
+    lost = router.undelivered + sum(lane.dropped for lane in router.lanes)
+    if lost:
+        log_manager.error(f"Replay dropped {lost} record(s)", event="shutdown")
+        raise click.ClickException(f"Replay dropped {lost:,} record(s).")
+    click.echo(f"Replayed {count:,} snapshot(s) in {elapsed:.1f}s.")
+
+
+@main.command()
+@click.option("--top", default=20, show_default=True, help="Modules to list.")
+@click.option(
+    "--module",
+    "extra_modules",
+    multiple=True,
+    help="Also time this module (repeatable).",
+)
+@click.pass_obj
+def imports(obj, top, extra_modules):
+    """Report the import time of a run with the current configuration."""
+    from cryorithm.cli.imports import format_report, measure_imports
+
+    config_manager = obj["config_manager"]
+    try:
+        modules = config_manager.get_modules() + list(extra_modules)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    try:
+        timings, total = measure_imports(modules)
+    except RuntimeError as e:
+        raise click.ClickException(f"Import failed: {e}")
+
+    click.echo(format_report(timings, top=top))
+    click.echo(
+        f"\n{len(timings)} modules imported in {total:.3f}s for destination(s) "
+        f"{', '.join(config_manager.get_destinations())}.",
+    )
+
+
+@main.command()
+@click.option("--tickers", default=500, show_default=True, help="Watchlist size.")
+@click.option("--rounds", default=5, show_default=True, help="Jobs to run.")
+@click.option(
+    "--fetch-latency",
+    default=0.05,
+    show_default=True,
+    help="Seconds per fake Yahoo fetch.",
+)
+@click.option(
+    "--payload-fields",
+    default=150,
+    show_default=True,
+    help="Numeric fields per fake snapshot.",
+)
+@click.option(
+    "--fetch-concurrency",
+    default=64,
+    show_default=True,
+    help="Maximum number of concurrent ticker fetches.",
+)
+@click.option(
+    "--snapshot-diff/--no-snapshot-diff",
+    default=False,
+    show_default=True,
+    help="Forward deltas instead of full snapshots.",
+)
+@click.option(
+    "--kafka/--no-kafka",
+    default=True,
+    show_default=True,
+    help="Send records to a fake Kafka producer.",
+)
+@click.option(
+    "--kafka-latency",
+    default=0.0,
+    show_default=True,
+    help="Seconds per fake broker round trip.",
+)
+@click.option(
+    "--message-format",
+    type=click.Choice(["json", "msgpack"]),
+    default="json",
+    show_default=True,
+    help="Encoding of Kafka messages.",
+)
+@click.option(
+    "--openai/--no-openai",
+    default=False,
+    show_default=True,
+    help="Send records to a fake OpenAI streaming server.",
+)
+@click.option(
+    "--openai-latency",
+    default=0.2,
+    show_default=True,
+    help="Seconds before the fake OpenAI server responds.",
+)
+@click.option(
+    "--openai-concurrency",
+    default=8,
+    show_default=True,
+    help="Maximum number of concurrent completions.",
+)
+@click.option(
+    "--output",
+    type=click.Path(),
+    help="Write the report to this JSON file.",
+)
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True),
+    help="Compare against a previously saved JSON report.",
+)
+@click.pass_obj
+def bench(obj, output, baseline, **params):
+    """Benchmark the pipeline against local stand-ins for Yahoo, Kafka and OpenAI."""
+    from cryorithm.bench.runner import compare_reports, run_benchmark, save_report
+
+    report = asyncio.run(run_benchmark(obj["log_manager"], **params))
+
+    for metric, value in report["results"].items():
+        value = f"{value:,}" if isinstance(value, int) else f"{value:,.2f}"
+        click.echo(f"{metric:>20}: {value}")
+
+    if output:
+        save_report(report, output)
+        click.echo(f"Report saved to {output}")
+
+    if baseline:
+        with open(baseline) as f:
+            rows = compare_reports(report, json.load(f))
+        click.echo("Compared with baseline (positive is better):")
+        for metric, previous, value, change in rows:
+            click.echo(
+                f"{metric:>20}: {previous:,.2f} -> {value:,.2f} ({change:+.1%})",
+            )
 
 
 if __name__ == "__main__":
@@ -24,11 +24,463 @@ Cryorithm™ | Kafka Client
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from confluent_kafka import Producer
+import asyncio
+import socket
+import threading
+import time
 
+from confluent_kafka import KafkaException, Producer
 
-async def send_to_kafka(data, config):
-    producer = Producer({"bootstrap.servers": config["kafka_bootstrap_servers"]})
+from cryorithm.managers.metrics import registry
+from cryorithm.schemas.sensor_status import StatusCodec
 
-    producer.produce(config["kafka_topic"], value=data.encode("utf-8"))
-    producer.flush()
+DELIVERY_SECONDS = registry.histogram(
+    "cryorithm_kafka_delivery_seconds",
+    "Time from produce() to the broker's delivery report.",
+    ["topic"],
+)
+MESSAGES = registry.counter(
+    "cryorithm_kafka_messages_total",
+    "Kafka delivery reports by outcome.",
+    ["topic", "status"],
+)
+SPOOL_DRAINED = registry.counter(
+    "cryorithm_spool_drained_total",
+    "Spooled records delivered to Kafka.",
+)
+
+# Header carrying a record's unique spool position, for consumer-side dedup.
+DEDUP_HEADER = "dedup-key"
+
+
+class KafkaProducerClient:
+    """
+    Long-lived asynchronous wrapper around `confluent_kafka.Producer`.
+
+    A single producer is created on `start()` and reused for every message, so
+    the broker connection and topic metadata are only negotiated once. Messages
+    are handed to librdkafka without blocking the event loop; librdkafka then
+    batches them according to `linger.ms`, `batch.size` and the configured
+    compression. A background thread serves delivery callbacks and resolves the
+    asyncio future returned by `produce()` for each message.
+
+    Attributes:
+        topic (str): Default topic for produced messages.
+        producer_config (dict): Configuration passed to the underlying producer.
+    """
+
+    def __init__(
+        self,
+        bootstrap_servers,
+        topic,
+        linger_ms=50,
+        batch_size=1048576,
+        compression_type="lz4",
+        extra_config=None,
+        producer_factory=Producer,
+    ):
+        """
+        Initializes the producer client without connecting to the broker.
+
+        Args:
+            bootstrap_servers (str): Kafka bootstrap servers connection string.
+            topic (str): Default topic for produced messages.
+            linger_ms (int, optional): Time librdkafka waits to fill a batch
+                (default: 50).
+            batch_size (int, optional): Maximum batch size in bytes
+                (default: 1048576).
+            compression_type (str, optional): Batch compression codec
+                (default: 'lz4').
+            extra_config (dict, optional): Additional librdkafka settings
+                (default: None).
+            producer_factory (callable, optional): Builds the producer from its
+                configuration dict; override to use a mock producer
+                (default: confluent_kafka.Producer).
+        """
+        self.topic = topic
+        self.producer_config = {
+            "bootstrap.servers": bootstrap_servers,
+            "linger.ms": linger_ms,
+            "batch.size": batch_size,
+            "compression.type": compression_type,
+        }
+        if extra_config:
+            self.producer_config.update(extra_config)
+
+        self._producer_factory = producer_factory
+        self._producer = None
+        self._loop = None
+        self._poll_thread = None
+        self._running = threading.Event()
+
+    @classmethod
+    def from_config(cls, config, **kwargs):
+        """
+        Builds a producer client from a ConfigManager configuration dict.
+        """
+        return cls(
+            bootstrap_servers=config["kafka_bootstrap_servers"],
+            topic=config["kafka_topic"],
+            linger_ms=int(config.get("kafka_linger_ms", 50)),
+            batch_size=int(config.get("kafka_batch_size", 1048576)),
+            compression_type=config.get("kafka_compression_type", "lz4"),
+            **kwargs,
+        )
+
+    async def start(self):
+        """
+        Creates the underlying producer and starts serving delivery callbacks.
+        """
+        if self._producer is not None:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._producer = self._producer_factory(self.producer_config)
+        self._running.set()
+        self._poll_thread = threading.Thread(
+            target=self._poll_loop,
+            name="cryorithm-kafka-poll",
+            daemon=True,
+        )
+        self._poll_thread.start()
+
+    def _poll_loop(self):
+        while self._running.is_set():
+            self._producer.poll(0.1)
+
+    def _on_delivery(self, future, topic, started, err, msg):
+        DELIVERY_SECONDS.labels(topic).observe(time.perf_counter() - started)
+        if err is not None:
+            MESSAGES.labels(topic, "error").inc()
+            result = KafkaException(err)
+        else:
+            MESSAGES.labels(topic, "delivered").inc()
+            result = msg
+        self._loop.call_soon_threadsafe(self._resolve, future, result)
+
+    @staticmethod
+    def _resolve(future, result):
+        if future.done():
+            return
+        if isinstance(result, Exception):
+            future.set_exception(result)
+        else:
+            future.set_result(result)
+
+    async def produce(self, value, key=None, topic=None, headers=None):
+        """
+        Queues a message for delivery without waiting for the broker.
+
+        When librdkafka's local queue is full, this coroutine yields to the
+        event loop until delivery callbacks free up space.
+
+        Args:
+            value (str | bytes): Message payload; strings are UTF-8 encoded.
+            key (str | bytes, optional): Message key (default: None).
+            topic (str, optional): Overrides the default topic (default: None).
+            headers (list, optional): Message headers as (name, value) pairs
+                (default: None).
+
+        Returns:
+            asyncio.Future: Resolves to the delivered message, or raises
+            KafkaException when delivery fails.
+        """
+        if self._producer is None:
+            await self.start()
+
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+
+        topic = topic or self.topic
+        future = self._loop.create_future()
+        started = time.perf_counter()
+        while True:
+            try:
+                self._producer.produce(
+                    topic,
+                    value=value,
+                    key=key,
+                    headers=headers,
+                    on_delivery=lambda err, msg: self._on_delivery(
+                        future,
+                        topic,
+                        started,
+                        err,
+                        msg,
+                    ),
+                )
+                return future
+            except BufferError:
+                await asyncio.sleep(0.05)
+
+    async def send(self, value, key=None, topic=None, headers=None):
+        """
+        Produces a message and waits for its delivery report.
+        """
+        future = await self.produce(value, key=key, topic=topic, headers=headers)
+        return await future
+
+    async def flush(self, timeout=10.0):
+        """
+        Waits for outstanding messages to be delivered, off the event loop.
+
+        Returns:
+            int: Number of messages still queued when the timeout expired.
+        """
+        if self._producer is None:
+            return 0
+        return await self._loop.run_in_executor(None, self._producer.flush, timeout)
+
+    async def close(self, timeout=10.0):
+        """
+        Flushes outstanding messages and stops the delivery callback thread.
+
+        Returns:
+            int: Number of messages that could not be delivered in time.
+        """
+        if self._producer is None:
+            return 0
+
+        remaining = await self.flush(timeout)
+        self._running.clear()
+        await self._loop.run_in_executor(None, self._poll_thread.join)
+        self._producer = None
+        self._poll_thread = None
+        return remaining
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+class KafkaDestination:
+    """
+    JobManager destination that produces records to Kafka.
+
+    Records are encoded as versioned sensor status messages and keyed by
+    ticker so that all updates of one ticker land on the same partition. The
+    encoding and schema version are sent as message headers. Delivery is not
+    awaited; failed deliveries are counted in `failed`. `send_batch` queues a
+    whole Router batch before returning, so librdkafka can fill its batches.
+    """
+
+    def __init__(self, producer, codec=None):
+        self.producer = producer
+        self.codec = codec if codec is not None else StatusCodec()
+        self.failed = 0
+
+    def _on_done(self, future):
+        if future.exception() is not None:
+            self.failed += 1
+
+    async def send_batch(self, records):
+        # Delivery reports of the whole batch are served by the producer's
+        # poll thread, so nothing waits on the broker here.
+        headers = self.codec.headers
+        for record in records:
+            future = await self.producer.produce(
+                self.codec.encode(record),
+                key=record.get("ticker"),
+                headers=headers,
+            )
+            future.add_done_callback(self._on_done)
+
+    async def __call__(self, record):
+        await self.send_batch([record])
+
+    def __repr__(self):
+        return f"KafkaDestination({self.producer.topic})"
+
+
+class SpoolDestination:
+    """
+    JobManager destination that appends records to a write-ahead spool.
+
+    A record is acknowledged once it is durable on disk, regardless of the
+    broker's state; a SpoolDrainer forwards the spool to Kafka.
+    """
+
+    def __init__(self, spool, codec=None):
+        self.spool = spool
+        self.codec = codec if codec is not None else StatusCodec()
+
+    async def __call__(self, record):
+        await self.spool.append(
+            record.get("ticker"),
+            self.codec.encode(record),
+            self.codec.headers,
+        )
+
+    async def send_batch(self, records):
+        # Concurrent appends share a single fsync.
+        await asyncio.gather(*(self(record) for record in records))
+
+    def __repr__(self):
+        return f"SpoolDestination({self.spool.path})"
+
+
+class SpoolDrainer:
+    """
+    Forwards a write-ahead spool to Kafka with at-least-once delivery.
+
+    Records are read from the spool in large batches and produced all at once,
+    so librdkafka can fill whole batches. The spool checkpoint only advances
+    past records whose delivery was confirmed; after a failure, the rest of
+    the batch is produced again after `retry_delay`. Re-sent records carry the
+    same `dedup-key` header, `<node>/<segment>:<offset>`, so consumers can
+    drop duplicates.
+
+    Attributes:
+        spool (Spool): The drained spool.
+        producer (KafkaProducerClient): Producer used for delivery.
+        drained (int): Number of records delivered so far.
+    """
+
+    def __init__(
+        self,
+        spool,
+        producer,
+        batch_size=10000,
+        poll_interval=0.2,
+        retry_delay=1.0,
+        node_id=None,
+        log_manager=None,
+    ):
+        self.spool = spool
+        self.producer = producer
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.node_id = node_id or f"{socket.gethostname()}:{spool.path}"
+        self.log_manager = log_manager
+        self.drained = 0
+        self._task = None
+
+    async def drain_once(self):
+        """
+        Delivers the next batch of sealed records.
+
+        Returns:
+            int: Number of records delivered and acknowledged in the spool.
+        """
+        records = await asyncio.to_thread(self.spool.read, self.batch_size)
+        if not records:
+            return 0
+
+        futures = []
+        for record in records:
+            headers = list(record.headers)
+            headers.append(
+                (DEDUP_HEADER, f"{self.node_id}/{record.position}".encode()),
+            )
+            futures.append(
+                await self.producer.produce(
+                    record.value,
+                    key=record.key,
+                    headers=headers,
+                ),
+            )
+        outcomes = await asyncio.gather(*futures, return_exceptions=True)
+
+        # Acknowledge the delivered prefix; the rest is retried.
+        delivered = 0
+        for outcome in outcomes:
+            if isinstance(outcome, Exception):
+                break
+            delivered += 1
+        if delivered:
+            await asyncio.to_thread(self.spool.ack, records[delivered - 1])
+            self.drained += delivered
+            SPOOL_DRAINED.inc(delivered)
+        if delivered < len(records):
+            raise outcomes[delivered]
+        return delivered
+
+    async def run(self):
+        """Drains the spool until cancelled."""
+        while True:
+            try:
+                await asyncio.to_thread(self.spool.roll)
+                if not await self.drain_once():
+                    await asyncio.sleep(self.poll_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self.log_manager is not None:
+                    self.log_manager.warning(
+                        f"Spool drain to {self.producer.topic} failed, retrying "
+                        f"in {self.retry_delay}s: {str(e)}",
+                    )
+                await asyncio.sleep(self.retry_delay)
+
+    def start(self):
+        """Starts draining in a background task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self, timeout=10.0):
+        """
+        Seals the active segment, drains what the broker accepts within
+        `timeout` seconds and stops. Undelivered records stay in the spool
+        for the next run.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        self.spool.roll(force=True)
+        try:
+            await asyncio.wait_for(self._drain_all(), timeout)
+        except (asyncio.TimeoutError, KafkaException):
+            pass
+
+    async def _drain_all(self):
+        while await self.drain_once():
+            pass
+
+
+async def send_to_kafka(data, config, producer=None, spool=None):
+    """
+    Sends a single message to the configured Kafka topic.
+
+    Pass the application's write-ahead `Spool` as `spool` to return as soon as
+    the message is durable on disk, whatever the broker's state. Otherwise,
+    pass the application's long-lived `KafkaProducerClient` as `producer` to
+    reuse its connection and batching. Without one, a short-lived client is
+    created and flushed for this message only. Records given as dicts are
+    encoded as sensor status messages in the configured `message_format`.
+
+    Args:
+        data (str | bytes | dict): Message payload or record.
+        config (dict): ConfigManager configuration dict.
+        producer (KafkaProducerClient, optional): Shared producer
+            (default: None).
+        spool (Spool, optional): Write-ahead spool; when given, the message
+            is appended to it and delivered later by a SpoolDrainer
+            (default: None).
+    """
+    headers = None
+    if isinstance(data, dict):
+        codec = StatusCodec(config.get("message_format", "json"))
+        key = data.get("ticker")
+        data, headers = codec.encode(data), codec.headers
+    else:
+        key = None
+
+    if spool is not None:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        return await spool.append(key, data, headers)
+
+    if producer is not None:
+        return await producer.send(data, key=key, headers=headers)
+
+    async with KafkaProducerClient.from_config(config) as temporary_producer:
+        return await temporary_producer.send(data, key=key, headers=headers)
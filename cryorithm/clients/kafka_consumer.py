@@ -0,0 +1,340 @@
+"""
+Cryorithm™ | Clients | Kafka Consumer
+"""
+
+# MIT License
+#
+# Copyright © 2024 Joshua M. Dotson (contact@jmdots.com)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from confluent_kafka import Consumer, KafkaError, KafkaException, TopicPartition
+
+from cryorithm.clients.kafka import DEDUP_HEADER
+from cryorithm.managers.metrics import registry
+from cryorithm.schemas.sensor_status import StatusCodec
+from cryorithm.stores.history import is_valid_ticker
+
+CONSUMED = registry.counter(
+    "cryorithm_consumer_messages_total",
+    "Consumed Kafka messages by outcome.",
+    ["topic", "status"],
+)
+BATCH_SECONDS = registry.histogram(
+    "cryorithm_consumer_batch_seconds",
+    "Time to decode, write and commit one consumed batch.",
+    ["topic"],
+)
+
+
+class ConsumedBatch:
+    """
+    Records decoded from one `consume()` call.
+
+    Attributes:
+        records (list): Decoded records, in partition order.
+        offsets (list): TopicPartitions to commit once the records are
+            durably written.
+        invalid (int): Messages that could not be decoded.
+        duplicates (int): Messages dropped by their dedup key.
+    """
+
+    __slots__ = ("records", "offsets", "invalid", "duplicates")
+
+    def __init__(self, records, offsets, invalid=0, duplicates=0):
+        self.records = records
+        self.offsets = offsets
+        self.invalid = invalid
+        self.duplicates = duplicates
+
+    def __len__(self):
+        return len(self.records)
+
+
+class KafkaBatchConsumer:
+    """
+    Reads sensor status messages from Kafka in large batches.
+
+    Every `poll_batch()` fetches up to `batch_size` messages with a single
+    `consume()` call and decodes them in bulk with `StatusCodec.decode_many`.
+    Auto-commit is disabled: callers commit the batch's offsets with
+    `commit()` only after its records are durably written, so a crash
+    replays at most the uncommitted batch. Messages re-sent by a SpoolDrainer
+    are recognised by their dedup key within the last `dedup_window` keys.
+
+    Attributes:
+        topic (str): Consumed topic.
+        consumer_config (dict): Configuration passed to the underlying
+            consumer.
+    """
+
+    def __init__(
+        self,
+        bootstrap_servers,
+        topic,
+        group_id="cryorithm-consume",
+        batch_size=10000,
+        timeout=1.0,
+        dedup_window=100000,
+        extra_config=None,
+        consumer_factory=Consumer,
+    ):
+        self.topic = topic
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.dedup_window = dedup_window
+        self.consumer_config = {
+            "bootstrap.servers": bootstrap_servers,
+            "group.id": group_id,
+            "enable.auto.commit": False,
+            "auto.offset.reset": "earliest",
+            # Larger fetches keep consume() fed at high message rates.
+            "fetch.min.bytes": 65536,
+            "queued.min.messages": batch_size * 2,
+        }
+        if extra_config:
+            self.consumer_config.update(extra_config)
+        self._consumer_factory = consumer_factory
+        self._consumer = None
+        self._seen = OrderedDict()
+
+    @classmethod
+    def from_config(cls, config, **kwargs):
+        """
+        Builds a consumer from a ConfigManager configuration dict.
+        """
+        return cls(
+            bootstrap_servers=config["kafka_bootstrap_servers"],
+            topic=config["kafka_topic"],
+            **kwargs,
+        )
+
+    def start(self):
+        """Creates the consumer and subscribes to the topic."""
+        if self._consumer is None:
+            self._consumer = self._consumer_factory(self.consumer_config)
+            self._consumer.subscribe([self.topic])
+
+    def _is_duplicate(self, headers):
+        key = dict(headers or ()).get(DEDUP_HEADER)
+        if key is None:
+            return False
+        if key in self._seen:
+            return True
+        self._seen[key] = None
+        if len(self._seen) > self.dedup_window:
+            self._seen.popitem(last=False)
+        return False
+
+    def poll_batch(self):
+        """
+        Consumes and decodes the next batch.
+
+        Returns:
+            ConsumedBatch: Possibly empty when no message arrived in time.
+
+        Raises:
+            KafkaException: On a fatal consumer error.
+        """
+        self.start()
+        messages = self._consumer.consume(
+            num_messages=self.batch_size,
+            timeout=self.timeout,
+        )
+
+        payloads = []
+        offsets = {}
+        duplicates = 0
+        for message in messages:
+            error = message.error()
+            if error is not None:
+                if error.code() == KafkaError._PARTITION_EOF:
+                    continue
+                raise KafkaException(error)
+            offsets[(message.topic(), message.partition())] = message.offset() + 1
+            headers = message.headers()
+            if self._is_duplicate(headers):
+                duplicates += 1
+                continue
+            payloads.append((message.value(), headers))
+
+        records, errors = StatusCodec.decode_many(payloads)
+        CONSUMED.labels(self.topic, "ok").inc(len(records))
+        if errors:
+            CONSUMED.labels(self.topic, "invalid").inc(len(errors))
+        if duplicates:
+            CONSUMED.labels(self.topic, "duplicate").inc(duplicates)
+        return ConsumedBatch(
+            records,
+            [TopicPartition(t, p, o) for (t, p), o in offsets.items()],
+            invalid=len(errors),
+            duplicates=duplicates,
+        )
+
+    def commit(self, offsets):
+        """Synchronously commits the offsets of a durably written batch."""
+        if offsets:
+            self._consumer.commit(offsets=offsets, asynchronous=False)
+
+    def close(self):
+        """Leaves the consumer group."""
+        if self._consumer is not None:
+            self._consumer.close()
+            self._consumer = None
+
+
+class HistorySink:
+    """
+    Writes consumed snapshot deltas to a HistoryStore.
+
+    Every record is stored as a full snapshot at its timestamp: a keyframe's
+    'changes' are the snapshot, and other deltas are merged onto the last
+    snapshot of their ticker, dropping the fields listed in 'removed', as
+    `iter_capture()` does. The first delta of a ticker after a restart is
+    merged onto the ticker's last stored snapshot. Signal records are not
+    stored. Records whose ticker is not a valid symbol are skipped and
+    logged, since tickers name the store's directories. With an analyzer, the
+    signals of the latest time bin are computed for the written tickers after
+    each batch.
+    """
+
+    def __init__(self, history, analyzer=None, log_manager=None):
+        self.history = history
+        self.analyzer = analyzer
+        self.log_manager = log_manager
+        self.rejected = 0
+        self._last = {}
+
+    def _snapshot(self, record):
+        ticker = record["ticker"]
+        if record.get("keyframe", True):
+            snapshot = dict(record["changes"])
+        else:
+            last = self._last.get(ticker)
+            if last is None:
+                last = self.history.latest(ticker) or {}
+            snapshot = dict(last, **record["changes"])
+        for field in record.get("removed") or ():
+            snapshot.pop(field, None)
+        self._last[ticker] = snapshot
+        return snapshot
+
+    def __call__(self, records):
+        rows = []
+        for record in records:
+            if record.get("type", "delta") != "delta":
+                continue
+            if not is_valid_ticker(record["ticker"]):
+                self.rejected += 1
+                if self.log_manager is not None:
+                    self.log_manager.error(
+                        f"Skipped a record with an invalid ticker: "
+                        f"{record['ticker']!r}",
+                    )
+                continue
+            rows.append((record["ticker"], record["timestamp"], self._snapshot(record)))
+        if rows:
+            self.history.append_many(rows)
+        if self.analyzer is None or not rows:
+            return []
+        latest = max(timestamp for _, timestamp, _ in rows)
+        tickers = list(dict.fromkeys(ticker for ticker, _, _ in rows))
+        return self.analyzer.latest_signals(self.history, tickers, latest)
+
+
+class JsonLinesSink:
+    """
+    Appends consumed records to a JSON lines file, fsyncing every batch.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def __call__(self, records):
+        with self.path.open("ab") as f:
+            f.writelines(
+                json.dumps(record, default=str).encode() + b"\n" for record in records
+            )
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def run_consumer(consumer, sink, log_manager, max_messages=None, idle_batches=None):
+    """
+    Consumes batches into a sink until stopped, committing after each write.
+
+    Args:
+        consumer (KafkaBatchConsumer): The batch consumer.
+        sink (callable): Called with each batch's records; must only return
+            once they are durable. Returned signals are logged.
+        log_manager (LogManager): Log manager.
+        max_messages (int, optional): Stop after this many records
+            (default: None, run until interrupted).
+        idle_batches (int, optional): Stop after this many consecutive empty
+            batches (default: None).
+
+    Returns:
+        dict: Counts of consumed, invalid and duplicate messages, and the
+            consumed messages per second.
+    """
+    stats = {"consumed": 0, "invalid": 0, "duplicates": 0}
+    started = time.perf_counter()
+    idle = 0
+    while max_messages is None or stats["consumed"] < max_messages:
+        batch_started = time.perf_counter()
+        batch = consumer.poll_batch()
+        if not batch.offsets:
+            idle += 1
+            if idle_batches is not None and idle >= idle_batches:
+                break
+            continue
+        idle = 0
+
+        for signal in sink(batch.records) or ():
+            log_manager.info(
+                "Signal from {topic}",
+                topic=consumer.topic,
+                event="signal",
+                data=signal,
+            )
+        consumer.commit(batch.offsets)
+        if batch.invalid:
+            log_manager.warning(
+                f"Skipped {batch.invalid} undecodable message(s) from "
+                f"{consumer.topic}",
+            )
+        BATCH_SECONDS.labels(consumer.topic).observe(
+            time.perf_counter() - batch_started
+        )
+
+        stats["consumed"] += len(batch)
+        stats["invalid"] += batch.invalid
+        stats["duplicates"] += batch.duplicates
+
+    elapsed = time.perf_counter() - started
+    stats["per_second"] = stats["consumed"] / elapsed if elapsed else 0.0
+    return stats
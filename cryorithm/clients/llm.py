@@ -1,6 +1,16 @@
+import asyncio
+import json
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from typing import AsyncIterator, List, Dict, Any
 
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional exact token counts
+    tiktoken = None
+
+from cryorithm.clients.llm_stream import parse_stream
+
 
 class LLMClient(ABC):
     @abstractmethod
@@ -8,5 +18,293 @@ class LLMClient(ABC):
         self,
         model: str,
         messages: List[Dict[str, Any]],
+        **kwargs,
     ) -> AsyncIterator:
         pass
+
+    async def get_result(self, model: str, messages: List[Dict[str, Any]]):
+        """
+        Returns the stored result of a request, or None.
+
+        Consumers that close a stream as soon as they have their answer store
+        what they parsed from it with `set_result`. Clients without a cache
+        store nothing.
+        """
+        return None
+
+    async def set_result(self, model: str, messages: List[Dict[str, Any]], result):
+        """Stores the result of a request for `get_result`."""
+
+
+@lru_cache(maxsize=None)
+def _encoding(model):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    """
+    Counts the tokens of a text locally.
+
+    Uses the model's tiktoken encoding when `tiktoken` is installed, and the
+    common approximation of four characters per token otherwise.
+    """
+    if tiktoken is not None:
+        return len(_encoding(model).encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def estimate_tokens(messages: List[Dict[str, Any]], model: str = "gpt-4o-mini") -> int:
+    """
+    Estimates the prompt tokens of chat messages.
+
+    Counts the content of every message with `count_tokens`, plus a small
+    per-message overhead for the role and separators.
+    """
+    return sum(
+        count_tokens(str(message.get("content", "")), model) for message in messages
+    ) + 4 * len(messages)
+
+
+class LLMDestination:
+    """
+    JobManager destination that asks an LLM to analyse each record.
+
+    The record is sent as JSON in the user message, after a system prompt. The
+    streamed answer is concatenated and passed to `on_result`, when given,
+    together with the record.
+    """
+
+    DEFAULT_PROMPT = (
+        "You are a financial analyst. Summarize the notable changes in the "
+        "following stock fundamentals update in one sentence."
+    )
+
+    def __init__(self, client: LLMClient, model: str, prompt=None, on_result=None):
+        self.client = client
+        self.model = model
+        self.prompt = prompt or self.DEFAULT_PROMPT
+        self.on_result = on_result
+        self.completed = 0
+
+    async def __call__(self, record):
+        messages = [
+            {"role": "system", "content": self.prompt},
+            {"role": "user", "content": json.dumps(record, default=str)},
+        ]
+        chunks = []
+        async for chunk in self.client.create_chat_completion_stream(
+            self.model,
+            messages,
+        ):
+            chunks.append(chunk)
+        self.completed += 1
+        if self.on_result is not None:
+            self.on_result(record, "".join(chunks))
+
+    def __repr__(self):
+        return f"LLMDestination({self.model})"
+
+
+# Fundamentals sent to the LLM by default; the raw yfinance `info` dict has
+# over a hundred fields, most of them irrelevant to a trading summary.
+DEFAULT_ANALYSIS_FIELDS = (
+    "currentPrice",
+    "previousClose",
+    "regularMarketChangePercent",
+    "volume",
+    "averageVolume",
+    "marketCap",
+    "trailingPE",
+    "forwardPE",
+    "fiftyTwoWeekHigh",
+    "fiftyTwoWeekLow",
+    "fiftyDayAverage",
+    "twoHundredDayAverage",
+    "recommendationKey",
+    "targetMeanPrice",
+)
+
+
+def _compact(value):
+    # Four significant digits are plenty for a summary and save tokens.
+    if isinstance(value, float):
+        return float(f"{value:.4g}")
+    return value
+
+
+class LLMBatchDestination:
+    """
+    JobManager destination that analyses many tickers per LLM request.
+
+    Records are projected onto `fields`, compacted and packed into as few
+    prompts as the `token_budget` allows, counting tokens locally. Each prompt
+    asks for one JSON object per ticker and per line, and the answer is
+    demultiplexed while it streams: each ticker's result is passed to
+    `on_result`, together with the ticker's record, as soon as its line is
+    complete. A ticker missing from an answer is counted in
+    `missing`. Results are also stored per ticker with the client's
+    `set_result`, so a cached client answers an unchanged ticker without a
+    request, whatever batch it lands in.
+
+    Use it behind a Router lane with a batch size above one, so `send_batch`
+    receives many records at once.
+
+    Attributes:
+        completed (int): Tickers with a result.
+        missing (int): Tickers the LLM did not answer for.
+        requests (int): Completion requests sent.
+    """
+
+    DEFAULT_PROMPT = (
+        "You are a financial analyst. Each input line is a JSON object with a "
+        "stock ticker and its latest fundamentals. For every input line, "
+        'answer with exactly one line of JSON: {"ticker": <ticker>, "signal": '
+        '"bullish" | "bearish" | "neutral", "summary": <one short sentence>}. '
+        "Output nothing else."
+    )
+
+    def __init__(
+        self,
+        client: LLMClient,
+        model: str,
+        fields=DEFAULT_ANALYSIS_FIELDS,
+        token_budget=4000,
+        max_tickers=50,
+        output_tokens_per_ticker=60,
+        prompt=None,
+        on_result=None,
+    ):
+        """
+        Initializes the destination.
+
+        Args:
+            client (LLMClient): Client used for completions.
+            model (str): Model name, also used to select the tokenizer.
+            fields (iterable, optional): Fields sent per ticker, or None to
+                send all (default: DEFAULT_ANALYSIS_FIELDS).
+            token_budget (int, optional): Maximum prompt plus expected output
+                tokens per request (default: 4000).
+            max_tickers (int, optional): Maximum tickers per request
+                (default: 50).
+            output_tokens_per_ticker (int, optional): Output tokens reserved
+                per ticker in the budget and in `max_tokens` (default: 60).
+            prompt (str, optional): System prompt (default: DEFAULT_PROMPT).
+            on_result (callable, optional): Called as `on_result(record,
+                result)` for every ticker answered (default: None).
+        """
+        self.client = client
+        self.model = model
+        self.fields = tuple(fields) if fields is not None else None
+        self.token_budget = token_budget
+        self.max_tickers = max_tickers
+        self.output_tokens_per_ticker = output_tokens_per_ticker
+        self.prompt = prompt or self.DEFAULT_PROMPT
+        self.on_result = on_result
+        self.completed = 0
+        self.missing = 0
+        self.requests = 0
+
+    def project(self, record):
+        """Returns the compact JSON line sent for a record."""
+        data = record.get("changes", record)
+        if self.fields is not None:
+            data = {field: data[field] for field in self.fields if field in data}
+        line = {"ticker": record.get("ticker")}
+        line.update((key, _compact(value)) for key, value in data.items())
+        return json.dumps(line, separators=(",", ":"), default=str)
+
+    def pack(self, records):
+        """
+        Splits records into batches that fit the token budget.
+
+        Returns:
+            list: Lists of (record, line) pairs, one list per request.
+        """
+        overhead = estimate_tokens([{"content": self.prompt}, {}], self.model)
+        batches = []
+        batch, used = [], overhead
+        for record in records:
+            line = self.project(record)
+            cost = count_tokens(line, self.model) + 1 + self.output_tokens_per_ticker
+            if batch and (
+                used + cost > self.token_budget or len(batch) >= self.max_tickers
+            ):
+                batches.append(batch)
+                batch, used = [], overhead
+            batch.append((record, line))
+            used += cost
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _messages(self, lines):
+        return [
+            {"role": "system", "content": self.prompt},
+            {"role": "user", "content": "\n".join(lines)},
+        ]
+
+    async def _stream(self, batch):
+        self.requests += 1
+        async for chunk in self.client.create_chat_completion_stream(
+            self.model,
+            self._messages(line for _, line in batch),
+            max_tokens=self.output_tokens_per_ticker * len(batch),
+        ):
+            yield chunk
+
+    async def _analyze(self, batch):
+        pending = {record.get("ticker"): (record, line) for record, line in batch}
+        # Results are handed on as soon as each line is complete, and the
+        # stream is cancelled once every ticker has been answered.
+        results = parse_stream(
+            self._stream(batch),
+            until=lambda result: not pending,
+            required=("ticker",),
+        )
+        async for result in results:
+            # The model may answer with any JSON value, including unhashable
+            # ones; those lines cannot match a ticker.
+            ticker = result["ticker"]
+            entry = pending.pop(ticker, None) if isinstance(ticker, str) else None
+            if entry is None:
+                continue
+            record, line = entry
+            # The stream is cut short, so results are stored per ticker.
+            await self.client.set_result(self.model, self._messages([line]), result)
+            self._complete(record, result)
+        self.missing += len(pending)
+
+    def _complete(self, record, result):
+        self.completed += 1
+        if self.on_result is not None:
+            self.on_result(record, result)
+
+    async def _lookup(self, record):
+        result = await self.client.get_result(
+            self.model,
+            self._messages([self.project(record)]),
+        )
+        if result is None:
+            return record
+        self._complete(record, result)
+        return None
+
+    async def send_batch(self, records):
+        # Only the latest record of each ticker is worth analysing.
+        latest = {record.get("ticker"): record for record in records}
+        misses = await asyncio.gather(*map(self._lookup, latest.values()))
+        await asyncio.gather(
+            *(
+                self._analyze(batch)
+                for batch in self.pack(r for r in misses if r is not None)
+            ),
+        )
+
+    async def __call__(self, record):
+        await self.send_batch([record])
+
+    def __repr__(self):
+        return f"LLMBatchDestination({self.model})"
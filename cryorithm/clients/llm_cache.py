@@ -0,0 +1,303 @@
+"""
+Cryorithm™ | Clients | LLM Cache
+"""
+
+# MIT License
+#
+# Copyright © 2024 Joshua M. Dotson (contact@jmdots.com)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from cryorithm.clients.llm import LLMClient
+from cryorithm.managers.metrics import registry
+
+LLM_CACHE_LOOKUPS = registry.counter(
+    "cryorithm_llm_cache_lookups_total",
+    "LLM response cache lookups by result.",
+    ["result"],
+)
+
+
+def cache_key(model: str, messages: List[Dict[str, Any]], options=None) -> str:
+    """
+    Computes the content address of a chat completion request.
+
+    Messages are normalized before hashing: keys are sorted, string content
+    has its line endings unified and surrounding whitespace stripped, so
+    cosmetic differences in prompt construction still hit the cache.
+    """
+    normalized = []
+    for message in messages:
+        message = dict(message)
+        content = message.get("content")
+        if isinstance(content, str):
+            message["content"] = content.replace("\r\n", "\n").strip()
+        normalized.append(message)
+
+    payload = json.dumps(
+        {"model": model, "messages": normalized, "options": options or {}},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryCacheBackend:
+    """
+    In-process LRU cache of completed responses.
+
+    Attributes:
+        max_entries (int): Entries kept before the least recently used one is
+            evicted.
+        ttl (float): Seconds an entry stays valid, or None for no expiry.
+    """
+
+    blocking = False
+
+    def __init__(self, max_entries=1024, ttl=None, clock=time.time):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, chunks = entry
+            if expires_at is not None and expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return chunks
+
+    def set(self, key, chunks):
+        expires_at = self._clock() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, list(chunks))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """
+    On-disk cache of completed responses, shared across runs and processes.
+
+    Entries past their TTL are ignored on read and purged on write. When the
+    table grows beyond `max_entries`, the least recently accessed entries are
+    evicted.
+
+    Attributes:
+        path (Path): Location of the SQLite database file.
+        max_entries (int): Entries kept before eviction, or None for no limit.
+        ttl (float): Seconds an entry stays valid, or None for no expiry.
+    """
+
+    blocking = True
+
+    def __init__(self, path, max_entries=100000, ttl=None, clock=time.time):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                "key TEXT PRIMARY KEY, chunks TEXT NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)",
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS completions_accessed "
+                "ON completions (accessed)",
+            )
+
+    def get(self, key):
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT chunks, created FROM completions WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            chunks, created = row
+            if self.ttl is not None and created + self.ttl <= now:
+                return None
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE completions SET accessed = ? WHERE key = ?",
+                    (now, key),
+                )
+        return json.loads(chunks)
+
+    def set(self, key, chunks):
+        now = self._clock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?)",
+                (key, json.dumps(list(chunks)), now, now),
+            )
+            if self.ttl is not None:
+                self._conn.execute(
+                    "DELETE FROM completions WHERE created <= ?",
+                    (now - self.ttl,),
+                )
+            if self.max_entries is not None:
+                self._conn.execute(
+                    "DELETE FROM completions WHERE key IN ("
+                    "SELECT key FROM completions ORDER BY accessed DESC "
+                    "LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+
+class CachedLLMClient(LLMClient):
+    """
+    Content-addressed response cache in front of any LLMClient.
+
+    A hit replays the stored chunks as a stream, so callers cannot tell it
+    apart from a live completion. A miss streams from the wrapped client and
+    stores the response only once the stream has completed. Results parsed
+    from streams the caller closed early are stored with `set_result`.
+
+    Attributes:
+        client (LLMClient): The wrapped client.
+        backend: Cache backend, e.g. MemoryCacheBackend or SQLiteCacheBackend.
+        hits (int): Number of requests answered from the cache.
+        misses (int): Number of requests forwarded to the wrapped client.
+    """
+
+    def __init__(self, client: LLMClient, backend=None):
+        self.client = client
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, client, config):
+        """
+        Wraps a client in the cache configured in a ConfigManager
+        configuration dict: on disk at 'llm_cache_path', in memory otherwise.
+        """
+        ttl = config.get("llm_cache_ttl")
+        ttl = float(ttl) if ttl else None
+        entries = int(config.get("llm_cache_entries", 1024))
+        if config.get("llm_cache_path"):
+            backend = SQLiteCacheBackend(
+                config["llm_cache_path"],
+                max_entries=entries,
+                ttl=ttl,
+            )
+        else:
+            backend = MemoryCacheBackend(max_entries=entries, ttl=ttl)
+        return cls(client, backend)
+
+    async def _call_backend(self, method, *args):
+        if self.backend.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def create_chat_completion_stream(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        **kwargs,
+    ) -> AsyncIterator:
+        key = cache_key(model, messages, kwargs)
+        cached: Optional[List[str]] = await self._call_backend(self.backend.get, key)
+        if cached is not None:
+            self.hits += 1
+            LLM_CACHE_LOOKUPS.labels("hit").inc()
+            for chunk in cached:
+                yield chunk
+            return
+
+        self.misses += 1
+        LLM_CACHE_LOOKUPS.labels("miss").inc()
+        chunks = []
+        async for chunk in self.client.create_chat_completion_stream(
+            model,
+            messages,
+            **kwargs,
+        ):
+            chunks.append(chunk)
+            yield chunk
+        await self._call_backend(self.backend.set, key, chunks)
+
+    async def get_result(self, model, messages):
+        key = cache_key(model, messages, {"result": True})
+        cached = await self._call_backend(self.backend.get, key)
+        if cached is None:
+            self.misses += 1
+            LLM_CACHE_LOOKUPS.labels("miss").inc()
+            return None
+        self.hits += 1
+        LLM_CACHE_LOOKUPS.labels("hit").inc()
+        return cached[0]
+
+    async def set_result(self, model, messages, result):
+        key = cache_key(model, messages, {"result": True})
+        await self._call_backend(self.backend.set, key, [result])
+
+    def get_stats(self):
+        """
+        Returns a dictionary containing the cache hit and miss counters.
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "entries": len(self.backend),
+        }
+
+    async def close(self):
+        """Closes the wrapped client and the cache backend."""
+        await self.client.close()
+        close = getattr(self.backend, "close", None)
+        if close is not None:
+            close()
@@ -0,0 +1,159 @@
+"""
+Cryorithm™ | Clients | LLM Stream
+"""
+
+# MIT License
+#
+# Copyright © 2024 Joshua M. Dotson (contact@jmdots.com)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import json
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from cryorithm.managers.metrics import registry
+
+FIRST_RECORD_SECONDS = registry.histogram(
+    "cryorithm_llm_first_record_seconds",
+    "Time from starting a completion stream to its first complete record.",
+)
+STREAMS_CANCELLED = registry.counter(
+    "cryorithm_llm_streams_cancelled_total",
+    "Completion streams cancelled early because a stop condition was met.",
+)
+
+
+class JsonObjectParser:
+    """
+    Incremental parser of the JSON objects in a text stream.
+
+    Chunks are fed as they arrive and every top-level JSON object is returned
+    as soon as its closing brace is seen, whether objects are separated by
+    newlines (JSON lines), by nothing, or wrapped in prose or code fences.
+    Each character is scanned once, tracking string and escape state, so
+    braces inside strings are handled. Objects that fail to decode are
+    counted in `invalid` and skipped.
+
+    Attributes:
+        invalid (int): Complete objects that were not valid JSON.
+    """
+
+    def __init__(self):
+        self.invalid = 0
+        self._buffer = ""
+        self._position = 0
+        self._start = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> list:
+        """
+        Adds a chunk of text.
+
+        Returns:
+            list: The objects completed by this chunk, in order.
+        """
+        self._buffer += chunk
+        objects = []
+        buffer = self._buffer
+        for position in range(self._position, len(buffer)):
+            char = buffer[position]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                if self._depth:
+                    self._in_string = True
+            elif char == "{":
+                if not self._depth:
+                    self._start = position
+                self._depth += 1
+            elif char == "}" and self._depth:
+                self._depth -= 1
+                if not self._depth:
+                    start, end = self._start, position + 1
+                    try:
+                        objects.append(json.loads(buffer[start:end]))
+                    except ValueError:
+                        self.invalid += 1
+                    self._start = None
+
+        # Keep only the unfinished object, if any.
+        if self._start is None:
+            self._buffer = ""
+            self._position = 0
+        else:
+            start = self._start
+            self._buffer = buffer[start:]
+            self._position = len(self._buffer)
+            self._start = 0
+        return objects
+
+
+async def parse_stream(
+    chunks: AsyncIterator[str],
+    until: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    required: tuple = (),
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yields the JSON objects of a completion stream as soon as each is complete.
+
+    The upstream stream is closed as soon as `until` returns True, which
+    cancels the HTTP response of an `OpenAIClientWrapper` stream, so no more
+    tokens are generated or paid for. Closing this generator early does the
+    same.
+
+    Args:
+        chunks (AsyncIterator): Text fragments, e.g. from
+            `create_chat_completion_stream`.
+        until (callable, optional): Called with every yielded object, after
+            the consumer has handled it; returning True ends the stream
+            (default: None).
+        required (tuple, optional): Fields an object must have to be yielded;
+            others are skipped (default: ()).
+
+    Yields:
+        dict: Parsed objects, in stream order.
+    """
+    parser = JsonObjectParser()
+    started = time.perf_counter()
+    first = True
+    try:
+        async for chunk in chunks:
+            for obj in parser.feed(chunk):
+                if not isinstance(obj, dict) or any(f not in obj for f in required):
+                    continue
+                if first:
+                    FIRST_RECORD_SECONDS.observe(time.perf_counter() - started)
+                    first = False
+                yield obj
+                if until is not None and until(obj):
+                    STREAMS_CANCELLED.inc()
+                    return
+    finally:
+        aclose = getattr(chunks, "aclose", None)
+        if aclose is not None:
+            await aclose()
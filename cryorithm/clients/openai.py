@@ -24,51 +24,188 @@ Cryorithm™ | OpenAI Client
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from typing import List, Dict, Any, AsyncIterator
+import asyncio
+import time
+from typing import List, Dict, Any, AsyncIterator, Optional
 
-# Since OpenAI does not have an official async client provided in their Python package,
-# we'll assume it should still be imported from openai (if using synchronous just
-# remove all 'async' and 'await').
-from openai import OpenAI as AsyncOpenAIClient
+import httpx
+from openai import AsyncOpenAI
 
+from cryorithm.clients.llm import LLMClient, count_tokens, estimate_tokens
+from cryorithm.clients.ratelimit import TokenBucket
+from cryorithm.managers.metrics import registry
 
-class LLMClient:
-    """Base class to ensure proper inheritance if needed."""
-
-    pass
+REQUESTS = registry.counter(
+    "cryorithm_llm_requests_total",
+    "Chat completion requests by outcome.",
+    ["model", "status"],
+)
+FIRST_CHUNK_SECONDS = registry.histogram(
+    "cryorithm_llm_first_chunk_seconds",
+    "Time from sending a completion request to its first content chunk.",
+    ["model"],
+)
+STREAM_SECONDS = registry.histogram(
+    "cryorithm_llm_stream_seconds",
+    "Duration of streamed chat completions.",
+    ["model"],
+)
+TOKENS = registry.counter(
+    "cryorithm_llm_tokens_total",
+    "Prompt and completion tokens, as reported by the API or estimated locally.",
+    ["model", "kind"],
+)
 
 
 class OpenAIClientWrapper(LLMClient):
-    def __init__(self, api_key: str):
+    """
+    Asynchronous OpenAI chat client with shared pooling and rate limits.
+
+    All calls go through one `httpx.AsyncClient`, so connections are pooled
+    and reused across requests. A semaphore caps the number of in-flight
+    streams per client, and optional requests-per-minute and tokens-per-minute
+    buckets pace requests before they are sent. Prompt tokens are estimated
+    locally, plus `max_tokens` when the caller sets it.
+
+    Streams request the final usage report, which feeds the token counter;
+    servers that do not send one are counted with local estimates instead.
+
+    Attributes:
+        client (AsyncOpenAI): The underlying OpenAI SDK client.
+        max_concurrency (int): Maximum number of concurrent completions.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        max_concurrency: int = 8,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+    ):
+        """
+        Initializes the client.
+
+        Args:
+            api_key (str): OpenAI API key.
+            base_url (str, optional): Overrides the API endpoint, e.g. to point
+                at a local mock server (default: None).
+            max_concurrency (int, optional): Maximum number of concurrent
+                completions (default: 8).
+            requests_per_minute (int, optional): Request rate limit
+                (default: None, unlimited).
+            tokens_per_minute (int, optional): Token rate limit
+                (default: None, unlimited).
+            http_client (httpx.AsyncClient, optional): Shared HTTP client. When
+                omitted, a pooled client sized to `max_concurrency` is created
+                and owned by this wrapper (default: None).
+        """
         if not api_key:
             raise ValueError("API key must be provided")
-        self.client = AsyncOpenAIClient(api_key=api_key)
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self._owns_http_client = http_client is None
+        if http_client is None:
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=max_concurrency,
+                    max_keepalive_connections=max_concurrency,
+                ),
+                timeout=httpx.Timeout(60.0, connect=10.0),
+            )
+        self.http_client = http_client
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=http_client,
+        )
+
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._request_bucket = (
+            TokenBucket.per_minute(requests_per_minute) if requests_per_minute else None
+        )
+        self._token_bucket = (
+            TokenBucket.per_minute(tokens_per_minute) if tokens_per_minute else None
+        )
+
+    async def _acquire_rate_limits(self, model, messages, max_tokens):
+        if self._request_bucket is not None:
+            await self._request_bucket.acquire()
+        if self._token_bucket is not None:
+            await self._token_bucket.acquire(
+                estimate_tokens(messages, model) + max_tokens,
+            )
 
     async def create_chat_completion_stream(
         self,
         model: str,
         messages: List[Dict[str, Any]],
+        **kwargs,
     ) -> AsyncIterator:
-        try:
-            # Assuming .chat_completions is the method name; double-check based on
-            # actual SDK documentation.
-            response_stream = await self.client.Completion.create(
-                model=model,
-                messages=messages,
-                stream=True,
+        """
+        Streams the content fragments of a chat completion as they arrive.
+
+        Extra keyword arguments are passed through to
+        `chat.completions.create`.
+        """
+        kwargs.setdefault("stream_options", {"include_usage": True})
+        async with self._semaphore:
+            await self._acquire_rate_limits(
+                model,
+                messages,
+                kwargs.get("max_tokens") or 0,
             )
+            started = time.perf_counter()
+            try:
+                response_stream = await self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    stream=True,
+                    **kwargs,
+                )
+            except Exception:
+                REQUESTS.labels(model, "error").inc()
+                raise
 
-            async for chunk in response_stream:
-                if (
-                    "choices" in chunk
-                    and len(chunk["choices"]) > 0
-                    and "content" in chunk["choices"][0]
-                ):
-                    yield chunk["choices"][0]["content"]
+            chunks = 0
+            # Counted as the chunks go by, so the response is never buffered.
+            completion_tokens = 0
+            usage = None
+            status = "incomplete"
+            try:
+                async for chunk in response_stream:
+                    if chunk.usage is not None:
+                        usage = chunk.usage
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        content = chunk.choices[0].delta.content
+                        if not chunks:
+                            FIRST_CHUNK_SECONDS.labels(model).observe(
+                                time.perf_counter() - started,
+                            )
+                        chunks += 1
+                        completion_tokens += count_tokens(content, model)
+                        yield content
+                status = "ok"
+            except GeneratorExit:
+                # The caller stopped reading; closing the response below
+                # cancels the request so no further tokens are generated.
+                status = "cancelled"
+                raise
+            finally:
+                await response_stream.close()
+                REQUESTS.labels(model, status).inc()
+                if usage is not None:
+                    TOKENS.labels(model, "prompt").inc(usage.prompt_tokens)
+                    TOKENS.labels(model, "completion").inc(usage.completion_tokens)
                 else:
-                    yield ""  # Yield empty string or handle unexpected format more
-                    # gracefully
+                    TOKENS.labels(model, "prompt").inc(estimate_tokens(messages, model))
+                    TOKENS.labels(model, "completion").inc(completion_tokens)
+                STREAM_SECONDS.labels(model).observe(time.perf_counter() - started)
 
-        except Exception as e:
-            print(f"Failed to generate completion: {str(e)}")
-            raise e
+    async def close(self):
+        """Closes the HTTP connection pool if it is owned by this wrapper."""
+        if self._owns_http_client:
+            await self.http_client.aclose()
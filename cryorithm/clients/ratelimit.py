@@ -0,0 +1,394 @@
+"""
+Cryorithm™ | Clients | Rate Limit
+"""
+
+# MIT License
+#
+# Copyright © 2024 Joshua M. Dotson (contact@jmdots.com)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import asyncio
+import random
+import time
+
+from cryorithm.managers.metrics import registry
+
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+UPSTREAM_CALLS = registry.counter(
+    "cryorithm_upstream_calls_total",
+    "Guarded upstream calls by outcome.",
+    ["host", "status"],
+)
+UPSTREAM_RATE = registry.gauge(
+    "cryorithm_upstream_rate",
+    "Current adaptive request rate per upstream host, per second.",
+    ["host"],
+)
+CIRCUIT_OPEN = registry.gauge(
+    "cryorithm_upstream_circuit_open",
+    "Whether the circuit breaker of an upstream host is open (1) or not (0).",
+    ["host"],
+)
+
+
+class TokenBucket:
+    """
+    Asynchronous token-bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `capacity`. Callers
+    await `acquire()` and are served in arrival order, so a burst of requests is
+    spread out at the sustained rate instead of being rejected.
+
+    Attributes:
+        rate (float): Tokens added per second.
+        capacity (float): Maximum number of stored tokens.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic):
+        """
+        Initializes a full bucket.
+
+        Args:
+            rate (float): Tokens added per second.
+            capacity (float, optional): Maximum number of stored tokens
+                (default: None, one second worth of tokens).
+            clock (callable, optional): Monotonic clock in seconds
+                (default: time.monotonic).
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def per_minute(cls, limit, **kwargs):
+        """
+        Builds a bucket allowing `limit` tokens per minute, with a one-minute
+        burst capacity.
+        """
+        return cls(limit / 60.0, capacity=limit, **kwargs)
+
+    def set_rate(self, rate):
+        """Changes the refill rate, keeping the tokens accumulated so far."""
+        self._refill()
+        self.rate = float(rate)
+
+    def _refill(self):
+        now = self._clock()
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+
+    def try_acquire(self, tokens=1):
+        """
+        Takes tokens if available without waiting.
+
+        Returns:
+            float: 0 when the tokens were taken, otherwise the number of
+            seconds until enough tokens will be available.
+        """
+        tokens = min(tokens, self.capacity)
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return 0.0
+        return (tokens - self._tokens) / self.rate
+
+    async def acquire(self, tokens=1):
+        """
+        Waits until `tokens` are available and takes them.
+
+        Requests larger than the bucket capacity are clamped to the capacity so
+        they cannot wait forever.
+        """
+        async with self._lock:
+            while True:
+                wait = self.try_acquire(tokens)
+                if not wait:
+                    return
+                await asyncio.sleep(wait)
+
+
+class UpstreamError(Exception):
+    """
+    Error from an upstream data source carrying its HTTP status code.
+
+    Fetchers can raise this to make throttling and server errors visible to
+    the UpstreamGuard; other exceptions are inspected for a `status_code` or
+    `response.status_code` attribute.
+    """
+
+    def __init__(self, status_code, message=None, retry_after=None):
+        super().__init__(message or f"Upstream returned HTTP {status_code}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the upstream while its circuit breaker is open."""
+
+
+def status_of(error):
+    """Returns the HTTP status code carried by an exception, if any."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def is_client_error(status):
+    """Whether an HTTP status is a client error, other than throttling."""
+    return status is not None and 400 <= status < 500 and status != 429
+
+
+def is_upstream_failure(error):
+    """
+    Whether an error means the upstream is unhealthy: throttling, a server
+    error, a network error or a timeout.
+    """
+    status = status_of(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(error, (OSError, TimeoutError))
+
+
+def is_retryable(error):
+    """Whether an error is a throttling, server or network error worth a retry."""
+    status = status_of(error)
+    if status is not None:
+        return status in RETRYABLE_STATUSES
+    # ConnectionError, socket and DNS errors and timeouts carry no status.
+    return isinstance(error, (OSError, TimeoutError))
+
+
+def retry_after_of(error):
+    """Returns the Retry-After delay in seconds carried by an exception, if any."""
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is None:
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        retry_after = headers.get("Retry-After")
+    try:
+        return float(retry_after) if retry_after is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    Fails fast while an upstream is unhealthy.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls
+    are rejected for `reset_timeout` seconds. Then a single trial call is let
+    through (half-open): success closes the circuit, failure opens it again.
+
+    Attributes:
+        state (str): 'closed', 'open' or 'half_open'.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow(self):
+        """
+        Returns whether a call may proceed, moving from open to half-open once
+        the reset timeout has elapsed.
+        """
+        if self.state == "open":
+            if self._clock() - self._opened_at < self.reset_timeout:
+                return False
+            self.state = "half_open"
+            self._trial_in_flight = False
+        if self.state == "half_open":
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+        return True
+
+    def release(self):
+        """Gives back a half-open trial that ended without an outcome."""
+        self._trial_in_flight = False
+
+    def record_success(self):
+        self.state = "closed"
+        self._failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self._failures += 1
+        if self.state == "half_open" or self._failures >= self.failure_threshold:
+            self.state = "open"
+            self._opened_at = self._clock()
+            self._trial_in_flight = False
+
+
+class UpstreamGuard:
+    """
+    Rate limiter, adaptive backoff and circuit breaker for one upstream host.
+
+    Every call first takes a token from the host's bucket. Throttling (HTTP
+    429) halves the bucket rate and successes raise it again additively up to
+    the configured maximum, so callers settle at the highest rate the
+    upstream sustains. Upstream failures (429, 5xx, network errors and
+    timeouts) count towards the circuit breaker, and the retryable ones are
+    retried with jittered exponential backoff, honouring Retry-After. Other
+    errors, such as failing to parse a response, are raised without being
+    counted.
+
+    Attributes:
+        host (str): Upstream host name, used as the registry key.
+        bucket (TokenBucket): The host's token bucket.
+        breaker (CircuitBreaker): The host's circuit breaker.
+    """
+
+    def __init__(
+        self,
+        host,
+        rate=10.0,
+        burst=None,
+        min_rate=0.5,
+        max_retries=3,
+        base_delay=0.5,
+        max_delay=30.0,
+        breaker=None,
+        sleep=asyncio.sleep,
+    ):
+        self.host = host
+        self.max_rate = float(rate)
+        self.min_rate = min(float(min_rate), self.max_rate)
+        self.bucket = TokenBucket(rate, capacity=burst)
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._sleep = sleep
+        UPSTREAM_RATE.labels(host).set(rate)
+
+    def _backoff(self, attempt, error):
+        retry_after = retry_after_of(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        # Full jitter: spread retries of concurrent callers over the window.
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def _adapt(self, throttled):
+        if throttled:
+            rate = max(self.min_rate, self.bucket.rate / 2)
+        else:
+            rate = min(self.max_rate, self.bucket.rate + self.max_rate / 20)
+        if rate != self.bucket.rate:
+            self.bucket.set_rate(rate)
+            UPSTREAM_RATE.labels(self.host).set(rate)
+
+    async def call(self, func, *args):
+        """
+        Calls an upstream coroutine function under the guard.
+
+        Args:
+            func (callable): Coroutine function performing the upstream call.
+            *args: Arguments for `func`.
+
+        Returns:
+            The result of `func`.
+
+        Raises:
+            CircuitOpenError: While the circuit breaker is open.
+            Exception: The last error once retries are exhausted, or any
+                non-retryable error immediately.
+        """
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                UPSTREAM_CALLS.labels(self.host, "rejected").inc()
+                raise CircuitOpenError(f"Circuit open for {self.host}")
+
+            # A half-open trial that is cancelled, or that fails locally, has
+            # no outcome and is given back to the breaker.
+            recorded = False
+            try:
+                await self.bucket.acquire()
+                result = await func(*args)
+            except Exception as e:
+                status = status_of(e)
+                if is_client_error(status):
+                    # Not an upstream health problem, e.g. an unknown ticker.
+                    self.breaker.record_success()
+                    recorded = True
+                    UPSTREAM_CALLS.labels(self.host, "error").inc()
+                    raise
+                if not is_upstream_failure(e):
+                    # A local error, e.g. parsing the response, says nothing
+                    # about the upstream.
+                    UPSTREAM_CALLS.labels(self.host, "error").inc()
+                    raise
+                self.breaker.record_failure()
+                recorded = True
+                CIRCUIT_OPEN.labels(self.host).set(self.breaker.state == "open")
+                self._adapt(throttled=status == 429)
+                UPSTREAM_CALLS.labels(
+                    self.host,
+                    str(status) if status is not None else type(e).__name__,
+                ).inc()
+                if (
+                    not is_retryable(e)
+                    or attempt >= self.max_retries
+                    or self.breaker.state == "open"
+                ):
+                    raise
+                error = e
+            else:
+                self.breaker.record_success()
+                recorded = True
+                CIRCUIT_OPEN.labels(self.host).set(0)
+                self._adapt(throttled=False)
+                UPSTREAM_CALLS.labels(self.host, "ok").inc()
+                return result
+            finally:
+                if not recorded:
+                    self.breaker.release()
+            await self._sleep(self._backoff(attempt, error))
+            attempt += 1
+
+
+_guards = {}
+
+
+def get_upstream(host, **kwargs):
+    """
+    Returns the process-wide UpstreamGuard of a host, creating it on first use.
+
+    Keyword arguments configure the guard when it is created and are ignored
+    afterwards, so every sensor talking to the same host shares one limiter.
+    """
+    guard = _guards.get(host)
+    if guard is None:
+        guard = _guards[host] = UpstreamGuard(host, **kwargs)
+    return guard
@@ -0,0 +1,212 @@
+"""
+Cryorithm™ | Managers | Cluster
+"""
+
+# MIT License
+#
+# Copyright © 2024 Joshua M. Dotson (contact@jmdots.com)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import threading
+import uuid
+import zlib
+
+from confluent_kafka import Consumer
+
+from cryorithm.managers.metrics import registry
+
+OWNED_TICKERS = registry.gauge(
+    "cryorithm_cluster_owned_tickers",
+    "Tickers owned by this node in cluster mode.",
+)
+REBALANCES = registry.counter(
+    "cryorithm_cluster_rebalances_total",
+    "Consumer-group rebalances of the control topic seen by this node.",
+    ["phase"],
+)
+
+
+def partition_for(ticker, partitions):
+    """Returns the control-topic partition that owns a ticker."""
+    return zlib.crc32(ticker.encode()) % partitions
+
+
+class ClusterManager:
+    """
+    Coordinates ticker ownership across cryorithm nodes via Kafka.
+
+    Every node joins the same consumer group on a control topic. Each ticker
+    maps to one partition of that topic, and a node owns exactly the tickers
+    of the partitions the group coordinator assigns to it. When nodes join or
+    leave, the group rebalances and ownership moves with the partitions, so
+    every ticker is fetched by one node at a time. The control topic should
+    have at least as many partitions as there will be nodes.
+
+    A background thread polls the consumer to keep the group membership
+    alive and to run the rebalance callbacks; no messages need to be produced
+    to the control topic.
+
+    Attributes:
+        tickers (list): The full ticker universe shared by all nodes.
+        topic (str): Name of the control topic.
+        group_id (str): Consumer group shared by all nodes.
+        member_id (str): Identifier of this node.
+    """
+
+    def __init__(
+        self,
+        bootstrap_servers,
+        topic,
+        tickers,
+        group_id="cryorithm-cluster",
+        member_id=None,
+        poll_interval=1.0,
+        on_change=None,
+        consumer_factory=Consumer,
+    ):
+        """
+        Initializes the manager without joining the group.
+
+        Args:
+            bootstrap_servers (str): Kafka bootstrap servers.
+            topic (str): Control topic whose partitions carry ownership.
+            tickers (list): The full ticker universe.
+            group_id (str, optional): Consumer group of the cluster
+                (default: 'cryorithm-cluster').
+            member_id (str, optional): Identifier of this node, used as the
+                Kafka client id. It is only a label, so a node that stops
+                leaves the group at once and its tickers move without
+                waiting for a session timeout (default: None, a random id).
+            poll_interval (float, optional): Seconds per consumer poll
+                (default: 1.0).
+            on_change (callable, optional): Called as
+                `on_change(added, removed)` with sets of tickers after every
+                ownership change, from the poll thread (default: None).
+            consumer_factory (callable, optional): Builds the consumer from a
+                config dict (default: confluent_kafka.Consumer).
+        """
+        self.tickers = list(tickers)
+        self.topic = topic
+        self.group_id = group_id
+        self.member_id = member_id or f"cryorithm-{uuid.uuid4().hex[:8]}"
+        self.poll_interval = poll_interval
+        self.on_change = on_change
+        self.consumer_config = {
+            "bootstrap.servers": bootstrap_servers,
+            "group.id": group_id,
+            "client.id": self.member_id,
+            "enable.auto.commit": False,
+            "partition.assignment.strategy": "roundrobin",
+        }
+        self._consumer_factory = consumer_factory
+        self._consumer = None
+        self._partitions = {}
+        self._owned = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_config(cls, config, tickers, **kwargs):
+        """Builds a manager from the application config."""
+        return cls(
+            config["kafka_bootstrap_servers"],
+            config["cluster_topic"],
+            tickers,
+            group_id=config["cluster_group"],
+            member_id=config.get("cluster_member_id"),
+            **kwargs,
+        )
+
+    def _map_tickers(self):
+        metadata = self._consumer.list_topics(self.topic, timeout=10)
+        topic = metadata.topics.get(self.topic)
+        if topic is None or not topic.partitions:
+            raise RuntimeError(f"Control topic {self.topic} has no partitions")
+        partitions = len(topic.partitions)
+        self._partitions = {}
+        for ticker in self.tickers:
+            self._partitions.setdefault(partition_for(ticker, partitions), []).append(
+                ticker,
+            )
+
+    def _set_owned(self, owned):
+        with self._lock:
+            added = owned - self._owned
+            removed = self._owned - owned
+            self._owned = owned
+        OWNED_TICKERS.set(len(owned))
+        if self.on_change is not None and (added or removed):
+            self.on_change(added, removed)
+
+    def _on_assign(self, consumer, partitions):
+        REBALANCES.labels("assign").inc()
+        owned = set()
+        for partition in partitions:
+            owned.update(self._partitions.get(partition.partition, ()))
+        self._set_owned(owned)
+
+    def _on_revoke(self, consumer, partitions):
+        REBALANCES.labels("revoke").inc()
+        revoked = set()
+        for partition in partitions:
+            revoked.update(self._partitions.get(partition.partition, ()))
+        with self._lock:
+            owned = self._owned - revoked
+        self._set_owned(owned)
+
+    def start(self):
+        """Joins the consumer group and starts the poll thread."""
+        self._consumer = self._consumer_factory(self.consumer_config)
+        self._map_tickers()
+        self._consumer.subscribe(
+            [self.topic],
+            on_assign=self._on_assign,
+            on_revoke=self._on_revoke,
+            on_lost=self._on_revoke,
+        )
+        self._thread = threading.Thread(
+            target=self._poll_forever,
+            name="cryorithm-cluster-poll",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _poll_forever(self):
+        while not self._stopped.is_set():
+            # Control messages are not used; polling drives the rebalances.
+            self._consumer.poll(self.poll_interval)
+
+    def owned_tickers(self):
+        """Returns the tickers currently owned by this node, in universe order."""
+        with self._lock:
+            owned = self._owned
+        return [ticker for ticker in self.tickers if ticker in owned]
+
+    def stop(self):
+        """Leaves the group, handing this node's tickers to the others."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._consumer is not None:
+            self._consumer.close()
+            self._consumer = None
+        self._set_owned(set())
@@ -28,6 +28,58 @@ import os
 import yaml
 from pathlib import Path
 
+DESTINATIONS = ("kafka", "log", "openai")
+
+# Fields kept from each sensor's payload, with their types (see
+# cryorithm.schemas.record); 'sensor_fields' overrides them, and null keeps
+# the full payload.
+DEFAULT_SENSOR_FIELDS = {
+    "stock": {
+        "shortName": "str",
+        "currency": "str",
+        "exchange": "str",
+        "currentPrice": "float",
+        "previousClose": "float",
+        "regularMarketChangePercent": "float",
+        "volume": "int",
+        "averageVolume": "int",
+        "marketCap": "int",
+        "trailingPE": "float",
+        "forwardPE": "float",
+        "trailingEps": "float",
+        "dividendYield": "float",
+        "beta": "float",
+        "fiftyTwoWeekHigh": "float",
+        "fiftyTwoWeekLow": "float",
+        "fiftyDayAverage": "float",
+        "twoHundredDayAverage": "float",
+        "recommendationKey": "str",
+        "targetMeanPrice": "float",
+    },
+}
+
+# Modules imported on demand by each destination and optional feature. The
+# CLI imports them lazily; `cryorithm imports` reports what they cost.
+DESTINATION_MODULES = {
+    "kafka": ("cryorithm.clients.kafka",),
+    "log": (),
+    "openai": ("cryorithm.clients.llm", "cryorithm.clients.openai"),
+}
+FEATURE_MODULES = {
+    "adaptive_polling": ("cryorithm.managers.polling",),
+    "fetch_cache": ("cryorithm.sensors.stock.cache",),
+    "llm_cache": ("cryorithm.clients.llm_cache",),
+    "cluster": ("cryorithm.managers.cluster",),
+    "history_path": ("cryorithm.stores.history",),
+    "signals": ("cryorithm.analysis.signals",),
+}
+
+# Router lane settings per destination; 'destination_options' overrides them.
+DEFAULT_DESTINATION_OPTIONS = {
+    "kafka": {"queue_size": 10000, "batch_size": 500, "overflow": "block"},
+    "openai": {"queue_size": 1000, "batch_size": 200, "overflow": "drop_oldest"},
+}
+
 
 class ConfigManager:
     def __init__(self):
@@ -36,8 +88,62 @@ class ConfigManager:
         self.config = {
             "kafka_bootstrap_servers": "localhost:9902",
             "kafka_topic": "cryorithm",
+            "kafka_linger_ms": 50,
+            "kafka_batch_size": 1048576,
+            "kafka_compression_type": "lz4",
+            "kafka_spool_path": None,
+            "kafka_spool_segment_bytes": 67108864,
+            "kafka_spool_segment_age": 1.0,
+            "message_format": "json",
             "ticker": "DASH",
             "destination": "log",
+            "destination_options": {},
+            "openai_model": "gpt-4o-mini",
+            "openai_concurrency": 8,
+            "llm_batch": True,
+            "llm_token_budget": 4000,
+            "llm_fields": None,
+            "llm_cache": False,
+            "llm_cache_path": None,
+            "llm_cache_entries": 1024,
+            "llm_cache_ttl": None,
+            "schedule_time": "* * * * *",
+            "fetch_concurrency": 16,
+            "job_concurrency": 16,
+            "schedule_options": {},
+            "sensor_fields": {},
+            "fetch_cache": False,
+            "fetch_cache_path": "~/.cache/cryorithm/fetch.sqlite",
+            "fetch_cache_entries": 10000,
+            "fetch_cache_groups": {},
+            "adaptive_polling": False,
+            "market_calendar": None,
+            "poll_intervals": {},
+            "poll_window": 10,
+            "poll_max_factor": 4.0,
+            "workers": 1,
+            "cluster": False,
+            "cluster_topic": "cryorithm-control",
+            "cluster_group": "cryorithm-cluster",
+            "cluster_member_id": None,
+            "upstream_rate": 10.0,
+            "upstream_burst": 20,
+            "upstream_max_retries": 3,
+            "upstream_failure_threshold": 5,
+            "upstream_reset_timeout": 30,
+            "snapshot_diff": True,
+            "diff_abs_tolerance": 0.0,
+            "diff_rel_tolerance": 0.0,
+            "diff_ignore_fields": [],
+            "diff_keyframe_interval": 3600,
+            "history_path": None,
+            "metrics_port": None,
+            "metrics_textfile": None,
+            "signals": False,
+            "signal_fields": ["currentPrice"],
+            "signal_window": 20,
+            "signal_zscore_threshold": 2.0,
+            "signal_freq": 60,
         }
 
     def load_yaml(self, path):
@@ -60,7 +166,31 @@ class ConfigManager:
 
     def load_env_vars(self):
         # Load environment variables but exclude 'api_key'
-        env_keys = ["kafka_bootstrap_servers", "kafka_topic", "ticker", "destination"]
+        env_keys = [
+            "kafka_bootstrap_servers",
+            "kafka_topic",
+            "kafka_linger_ms",
+            "kafka_batch_size",
+            "kafka_compression_type",
+            "kafka_spool_path",
+            "message_format",
+            "ticker",
+            "destination",
+            "schedule_time",
+            "fetch_concurrency",
+            "job_concurrency",
+            "market_calendar",
+            "fetch_cache_path",
+            "llm_cache_path",
+            "workers",
+            "cluster_topic",
+            "cluster_group",
+            "cluster_member_id",
+            "upstream_rate",
+            "history_path",
+            "metrics_port",
+            "metrics_textfile",
+        ]
         for key in env_keys:
             env_value = os.getenv(f"CRYORITHM_{key.upper()}")
             if env_value:
@@ -73,6 +203,17 @@ class ConfigManager:
             "destination",
             "kafka_bootstrap_servers",
             "kafka_topic",
+            "kafka_spool_path",
+            "schedule_time",
+            "fetch_concurrency",
+            "workers",
+            "cluster",
+            "cluster_member_id",
+            "adaptive_polling",
+            "fetch_cache",
+            "history_path",
+            "metrics_port",
+            "metrics_textfile",
         ]
         filtered_cli_args = {
             k: v for k, v in cli_args.items() if k in allowed_cli_keys and v is not None
@@ -82,3 +223,55 @@ class ConfigManager:
 
     def get_config(self):
         return self.config
+
+    def get_tickers(self):
+        # 'ticker' may be a single symbol, a comma-separated string or a YAML list.
+        tickers = self.config["ticker"]
+        if isinstance(tickers, str):
+            tickers = tickers.split(",")
+        return [str(t).strip().upper() for t in tickers if str(t).strip()]
+
+    def get_destinations(self):
+        # 'destination' may be a single name, a comma-separated string or a list.
+        destinations = self.config["destination"]
+        if isinstance(destinations, str):
+            destinations = destinations.split(",")
+        names = []
+        for name in destinations:
+            name = str(name).strip().lower()
+            if name not in DESTINATIONS:
+                raise ValueError(f"Unknown destination: {name}")
+            if name not in names:
+                names.append(name)
+        return names
+
+    def get_modules(self):
+        """
+        Lists the modules a scheduled run with this configuration imports.
+
+        Returns:
+            list: Module names, beginning with the pipeline's own.
+        """
+        # The default sensor loads yfinance on its first fetch.
+        modules = ["cryorithm.cli.main", "cryorithm.managers.job", "yfinance"]
+        for name in self.get_destinations():
+            modules.extend(DESTINATION_MODULES[name])
+        for key, names in FEATURE_MODULES.items():
+            if self.config.get(key):
+                modules.extend(names)
+        return modules
+
+    def get_sensor_fields(self, name):
+        """
+        Returns the field projection of a sensor kind, or None for the full
+        payload.
+        """
+        overrides = self.config.get("sensor_fields") or {}
+        if name in overrides:
+            return overrides[name] or None
+        return DEFAULT_SENSOR_FIELDS.get(name)
+
+    def get_destination_options(self, name):
+        options = dict(DEFAULT_DESTINATION_OPTIONS.get(name, {}))
+        options.update((self.config.get("destination_options") or {}).get(name, {}))
+        return options
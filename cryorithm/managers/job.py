@@ -24,10 +24,135 @@ Cryorithm™ | Managers | Job
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from apscheduler.events import EVENT_JOB_MISSED, EVENT_JOB_SUBMITTED
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 
-from cryorithm.managers.log import LogManager
+from cryorithm.managers.metrics import registry
+from cryorithm.transforms.diff import SnapshotDelta, SnapshotDiffer
+
+if TYPE_CHECKING:
+    # Only used in annotations; importing them would load pandas and
+    # confluent_kafka for every pipeline.
+    from cryorithm.analysis.signals import SignalEngine
+    from cryorithm.managers.cluster import ClusterManager
+    from cryorithm.managers.log import LogManager
+    from cryorithm.managers.polling import AdaptivePoller
+    from cryorithm.stores.history import HistoryStore
+
+JOB_SECONDS = registry.histogram(
+    "cryorithm_job_duration_seconds",
+    "Duration of sensor jobs, from fetch to the last forwarded record.",
+    ["sensor"],
+)
+JOBS = registry.counter(
+    "cryorithm_jobs_total",
+    "Sensor jobs by outcome.",
+    ["sensor", "status"],
+)
+JOB_LAST_SECONDS = registry.gauge(
+    "cryorithm_job_last_duration_seconds",
+    "Duration of the most recent job of each sensor.",
+    ["sensor"],
+)
+JOB_INTERVAL_SECONDS = registry.gauge(
+    "cryorithm_job_interval_seconds",
+    "Time between two scheduled fires of each sensor's cron trigger.",
+    ["sensor"],
+)
+JOB_OVERRUNS = registry.counter(
+    "cryorithm_job_overruns_total",
+    "Jobs that took longer than their cron interval.",
+    ["sensor"],
+)
+JOB_MISSED = registry.counter(
+    "cryorithm_job_missed_total",
+    "Scheduled cron fires that were missed.",
+    ["sensor"],
+)
+TICKS = registry.counter(
+    "cryorithm_ticks_total",
+    "Scheduled ticks of each sensor group by outcome: run, coalesced into a "
+    "pending run, dropped at max_instances or missed past the grace time.",
+    ["group", "outcome"],
+)
+RECORDS_FORWARDED = registry.counter(
+    "cryorithm_records_forwarded_total",
+    "Records forwarded to destinations by outcome.",
+    ["destination", "status"],
+)
+
+
+# Overlap and misfire policy of a sensor group; 'schedule_options' overrides
+# it for every group ('default') or one cron expression.
+DEFAULT_SCHEDULE_OPTIONS = {
+    "max_instances": 1,
+    "coalesce": True,
+    "misfire_grace_time": 30,
+    "jitter": 0,
+}
+
+
+def jitter_offset(key, jitter):
+    """
+    Returns a stable offset in [0, jitter) seconds for a key.
+
+    The same key always gets the same offset, so a group fires at a fixed
+    point of its interval, while different groups and hosts spread out.
+    """
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return jitter * int.from_bytes(digest, "big") / 2**64
+
+
+def cron_interval(trigger):
+    """
+    Returns the seconds between the next two fires of a cron trigger.
+    """
+    now = datetime.now(trigger.timezone)
+    first = trigger.get_next_fire_time(None, now)
+    second = trigger.get_next_fire_time(first, first)
+    return (second - first).total_seconds()
+
+
+class SensorGroup:
+    """
+    Sensors sharing one cron expression, run together as one tick.
+
+    Attributes:
+        name (str): Group name used in logs and metrics.
+        schedule_time (str): Cron expression shared by the sensors.
+        sensors (list): Sensors fetched on every tick.
+        options (dict): Effective schedule options, see
+            DEFAULT_SCHEDULE_OPTIONS.
+        offset (float): Deterministic jitter applied to every tick, seconds.
+        stats (dict): Tick counts by outcome.
+    """
+
+    def __init__(self, schedule_time, sensors, options, offset=0.0):
+        self.name = f"tick[{schedule_time}]"
+        self.schedule_time = schedule_time
+        self.sensors = list(sensors)
+        self.options = options
+        self.offset = offset
+        self.running = 0
+        self.pending = False
+        self.last_fire = None
+        self.stats = {"run": 0, "coalesced": 0, "dropped": 0, "missed": 0}
+
+    def count(self, outcome, n=1):
+        self.stats[outcome] += n
+        TICKS.labels(self.name, outcome).inc(n)
+
+    def __repr__(self):
+        return f"SensorGroup({self.schedule_time!r}, sensors={len(self.sensors)})"
 
 
 class JobManager:
@@ -45,9 +170,35 @@ class JobManager:
             for logging messages related to job scheduling and execution.
         scheduler (AsyncIOScheduler): An instance of the APScheduler for
             managing cron-based job scheduling.
+        differ (SnapshotDiffer): Reduces fetched snapshots to field-level
+            deltas, or None to forward every snapshot in full.
+        destinations (list): Async callables that receive every emitted record.
+        history (HistoryStore): Persists every fetched snapshot in full, or
+            None to keep no history.
+        analyzer (SignalEngine): Computes signals from the history after each
+            job, or None to skip analysis.
+        cluster (ClusterManager): Limits batch sensors to the tickers owned
+            by this node, or None to fetch every configured ticker.
+        poller (AdaptivePoller): Skips tickers that are not due given the
+            market session and their change rate, or None to fetch every
+            ticker on every tick.
+        groups (list): SensorGroup per cron expression, once jobs are started.
     """
 
-    def __init__(self, sensors: list, log_manager: LogManager):
+    def __init__(
+        self,
+        sensors: list,
+        log_manager: LogManager,
+        differ: SnapshotDiffer = None,
+        destinations: list = None,
+        history: HistoryStore = None,
+        analyzer: SignalEngine = None,
+        cluster: ClusterManager = None,
+        schedule_options: dict = None,
+        max_concurrent_jobs: int = None,
+        jitter_seed: str = "",
+        poller: AdaptivePoller = None,
+    ):
         """
         Initializes the JobManager with sensor data and a LogManager instance.
 
@@ -55,44 +206,226 @@ class JobManager:
             sensors (list): A list of sensor objects.
             log_manager (LogManager): An instance of the LogManager class
                 for logging purposes.
+            differ (SnapshotDiffer, optional): Snapshot diff engine
+                (default: None).
+            destinations (list, optional): Async callables that receive each
+                emitted record as a dict (default: None).
+            history (HistoryStore, optional): Columnar snapshot history
+                (default: None).
+            analyzer (SignalEngine, optional): Signal engine; requires
+                `history` (default: None).
+            cluster (ClusterManager, optional): Cluster ticker ownership; requires
+                batch sensors (default: None).
+            schedule_options (dict, optional): Overrides of
+                DEFAULT_SCHEDULE_OPTIONS keyed by cron expression, or
+                'default' for every group (default: None).
+            max_concurrent_jobs (int, optional): Sensor jobs allowed to run at
+                once across all groups (default: None, unbounded).
+            jitter_seed (str, optional): Mixed into the jitter of every group,
+                e.g. the host name, so hosts spread out too (default: '').
+            poller (AdaptivePoller, optional): Adaptive per-ticker polling
+                (default: None).
         """
 
         self.sensors = sensors
         self.log_manager = log_manager
+        self.differ = differ
+        self.destinations = destinations or []
+        self.history = history
+        self.analyzer = analyzer
+        self.cluster = cluster
+        self.poller = poller
+        # Without a differ every snapshot is emitted in full; the poller
+        # still needs to know which tickers moved.
+        self._change_detector = (
+            SnapshotDiffer(keyframe_interval=None)
+            if poller is not None and differ is None
+            else None
+        )
+        self._owned = set()
         self.scheduler = AsyncIOScheduler()
+        self.schedule_options = schedule_options or {}
+        self.jitter_seed = jitter_seed
+        self.groups = []
+        self._slots = (
+            asyncio.Semaphore(max_concurrent_jobs) if max_concurrent_jobs else None
+        )
+        self._intervals = {}
+        self._groups = {}
+
+    def _group_options(self, schedule_time):
+        options = dict(DEFAULT_SCHEDULE_OPTIONS)
+        for key in ("default", schedule_time):
+            overrides = self.schedule_options.get(key) or {}
+            unknown = set(overrides) - set(DEFAULT_SCHEDULE_OPTIONS)
+            if unknown:
+                raise ValueError(
+                    f"Unknown schedule option(s) for {key}: {sorted(unknown)}",
+                )
+            options.update(overrides)
+        if int(options["max_instances"]) < 1:
+            raise ValueError("max_instances must be at least 1")
+        return options
 
     async def start_jobs(self):
         """
-        Schedules jobs for each sensor based on their cron expressions.
+        Schedules one job per cron expression for the sensors sharing it.
 
-        This method iterates through the list of sensors and schedules an
-        asynchronous job using APScheduler for each sensor. The job is defined
-        to call the `job` function with the sensor as an argument at the
-        specified cron schedule time. Logs a message for each scheduled job
-        using the LogManager.
+        Sensors are grouped by `schedule_time`, so every fire of a cron
+        expression is one tick that runs the group's sensors together rather
+        than one APScheduler job per sensor. Each tick waits for the group's
+        deterministic jitter offset first. Logs a message for each scheduled
+        group using the LogManager.
         """
 
+        by_schedule = {}
         for sensor in self.sensors:
-            trigger = CronTrigger(cron=sensor.schedule_time)
-            self.scheduler.add_job(self.job, trigger, args=[sensor])
+            by_schedule.setdefault(sensor.schedule_time, []).append(sensor)
+
+        for schedule_time, sensors in by_schedule.items():
+            trigger = CronTrigger.from_crontab(schedule_time)
+            interval = cron_interval(trigger)
+            options = self._group_options(schedule_time)
+            # An offset beyond the interval would push ticks into the next one.
+            jitter = min(float(options["jitter"]), interval)
+            group = SensorGroup(
+                schedule_time,
+                sensors,
+                options,
+                offset=jitter_offset(f"{self.jitter_seed}:{schedule_time}", jitter),
+            )
+            # Overlapping ticks are coalesced or dropped by `tick` itself; one
+            # extra instance lets APScheduler hand it the fire to decide.
+            scheduled_job = self.scheduler.add_job(
+                self.tick,
+                trigger,
+                args=[group],
+                max_instances=int(options["max_instances"]) + 1,
+                coalesce=True,
+                misfire_grace_time=int(options["misfire_grace_time"]),
+            )
+            self.groups.append(group)
+            self._groups[scheduled_job.id] = (group, trigger)
+            for sensor in sensors:
+                self._intervals[sensor.name] = interval
+                JOB_INTERVAL_SECONDS.labels(sensor.name).set(interval)
             self.log_manager.info(
-                f"Scheduled job for {sensor.name} with cron: {sensor.schedule_time}",
+                f"Scheduled {len(sensors)} sensor(s) with cron: {schedule_time} "
+                f"(jitter {group.offset:.1f}s)",
             )
 
-        await self.scheduler.start()
+        self.scheduler.add_listener(self._on_job_missed, EVENT_JOB_MISSED)
+        self.scheduler.add_listener(self._on_job_submitted, EVENT_JOB_SUBMITTED)
+        self.scheduler.start()
+
+    def _on_job_missed(self, event):
+        group, _ = self._groups[event.job_id]
+        group.count("missed")
+        for sensor in group.sensors:
+            JOB_MISSED.labels(sensor.name).inc()
+        self.log_manager.warning(
+            f"Missed scheduled run of {group.name} at {event.scheduled_run_time}",
+        )
+
+    def _on_job_submitted(self, event):
+        # APScheduler merges fires missed while the event loop was blocked
+        # into one run without reporting them; count them from the trigger.
+        group, trigger = self._groups[event.job_id]
+        fire = event.scheduled_run_times[-1]
+        skipped = 0
+        if group.last_fire is not None:
+            next_fire = trigger.get_next_fire_time(group.last_fire, group.last_fire)
+            while next_fire is not None and next_fire < fire:
+                skipped += 1
+                next_fire = trigger.get_next_fire_time(next_fire, next_fire)
+        group.last_fire = fire
+        if skipped:
+            group.count("coalesced", skipped)
+
+    async def tick(self, group):
+        """
+        Runs one scheduled tick of a sensor group.
+
+        While `max_instances` ticks of the group are still running, a new
+        tick is either coalesced into a single pending run that starts as
+        soon as one finishes (`coalesce`), or dropped. Sensor jobs of every
+        group share the `max_concurrent_jobs` bound.
+
+        Args:
+            group (SensorGroup): The group to run.
+        """
+
+        if group.running >= int(group.options["max_instances"]):
+            if group.options["coalesce"]:
+                # Every overlapping fire is merged into one pending run.
+                group.pending = True
+                group.count("coalesced")
+            else:
+                group.count("dropped")
+                self.log_manager.warning(
+                    f"Dropped tick of {group.name}: "
+                    f"{group.running} tick(s) still running",
+                )
+            return
+
+        group.running += 1
+        try:
+            if group.offset:
+                await asyncio.sleep(group.offset)
+            while True:
+                group.count("run")
+                await asyncio.gather(
+                    *(self._bounded_job(sensor) for sensor in group.sensors),
+                )
+                if not group.pending:
+                    break
+                group.pending = False
+        finally:
+            group.running -= 1
+
+    async def _bounded_job(self, sensor):
+        if self._slots is None:
+            return await self.job(sensor)
+        async with self._slots:
+            return await self.job(sensor)
+
+    def get_stats(self):
+        """
+        Returns tick counts of every sensor group.
+
+        Returns:
+            dict: Keyed by group name, with the number of sensors, the jitter
+                offset and the run/coalesced/dropped/missed tick counts.
+        """
+        return {
+            group.name: dict(
+                group.stats,
+                sensors=len(group.sensors),
+                jitter=round(group.offset, 3),
+            )
+            for group in self.groups
+        }
 
-    @staticmethod
     async def job(self, sensor):
         """
         Asynchronous job function to fetch data from a sensor.
 
         This function attempts to fetch data from the provided sensor using
-        the sensor's `fetch_data` method. If data is successfully fetched,
-        it logs the data using the LogManager and allows for further processing
-        or forwarding as needed by your application.
+        the sensor's `fetch_data` method. Each fetched snapshot is reduced to a
+        delta by the SnapshotDiffer, if one is configured; unchanged tickers
+        are skipped entirely. The remaining records are logged using the
+        LogManager and forwarded to every destination. Full snapshots are
+        appended to the history store, if one is configured, off the event
+        loop. With a signal engine configured, the signals of the latest time
+        bin are then computed for the fetched tickers and forwarded as well.
+
+        With a poller configured, only tickers that are due are fetched, and
+        whether each fetched snapshot changed is fed back to the poller.
 
-        In case of any exceptions during data fetching, it logs an error message
-        using the LogManager.
+        Batch sensors report per-ticker failures alongside their results; each
+        of those is logged as a warning without failing the whole job. In case
+        of any exceptions during data fetching, it logs an error message using
+        the LogManager.
 
         Args:
             sensor: The sensor object for which to fetch data.
@@ -101,16 +434,187 @@ class JobManager:
             None
         """
 
+        started = time.perf_counter()
+        status = "ok"
         try:
-            data = await sensor.fetch_data()
-            if data:
-                self.log_manager.info(f"Data fetched from {sensor.name}: {data}")
-                # Further process or forward this data according to your application
-                # needs.
+            polled_at = time.time()
+            tickers = self._tickers_for(sensor, polled_at)
+            if tickers is not None and not tickers:
+                status = "idle"
+                return
+            if tickers is not None and hasattr(sensor, "tickers"):
+                data = await sensor.fetch_data(tickers)
+            else:
+                data = await sensor.fetch_data()
+            fetched_at = time.time()
+            snapshots = list(self._iter_snapshots(sensor, data))
+            deltas = await self.process(sensor.name, snapshots, fetched_at)
+
+            if self.poller is not None:
+                for ticker, snapshot in snapshots:
+                    if self._change_detector is not None:
+                        delta = self._change_detector.diff(ticker, snapshot)
+                    else:
+                        delta = deltas.get(ticker)
+                    # A keyframe tells nothing about whether the ticker moved.
+                    if delta is not None and delta.keyframe:
+                        changed = None
+                    else:
+                        changed = bool(delta)
+                    self.poller.observe(ticker, changed, polled_at)
+
+            for ticker, error in getattr(data, "errors", {}).items():
+                self.log_manager.warning(
+                    f"Error fetching {ticker} from {sensor.name}: {str(error)}",
+                )
 
         except Exception as e:
+            status = "error"
             self.log_manager.error(f"Error fetching data from {sensor.name}: {str(e)}")
 
+        finally:
+            self._record_job(sensor, status, time.perf_counter() - started)
+
+    async def process(self, source, snapshots, fetched_at, store=True):
+        """
+        Runs fetched snapshots through the history, diff, log, destination
+        and analysis stages.
+
+        This is the part of `job` after the fetch, shared with replays of
+        stored snapshots.
+
+        Args:
+            source (str): Name of the sensor or replay source, for logs.
+            snapshots (list): (ticker, snapshot) pairs fetched together.
+            fetched_at (float): Epoch seconds of the fetch; used as the delta
+                and signal timestamp.
+            store (bool, optional): Append the snapshots to the history store
+                (default: True). Replays from the history store pass False.
+
+        Returns:
+            dict: Emitted SnapshotDelta by ticker; unchanged tickers are
+                absent.
+        """
+        if store and self.history is not None and snapshots:
+            await asyncio.to_thread(
+                self.history.append_many,
+                [(ticker, fetched_at, snapshot) for ticker, snapshot in snapshots],
+            )
+
+        unchanged = 0
+        deltas = {}
+        for ticker, snapshot in snapshots:
+            if self.differ is not None:
+                delta = self.differ.diff(ticker, snapshot, now=fetched_at)
+            else:
+                # Records are copied into a plain dict for the encoders.
+                delta = SnapshotDelta(
+                    ticker,
+                    dict(snapshot),
+                    keyframe=True,
+                    timestamp=fetched_at,
+                )
+            if not delta:
+                unchanged += 1
+                continue
+            deltas[ticker] = delta
+
+            record = delta.to_dict()
+            # The record is passed as structured data rather than formatted
+            # into the message, so serializing it is left to the log sink.
+            self.log_manager.info(
+                "Data fetched from {sensor}",
+                sensor=source,
+                event="data",
+                data=record,
+            )
+            await self.forward(record)
+
+        if unchanged:
+            self.log_manager.debug(
+                f"{unchanged} unchanged snapshot(s) skipped for {source}",
+            )
+
+        if self.analyzer is not None and self.history is not None and snapshots:
+            signals = await asyncio.to_thread(
+                self.analyzer.latest_signals,
+                self.history,
+                [ticker for ticker, _ in snapshots],
+                fetched_at,
+            )
+            for signal in signals:
+                self.log_manager.info(
+                    "Signal from {sensor}",
+                    sensor=source,
+                    event="signal",
+                    data=signal,
+                )
+                await self.forward(signal)
+        return deltas
+
+    def _tickers_for(self, sensor, now):
+        # None fetches the sensor's own tickers; a list restricts the fetch.
+        tickers = self._owned_tickers() if self.cluster is not None else None
+        if self.poller is not None:
+            if tickers is None:
+                tickers = getattr(sensor, "tickers", None) or [sensor.ticker]
+            tickers = self.poller.due(tickers, now)
+        return tickers
+
+    def _owned_tickers(self):
+        tickers = self.cluster.owned_tickers()
+        owned = set(tickers)
+        # Another node may have sent deltas for a ticker while it was away, so
+        # a ticker regained later must start again from a keyframe.
+        if self.differ is not None:
+            for ticker in self._owned - owned:
+                self.differ.reset(ticker)
+        self._owned = owned
+        return tickers
+
+    def _record_job(self, sensor, status, duration):
+        JOBS.labels(sensor.name, status).inc()
+        JOB_SECONDS.labels(sensor.name).observe(duration)
+        JOB_LAST_SECONDS.labels(sensor.name).set(duration)
+        interval = self._intervals.get(sensor.name)
+        if interval is not None and duration > interval:
+            JOB_OVERRUNS.labels(sensor.name).inc()
+            self.log_manager.warning(
+                f"Job for {sensor.name} took {duration:.1f}s, longer than its "
+                f"{interval:.0f}s cron interval",
+            )
+
+    @staticmethod
+    def _iter_snapshots(sensor, data):
+        # Batch sensors return a BatchResult; single sensors return one snapshot.
+        results = getattr(data, "results", None)
+        if results is not None:
+            yield from results.items()
+        elif data:
+            yield sensor.ticker, data
+
+    async def forward(self, record):
+        """
+        Sends a record to every destination.
+
+        A failing destination is logged and does not prevent delivery to the
+        others.
+
+        Args:
+            record (dict): The record to forward.
+        """
+
+        for destination in self.destinations:
+            try:
+                await destination(record)
+                RECORDS_FORWARDED.labels(repr(destination), "ok").inc()
+            except Exception as e:
+                RECORDS_FORWARDED.labels(repr(destination), "error").inc()
+                self.log_manager.error(
+                    f"Error forwarding {record.get('ticker')} to {destination}: "
+                    f"{str(e)}",
+                )
+
     async def run_continuously(self):
         """
         Continuously monitors the scheduler for scheduled jobs.
@@ -119,4 +623,5 @@ class JobManager:
         them to execute asynchronously.
         """
 
-        await self.scheduler.wait_closed()
+        while self.scheduler.running:
+            await asyncio.sleep(1)
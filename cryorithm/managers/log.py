@@ -24,11 +24,264 @@ Cryorithm™ | Managers | Log
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import json
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+
 from loguru import logger
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+# Loguru's default format, followed by the structured extra fields.
+TEXT_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | "
+    "<level>{level: <8}</level> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - "
+    "<level>{message}</level> | {extra}"
+)
+
+_SIZE_UNITS = {"B": 1, "KB": 1000, "MB": 1000**2, "GB": 1000**3}
+_DURATION_UNITS = {
+    "S": 1,
+    "SEC": 1,
+    "SECOND": 1,
+    "M": 60,
+    "MIN": 60,
+    "MINUTE": 60,
+    "H": 3600,
+    "HR": 3600,
+    "HOUR": 3600,
+    "D": 86400,
+    "DAY": 86400,
+    "W": 604800,
+    "WEEK": 604800,
+}
+_PERIODS = {"HOURLY": 3600, "DAILY": 86400, "WEEKLY": 604800}
+
+
+def parse_size(size):
+    """
+    Converts a size such as '10 MB' to a number of bytes.
+    """
+    if isinstance(size, int):
+        return size
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMG]?B)\s*", str(size).upper())
+    if not match:
+        raise ValueError(f"Unsupported size-based rotation: {size!r}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+def parse_rotation(rotation):
+    """
+    Converts a rotation such as '10 MB', '12 hours' or 'daily' to a size or
+    an age limit.
+
+    Returns:
+        tuple: The size in bytes and the age in seconds at which a file is
+        rotated; one of them is None.
+
+    Raises:
+        ValueError: When the rotation is neither a size nor a duration.
+    """
+    if isinstance(rotation, int):
+        return rotation, None
+    text = str(rotation).strip().upper()
+    if text in _PERIODS:
+        return None, _PERIODS[text]
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*([A-Z]+?)S?", text)
+    if match and match.group(2) in _DURATION_UNITS:
+        return None, float(match.group(1)) * _DURATION_UNITS[match.group(2)]
+    try:
+        return parse_size(rotation), None
+    except ValueError:
+        raise ValueError(
+            f"Unsupported rotation for JSON logs: {rotation!r}; use a size such "
+            "as '10 MB', a duration such as '12 hours', or 'hourly', 'daily' "
+            "or 'weekly'",
+        ) from None
+
+
+class AsyncJsonSink:
+    """
+    Queue-backed loguru sink that writes JSON lines from a background thread.
+
+    The caller only copies the record onto a bounded queue; JSON encoding of
+    the message and its `extra` fields, file writes and rotation all happen on
+    the writer thread, in batches. Files are rotated by size or by age, the
+    age counting from when the writer opened the file. When the queue is
+    full, the `overflow` policy either drops the record (counted in
+    `dropped`) or blocks the caller until there is room.
+
+    Attributes:
+        path (Path): Location of the JSON lines file.
+        rotation (int): File size in bytes at which the file is rotated, or
+            None.
+        rotation_age (float): File age in seconds at which the file is
+            rotated, or None.
+        overflow (str): 'drop' or 'block'.
+        dropped (int): Records dropped because the queue was full.
+    """
+
+    def __init__(
+        self,
+        path,
+        rotation="10 MB",
+        queue_size=10000,
+        overflow="drop",
+        batch_size=512,
+        flush_interval=0.5,
+    ):
+        if overflow not in ("drop", "block"):
+            raise ValueError("overflow must be 'drop' or 'block'")
+
+        self.path = Path(path).expanduser()
+        self.rotation, self.rotation_age = parse_rotation(rotation)
+        self.overflow = overflow
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="cryorithm-log-writer",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def __call__(self, message):
+        record = message.record
+        item = (
+            record["time"].isoformat(),
+            record["level"].name,
+            record["message"],
+            record["name"],
+            record["function"],
+            record["line"],
+            dict(record["extra"]),
+        )
+        if self.overflow == "block":
+            self._queue.put(item)
+            return
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    @staticmethod
+    def _encode(item):
+        timestamp, level, message, name, function, line, extra = item
+        entry = {
+            "time": timestamp,
+            "level": level,
+            "message": message,
+            "logger": name,
+            "function": function,
+            "line": line,
+        }
+        entry.update(extra)
+        if orjson is not None:
+            return orjson.dumps(
+                entry,
+                default=str,
+                option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS,
+            )
+        return (json.dumps(entry, default=str) + "\n").encode("utf-8")
+
+    def _drain(self, block):
+        batch = []
+        try:
+            batch.append(self._queue.get(timeout=self.flush_interval if block else 0))
+            while len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _run(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        f = self.path.open("ab")
+        opened_at = time.monotonic()
+        try:
+            while not (self._stopped.is_set() and self._queue.empty()):
+                batch = self._drain(block=True)
+                if not batch:
+                    continue
+                f.write(b"".join([self._encode(item) for item in batch]))
+                f.flush()
+                if self._due(f.tell(), time.monotonic() - opened_at):
+                    f.close()
+                    os.replace(self.path, self._reserve_rotated_path())
+                    f = self.path.open("ab")
+                    opened_at = time.monotonic()
+        finally:
+            f.close()
+
+    def _reserve_rotated_path(self):
+        # Several rotations can happen within a second, so the name gets a
+        # sequence suffix; creating it exclusively means none is overwritten.
+        stem = f"{self.path.name}.{time.strftime('%Y%m%d-%H%M%S')}"
+        sequence = 0
+        while True:
+            name = stem if not sequence else f"{stem}.{sequence}"
+            path = self.path.with_name(name)
+            try:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return path
+            except FileExistsError:
+                sequence += 1
+
+    def _due(self, size, age):
+        if self.rotation is not None and size >= self.rotation:
+            return True
+        return self.rotation_age is not None and age >= self.rotation_age
+
+    def stop(self, timeout=10.0):
+        """Writes the remaining queued records and stops the writer thread."""
+        self._stopped.set()
+        self._thread.join(timeout)
+
+
+class LevelSampler:
+    """
+    Loguru filter that samples high-volume data events per level.
+
+    Records whose `event` extra equals `event` are kept with the probability
+    configured for their level; all other records always pass.
+    """
+
+    def __init__(self, rates, event="data", rng=random.random):
+        self.rates = {level.upper(): float(rate) for level, rate in rates.items()}
+        self.event = event
+        self._rng = rng
+
+    def __call__(self, record):
+        if record["extra"].get("event") != self.event:
+            return True
+        rate = self.rates.get(record["level"].name, 1.0)
+        return rate >= 1.0 or self._rng() < rate
+
 
 class LogManager:
-    def __init__(self, sink=None, level="DEBUG", rotation="10 MB"):
+    def __init__(
+        self,
+        sink=None,
+        level="DEBUG",
+        rotation="10 MB",
+        structured=False,
+        queue_size=10000,
+        overflow="drop",
+        sampling=None,
+    ):
         """
         Initializes the LogManager with logging configuration.
 
@@ -39,15 +292,51 @@ class LogManager:
             level (str, optional): Logging level (default: 'DEBUG').
             rotation (str, optional): Log rotation configuration for the log file
                 (default: '10 MB').
+            structured (bool, optional): Write JSON lines to `sink` through a
+                bounded queue and a background writer thread, instead of
+                writing synchronously (default: False).
+            queue_size (int, optional): Capacity of the structured log queue
+                (default: 10000).
+            overflow (str, optional): 'drop' or 'block' when the structured log
+                queue is full (default: 'drop').
+            sampling (dict, optional): Fraction of `event="data"` records kept
+                per level, e.g. {'DEBUG': 0.1} (default: None, keep all).
         """
-        self.level = (level,)
+        self.level = level
         self._sink = sink  # Use _ for private attributes
         self._rotation = rotation
+        self._structured = structured
+        self._async_sink = None
+        self._filter = LevelSampler(sampling) if sampling else None
 
-        if self._sink:
-            logger.add(sink=self._sink, level=self.level, rotation=self._rotation)
+        if self._sink and self._structured:
+            self._async_sink = AsyncJsonSink(
+                self._sink,
+                rotation=self._rotation,
+                queue_size=queue_size,
+                overflow=overflow,
+            )
+            self._handler_id = logger.add(
+                self._async_sink,
+                level=self.level,
+                format="{message}",
+                filter=self._filter,
+            )
+        elif self._sink:
+            self._handler_id = logger.add(
+                sink=self._sink,
+                level=self.level,
+                rotation=self._rotation,
+                format=TEXT_FORMAT,
+                filter=self._filter,
+            )
         else:
-            logger.add(level=self.level)
+            self._handler_id = logger.add(
+                sys.stderr,
+                level=self.level,
+                format=TEXT_FORMAT,
+                filter=self._filter,
+            )
 
         logger.info("LogManager activated.", extra=self.get_config(), event="startup")
 
@@ -59,24 +348,44 @@ class LogManager:
             "level": self.level,
             "sink": self._sink,
             "rotation": self._rotation,
+            "structured": self._structured,
         }
 
+    def get_stats(self):
+        """
+        Returns a dictionary containing the structured log queue counters.
+        """
+        if self._async_sink is None:
+            return {"queued": 0, "dropped": 0}
+        return {
+            "queued": self._async_sink._queue.qsize(),
+            "dropped": self._async_sink.dropped,
+        }
+
+    def close(self):
+        """
+        Removes the handler and flushes any queued structured records.
+        """
+        logger.remove(self._handler_id)
+        if self._async_sink is not None:
+            self._async_sink.stop()
+
     def debug(self, message, *args, **kwargs):
         """Logs a debug message."""
-        logger.debug(message, *args, **kwargs)
+        logger.opt(depth=1).debug(message, *args, **kwargs)
 
     def info(self, message, *args, **kwargs):
         """Logs an informational message."""
-        logger.info(message, *args, **kwargs)
+        logger.opt(depth=1).info(message, *args, **kwargs)
 
     def warning(self, message, *args, **kwargs):
         """Logs a warning message."""
-        logger.warning(message, *args, **kwargs)
+        logger.opt(depth=1).warning(message, *args, **kwargs)
 
     def error(self, message, *args, **kwargs):
         """Logs an error message."""
-        logger.error(message, *args, **kwargs)
+        logger.opt(depth=1).error(message, *args, **kwargs)
 
     def critical(self, message, *args, **kwargs):
         """Logs a critical severity message."""
-        logger.critical(message, *args, **kwargs)
+        logger.opt(depth=1).critical(message, *args, **kwargs)
@@ -0,0 +1,435 @@
+"""
+Cryorithm™ | Managers | Metrics
+"""
+
+# MIT License
+#
+# Copyright © 2024 Joshua M. Dotson (contact@jmdots.com)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values, **kwargs):
+        """
+        Returns the child metric for a set of label values.
+        """
+        if kwargs:
+            values = tuple(str(kwargs[name]) for name in self.labelnames)
+        else:
+            values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _default(self):
+        # Metrics without labels have a single, unlabelled child.
+        return self.labels()
+
+    def _items(self):
+        # Children may be added by other threads while rendering.
+        with self._lock:
+            return list(self._children.items())
+
+    def collect(self):
+        """Returns the state of every child keyed by label values."""
+        return {values: child.state() for values, child in self._items()}
+
+    def merge(self, states):
+        """Adds the states returned by `collect()` of another process."""
+        for values, state in states.items():
+            self.labels(*values).merge(state)
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for values, child in sorted(self._items()):
+            lines.extend(child.render(self.name, self.labelnames, values))
+        return lines
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value):
+        self.value = float(value)
+
+    def state(self):
+        return self.value
+
+    def merge(self, state):
+        self.inc(state)
+
+    def render(self, name, labelnames, values):
+        return [f"{name}{_format_labels(labelnames, values)} {self.value!r}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount=1.0):
+        self._default().inc(amount)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def set(self, value):
+        self._default().set(value)
+
+    def inc(self, amount=1.0):
+        self._default().inc(amount)
+
+    def dec(self, amount=1.0):
+        self._default().dec(amount)
+
+
+class _Buckets:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def time(self):
+        return _Timer(self)
+
+    def state(self):
+        with self._lock:
+            return list(self.counts), self.sum
+
+    def merge(self, state):
+        counts, total = state
+        with self._lock:
+            self.counts = [a + b for a, b in zip(self.counts, counts)]
+            self.sum += total
+
+    def render(self, name, labelnames, values):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            labels = _format_labels(labelnames, values, [("le", le)])
+            lines.append(f"{name}_bucket{labels} {cumulative}")
+        labels = _format_labels(labelnames, values)
+        lines.append(f"{name}_sum{labels} {self.sum!r}")
+        lines.append(f"{name}_count{labels} {cumulative}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("_target", "_started")
+
+    def __init__(self, target):
+        self._target = target
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._target.observe(time.perf_counter() - self._started)
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _Buckets(self.buckets)
+
+    def observe(self, value):
+        self._default().observe(value)
+
+    def time(self):
+        """Context manager that observes the duration of its block."""
+        return self._default().time()
+
+
+class MetricsRegistry:
+    """
+    Collection of named metrics rendered in the Prometheus text format.
+
+    Registering a name twice returns the existing metric, so modules can
+    declare their metrics at import time without coordinating.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, documentation, labelnames, **kwargs)
+                self._metrics[name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(
+            Histogram,
+            name,
+            documentation,
+            labelnames,
+            buckets=buckets,
+        )
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def collect(self):
+        """
+        Returns a picklable snapshot of every metric.
+
+        Worker processes send snapshots to their parent, which merges them
+        into one registry with `merge()`.
+        """
+        return {
+            name: (
+                metric.kind,
+                metric.documentation,
+                metric.labelnames,
+                getattr(metric, "buckets", None),
+                metric.collect(),
+            )
+            for name, metric in list(self._metrics.items())
+        }
+
+    def merge(self, snapshot, gauge_labels=None):
+        """
+        Adds a snapshot returned by `collect()` to this registry.
+
+        Counters and histograms are summed. Gauges are summed too, unless
+        `gauge_labels` is given: its label names and values are then added to
+        the snapshot's gauges, so values of different processes, such as a
+        job interval, stay apart instead of adding up.
+
+        Args:
+            snapshot (dict): Snapshot returned by `collect()`.
+            gauge_labels (dict, optional): Extra labels of the snapshot's
+                gauges, e.g. {'worker': 'worker-0'} (default: None).
+        """
+        for name, (
+            kind,
+            documentation,
+            labelnames,
+            buckets,
+            states,
+        ) in snapshot.items():
+            if kind == "gauge" and gauge_labels:
+                labelnames = tuple(labelnames) + tuple(gauge_labels)
+                extra = tuple(str(value) for value in gauge_labels.values())
+                states = {values + extra: state for values, state in states.items()}
+            if kind == "histogram":
+                metric = self.histogram(name, documentation, labelnames, buckets)
+            else:
+                metric = getattr(self, kind)(name, documentation, labelnames)
+            metric.merge(states)
+
+    def render(self):
+        """Returns all metrics in the Prometheus text exposition format."""
+        lines = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].render())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry used by the instrumented clients, sensors and managers.
+registry = MetricsRegistry()
+
+
+class MetricsManager:
+    """
+    Exports a MetricsRegistry over HTTP and/or to a textfile.
+
+    The HTTP endpoint serves `/metrics` in the Prometheus text format from a
+    background thread. The textfile, for node_exporter's textfile collector,
+    is rewritten atomically every `textfile_interval` seconds and on `stop()`.
+
+    Attributes:
+        registry (MetricsRegistry): The exported registry.
+        port (int): HTTP port, or None to disable the endpoint.
+        textfile (Path): Textfile path, or None to disable it.
+    """
+
+    def __init__(
+        self,
+        registry=registry,
+        port=None,
+        host="127.0.0.1",
+        textfile=None,
+        textfile_interval=15.0,
+    ):
+        self.registry = registry
+        self.port = port
+        self.host = host
+        self.textfile = Path(textfile).expanduser() if textfile else None
+        self.textfile_interval = textfile_interval
+        self._server = None
+        self._threads = []
+        self._stopped = threading.Event()
+
+    def start(self):
+        """Starts the HTTP endpoint and textfile writer, as configured."""
+        if self.port is not None:
+            self._server = ThreadingHTTPServer(
+                (self.host, self.port),
+                self._handler_class(),
+            )
+            self.port = self._server.server_address[1]
+            self._start_thread(self._server.serve_forever, "cryorithm-metrics-http")
+        if self.textfile is not None:
+            self._start_thread(self._write_periodically, "cryorithm-metrics-file")
+
+    def _start_thread(self, target, name):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _handler_class(self):
+        registry = self.registry
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return MetricsHandler
+
+    def write_textfile(self):
+        """Atomically rewrites the textfile with the current metrics."""
+        self.textfile.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.textfile.with_name(f".{self.textfile.name}.tmp")
+        tmp_path.write_text(self.registry.render())
+        os.replace(tmp_path, self.textfile)
+
+    def _write_periodically(self):
+        while not self._stopped.wait(self.textfile_interval):
+            self.write_textfile()
+
+    def stop(self):
+        """Stops the exporters, writing the textfile one last time."""
+        self._stopped.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        for thread in self._threads:
+            thread.join()
+        if self.textfile is not None:
+            self.write_textfile()
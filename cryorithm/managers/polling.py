@@ -0,0 +1,360 @@
+"""
+Cryorithm™ | Managers | Polling
+"""
+
+# MIT License
+#
+# Copyright © 2024 Joshua M. Dotson (contact@jmdots.com)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import time
+from collections import deque
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import yaml
+
+from cryorithm.managers.metrics import registry
+
+REGULAR = "regular"
+EXTENDED = "extended"
+CLOSED = "closed"
+
+POLLS_SKIPPED = registry.counter(
+    "cryorithm_polls_skipped_total",
+    "Ticker fetches skipped by adaptive polling because they were not due.",
+    ["session"],
+)
+
+# Seconds between polls of a ticker per session, before the change-rate
+# adjustment; 'poll_intervals' overrides them.
+DEFAULT_POLL_INTERVALS = {REGULAR: 60, EXTENDED: 300, CLOSED: 3600}
+
+# NYSE sessions and market holidays. Sites trading elsewhere, or past the
+# last listed year, pass their own table through 'market_calendar'.
+DEFAULT_CALENDAR = {
+    "name": "XNYS",
+    "timezone": "America/New_York",
+    "pre_open": "04:00",
+    "open": "09:30",
+    "close": "16:00",
+    "post_close": "20:00",
+    "holidays": [
+        "2025-01-01",
+        "2025-01-09",
+        "2025-01-20",
+        "2025-02-17",
+        "2025-04-18",
+        "2025-05-26",
+        "2025-06-19",
+        "2025-07-04",
+        "2025-09-01",
+        "2025-11-27",
+        "2025-12-25",
+        "2026-01-01",
+        "2026-01-19",
+        "2026-02-16",
+        "2026-04-03",
+        "2026-05-25",
+        "2026-06-19",
+        "2026-07-03",
+        "2026-09-07",
+        "2026-11-26",
+        "2026-12-25",
+        "2027-01-01",
+        "2027-01-18",
+        "2027-02-15",
+        "2027-03-26",
+        "2027-05-31",
+        "2027-06-18",
+        "2027-07-05",
+        "2027-09-06",
+        "2027-11-25",
+        "2027-12-24",
+    ],
+    "early_closes": {
+        "2025-07-03": "13:00",
+        "2025-11-28": "13:00",
+        "2025-12-24": "13:00",
+        "2026-11-27": "13:00",
+        "2026-12-24": "13:00",
+        "2027-11-26": "13:00",
+    },
+}
+
+
+def _parse_time(value):
+    # YAML 1.1 reads unquoted times such as 16:00 as base-60 integers.
+    if isinstance(value, int):
+        hours, minutes = divmod(value, 60)
+    else:
+        hours, minutes = (int(part) for part in str(value).split(":"))
+    return hours, minutes
+
+
+class MarketCalendar:
+    """
+    Trading sessions of one exchange, from a local holiday and session table.
+
+    Every weekday that is not a holiday is a trading day with a pre-market
+    session, a regular session and a post-market session, in the exchange's
+    time zone. Early closes end the regular session, and the day's trading,
+    early. All other time is closed.
+
+    Attributes:
+        name (str): Exchange name, e.g. 'XNYS'.
+        timezone (ZoneInfo): Time zone of the session times.
+        holidays (set): Dates without trading.
+        early_closes (dict): Regular session close (hours, minutes) by date.
+    """
+
+    def __init__(
+        self,
+        name="XNYS",
+        timezone="America/New_York",
+        pre_open="04:00",
+        open="09:30",
+        close="16:00",
+        post_close="20:00",
+        holidays=(),
+        early_closes=None,
+    ):
+        self.name = name
+        self.timezone = ZoneInfo(timezone)
+        self.pre_open = _parse_time(pre_open)
+        self.open = _parse_time(open)
+        self.close = _parse_time(close)
+        self.post_close = _parse_time(post_close)
+        self.holidays = {date.fromisoformat(str(day)) for day in holidays}
+        self.early_closes = {
+            date.fromisoformat(str(day)): _parse_time(close_time)
+            for day, close_time in (early_closes or {}).items()
+        }
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Loads a calendar from a YAML table with the constructor's keys.
+        """
+        with Path(path).expanduser().open("r") as f:
+            return cls(**yaml.safe_load(f))
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Builds the calendar named by 'market_calendar', or the NYSE default.
+        """
+        if config.get("market_calendar"):
+            return cls.from_file(config["market_calendar"])
+        return cls(**DEFAULT_CALENDAR)
+
+    def is_trading_day(self, day):
+        return day.weekday() < 5 and day not in self.holidays
+
+    def _boundaries(self, day):
+        # Session start times of a trading day, each with the session it opens.
+        def at(hours_minutes):
+            return datetime(day.year, day.month, day.day, *hours_minutes).replace(
+                tzinfo=self.timezone,
+            )
+
+        early_close = self.early_closes.get(day)
+        if early_close is not None:
+            return [
+                (at(self.pre_open), EXTENDED),
+                (at(self.open), REGULAR),
+                (at(early_close), CLOSED),
+            ]
+        return [
+            (at(self.pre_open), EXTENDED),
+            (at(self.open), REGULAR),
+            (at(self.close), EXTENDED),
+            (at(self.post_close), CLOSED),
+        ]
+
+    def session(self, timestamp):
+        """
+        Returns the session at a point in time.
+
+        Args:
+            timestamp (float): Epoch seconds.
+
+        Returns:
+            str: 'regular', 'extended' (pre- or post-market) or 'closed'.
+        """
+        moment = datetime.fromtimestamp(timestamp, self.timezone)
+        if not self.is_trading_day(moment.date()):
+            return CLOSED
+        session = CLOSED
+        for start, name in self._boundaries(moment.date()):
+            if moment < start:
+                break
+            session = name
+        return session
+
+    def next_transition(self, timestamp, max_days=14):
+        """
+        Returns when the session after `timestamp` next starts.
+
+        Args:
+            timestamp (float): Epoch seconds.
+            max_days (int, optional): Days searched ahead (default: 14).
+
+        Returns:
+            float: Epoch seconds of the next session start, or None when
+                there is none within `max_days`.
+        """
+        day = datetime.fromtimestamp(timestamp, self.timezone).date()
+        for offset in range(max_days + 1):
+            current = day + timedelta(days=offset)
+            if not self.is_trading_day(current):
+                continue
+            for start, _ in self._boundaries(current):
+                if start.timestamp() > timestamp:
+                    return start.timestamp()
+        return None
+
+
+class AdaptivePoller:
+    """
+    Decides per ticker whether a scheduled fetch is due.
+
+    The interval of a ticker starts from the interval of the current
+    session and is scaled by how often its recent snapshots changed: a
+    ticker whose last `window` snapshots never changed is polled
+    `max_factor` times less often, one that changed every time
+    `max_factor` times more often, and one changing at
+    `target_change_rate` keeps the session interval. A ticker is always due
+    again when a new session starts, so the open is never missed.
+
+    The cron expression of the sensor still sets the fastest possible rate;
+    adaptive polling only skips tickers on ticks where they are not due.
+
+    Attributes:
+        calendar (MarketCalendar): Exchange sessions.
+        intervals (dict): Base interval in seconds per session.
+        window (int): Snapshots considered for the change rate.
+    """
+
+    def __init__(
+        self,
+        calendar,
+        intervals=None,
+        window=10,
+        target_change_rate=0.5,
+        max_factor=4.0,
+        clock=time.time,
+    ):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.calendar = calendar
+        self.intervals = dict(DEFAULT_POLL_INTERVALS, **(intervals or {}))
+        self.window = window
+        self.target_change_rate = target_change_rate
+        self.max_factor = max_factor
+        self._clock = clock
+        self._changes = {}
+        self._due = {}
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Builds a poller from a ConfigManager configuration dict.
+        """
+        return cls(
+            MarketCalendar.from_config(config),
+            intervals=config.get("poll_intervals"),
+            window=int(config.get("poll_window", 10)),
+            max_factor=float(config.get("poll_max_factor", 4.0)),
+        )
+
+    def change_rate(self, ticker):
+        """
+        Returns the share of the ticker's recent snapshots that changed, or
+        None before the first one.
+        """
+        changes = self._changes.get(ticker)
+        if not changes:
+            return None
+        return sum(changes) / len(changes)
+
+    def interval(self, ticker, now=None):
+        """
+        Returns the polling interval of a ticker in seconds.
+        """
+        if now is None:
+            now = self._clock()
+        interval = float(self.intervals[self.calendar.session(now)])
+        rate = self.change_rate(ticker)
+        if rate is None:
+            return interval
+        exponent = 1 - rate / self.target_change_rate
+        exponent = max(-1.0, min(1.0, exponent))
+        return interval * self.max_factor**exponent
+
+    def due(self, tickers, now=None):
+        """
+        Filters tickers down to those due for a fetch.
+
+        Args:
+            tickers (list): Candidate tickers.
+            now (float, optional): Epoch seconds (default: the clock).
+
+        Returns:
+            list: Due tickers, in the given order. Tickers never observed
+                are always due.
+        """
+        if now is None:
+            now = self._clock()
+        due = [ticker for ticker in tickers if self._due.get(ticker, now) <= now]
+        skipped = len(tickers) - len(due)
+        if skipped:
+            POLLS_SKIPPED.labels(self.calendar.session(now)).inc(skipped)
+        return due
+
+    def observe(self, ticker, changed, now=None):
+        """
+        Records a fetched snapshot and schedules the ticker's next fetch.
+
+        Args:
+            ticker (str): Stock ticker symbol.
+            changed (bool): Whether the snapshot differed from the last one,
+                or None when unknown, e.g. for keyframes; only the next fetch
+                is scheduled then.
+            now (float, optional): Epoch seconds of the tick that fetched it
+                (default: the clock).
+        """
+        if now is None:
+            now = self._clock()
+        if changed is not None:
+            changes = self._changes.get(ticker)
+            if changes is None:
+                changes = self._changes[ticker] = deque(maxlen=self.window)
+            changes.append(bool(changed))
+
+        # Ticks fire on the cron grid with some timing noise; the margin keeps
+        # a ticker with a 60s interval due on the next minute's tick.
+        due = now + 0.95 * self.interval(ticker, now)
+        transition = self.calendar.next_transition(now)
+        if transition is not None:
+            due = min(due, transition)
+        self._due[ticker] = due
@@ -0,0 +1,156 @@
+"""
+Cryorithm™ | Managers | Replay
+"""
+
+# MIT License
+#
+# Copyright © 2024 Joshua M. Dotson (contact@jmdots.com)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import asyncio
+import json
+import time
+from itertools import groupby, islice
+from pathlib import Path
+
+from cryorithm.managers.metrics import registry
+
+REPLAYED = registry.counter(
+    "cryorithm_replay_snapshots_total",
+    "Snapshots replayed through the pipeline.",
+    ["source"],
+)
+
+
+def iter_capture(path):
+    """
+    Lazily yields the snapshots of a capture file, in file order.
+
+    A capture is a JSON lines file, such as the output of
+    `cryorithm consume --output`. Each line is either a record with
+    'ticker', 'timestamp' and 'snapshot', or a delta record. A keyframe
+    delta's 'changes' are the full snapshot; other deltas are merged onto the
+    last snapshot of their ticker, dropping the fields listed in 'removed'.
+    Signal records are skipped.
+
+    Yields:
+        tuple: (timestamp, ticker, snapshot).
+    """
+    last = {}
+    with Path(path).expanduser().open("rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("type", "delta") != "delta":
+                continue
+            ticker = record["ticker"]
+            if "snapshot" in record:
+                snapshot = dict(record["snapshot"])
+            elif "changes" in record:
+                if record.get("keyframe", True):
+                    snapshot = dict(record["changes"])
+                else:
+                    snapshot = dict(last.get(ticker, {}), **record["changes"])
+                for field in record.get("removed") or ():
+                    snapshot.pop(field, None)
+            else:
+                continue
+            last[ticker] = snapshot
+            yield float(record["timestamp"]), ticker, snapshot
+
+
+def iter_ticks(snapshots, max_tick_size=10000):
+    """
+    Groups time-ordered snapshots into ticks of snapshots fetched together.
+
+    Snapshots sharing a timestamp were fetched by the same job; a tick holds
+    at most `max_tick_size` of them.
+
+    Yields:
+        tuple: (timestamp, [(ticker, snapshot), ...]).
+    """
+    for timestamp, group in groupby(snapshots, key=lambda row: row[0]):
+        group = ((ticker, snapshot) for _, ticker, snapshot in group)
+        while tick := list(islice(group, max_tick_size)):
+            yield timestamp, tick
+
+
+class Replayer:
+    """
+    Drives stored snapshots through a JobManager's processing stages.
+
+    Every tick goes through `JobManager.process`, i.e. the same diff, log,
+    destination and analysis path as a live job, with the tick's original
+    timestamp. Snapshots are pulled lazily from the source iterator, so only
+    one tick is in memory at a time.
+
+    Attributes:
+        job_manager (JobManager): Pipeline to replay through.
+        speed (float): Time compression factor, e.g. 60 replays an hour per
+            minute; None replays as fast as the pipeline allows.
+        replayed (int): Snapshots replayed so far.
+    """
+
+    def __init__(
+        self,
+        job_manager,
+        speed=None,
+        name="replay",
+        clock=time.monotonic,
+        sleep=asyncio.sleep,
+    ):
+        self.job_manager = job_manager
+        self.speed = speed
+        self.name = name
+        self.replayed = 0
+        self._clock = clock
+        self._sleep = sleep
+
+    async def run(self, snapshots, store=False):
+        """
+        Replays time-ordered snapshots.
+
+        Args:
+            snapshots (iterable): (timestamp, ticker, snapshot) tuples, such
+                as `HistoryStore.iter_snapshots()` or `iter_capture()`.
+            store (bool, optional): Also append them to the JobManager's
+                history store (default: False).
+
+        Returns:
+            int: Number of snapshots replayed.
+        """
+        started = None
+        for timestamp, tick in iter_ticks(snapshots):
+            if self.speed:
+                if started is None:
+                    started = (timestamp, self._clock())
+                due = started[1] + (timestamp - started[0]) / self.speed
+                delay = due - self._clock()
+                if delay > 0:
+                    await self._sleep(delay)
+
+            await self.job_manager.process(self.name, tick, timestamp, store=store)
+            self.replayed += len(tick)
+            REPLAYED.labels(self.name).inc(len(tick))
+            # Let destination workers run between unthrottled ticks.
+            await asyncio.sleep(0)
+        return self.replayed
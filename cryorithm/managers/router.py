@@ -0,0 +1,221 @@
+"""
+Cryorithm™ | Managers | Router
+"""
+
+# MIT License
+#
+# Copyright © 2024 Joshua M. Dotson (contact@jmdots.com)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import asyncio
+
+from cryorithm.managers.metrics import registry
+
+ROUTED = registry.counter(
+    "cryorithm_router_records_total",
+    "Records handled by router lanes by outcome.",
+    ["destination", "status"],
+)
+QUEUE_DEPTH = registry.gauge(
+    "cryorithm_router_queue_depth",
+    "Records waiting in each router lane.",
+    ["destination"],
+)
+
+OVERFLOW_POLICIES = ("block", "drop", "drop_oldest")
+
+
+class Lane:
+    """
+    Bounded queue and workers delivering records to one destination.
+
+    Attributes:
+        destination: Async callable receiving one record. If it also has an
+            async `send_batch(records)` method, that is used for batches.
+        name (str): Destination name used in logs and metrics.
+        batch_size (int): Maximum records per delivery.
+        concurrency (int): Number of concurrent deliveries.
+        overflow (str): 'block' waits for room, applying backpressure to the
+            job; 'drop' discards the new record; 'drop_oldest' evicts the
+            oldest queued record.
+        dropped (int): Records discarded by the overflow policy.
+    """
+
+    def __init__(
+        self,
+        destination,
+        queue_size=1000,
+        batch_size=1,
+        concurrency=1,
+        overflow="block",
+        name=None,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}")
+        self.destination = destination
+        self.name = name or repr(destination)
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.overflow = overflow
+        self.dropped = 0
+        self.queue = asyncio.Queue(maxsize=queue_size)
+
+    async def put(self, record):
+        if self.overflow == "block":
+            await self.queue.put(record)
+        else:
+            if self.queue.full():
+                self.dropped += 1
+                ROUTED.labels(self.name, "dropped").inc()
+                if self.overflow == "drop":
+                    return
+                self.queue.get_nowait()
+                self.queue.task_done()
+            self.queue.put_nowait(record)
+        QUEUE_DEPTH.labels(self.name).set(self.queue.qsize())
+
+    async def _next_batch(self):
+        batch = [await self.queue.get()]
+        while len(batch) < self.batch_size and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        QUEUE_DEPTH.labels(self.name).set(self.queue.qsize())
+        return batch
+
+    async def _deliver(self, batch):
+        send_batch = getattr(self.destination, "send_batch", None)
+        if send_batch is not None and len(batch) > 1:
+            await send_batch(batch)
+        else:
+            for record in batch:
+                await self.destination(record)
+
+
+class Router:
+    """
+    Fans records out to several destinations concurrently.
+
+    Every destination gets its own Lane, so a slow destination, such as an
+    LLM, only fills its own queue and never delays the others. `route()`
+    returns once the record is queued in every lane; only lanes with the
+    'block' overflow policy can make it wait. The router is itself an async
+    callable, so it can be used as the single JobManager destination.
+
+    Attributes:
+        lanes (list): The router's lanes, in registration order.
+        undelivered (int): Records discarded by the last `close()`.
+    """
+
+    def __init__(self, log_manager):
+        self.log_manager = log_manager
+        self.lanes = []
+        self.undelivered = 0
+        self._tasks = []
+
+    def add(self, destination, **kwargs):
+        """
+        Adds a destination with its own Lane.
+
+        Args:
+            destination: Async callable receiving each record.
+            **kwargs: Lane options: queue_size, batch_size, concurrency,
+                overflow and name.
+
+        Returns:
+            Lane: The new lane.
+        """
+        lane = Lane(destination, **kwargs)
+        self.lanes.append(lane)
+        if self._tasks:
+            self._start_lane(lane)
+        return lane
+
+    def _start_lane(self, lane):
+        for index in range(lane.concurrency):
+            self._tasks.append(
+                asyncio.create_task(
+                    self._work(lane),
+                    name=f"cryorithm-router-{lane.name}-{index}",
+                ),
+            )
+
+    def start(self):
+        """Starts the delivery workers of every lane."""
+        if not self._tasks:
+            for lane in self.lanes:
+                self._start_lane(lane)
+
+    async def _work(self, lane):
+        while True:
+            batch = await lane._next_batch()
+            try:
+                await lane._deliver(batch)
+                ROUTED.labels(lane.name, "ok").inc(len(batch))
+            except Exception as e:
+                ROUTED.labels(lane.name, "error").inc(len(batch))
+                self.log_manager.error(
+                    f"Error forwarding {len(batch)} record(s) to {lane.name}: "
+                    f"{str(e)}",
+                )
+            finally:
+                for _ in batch:
+                    lane.queue.task_done()
+
+    async def route(self, record):
+        """Queues a record in every lane."""
+        for lane in self.lanes:
+            await lane.put(record)
+
+    async def __call__(self, record):
+        await self.route(record)
+
+    async def close(self, timeout=10.0):
+        """
+        Waits up to `timeout` seconds for the queued records to be delivered,
+        then stops the workers.
+
+        Args:
+            timeout (float, optional): Seconds to wait, or None to wait until
+                every lane is empty (default: 10.0).
+
+        Returns:
+            int: Records still queued when the workers were stopped, which
+            are discarded; also kept in `undelivered`.
+        """
+        self.undelivered = 0
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(lane.queue.join() for lane in self.lanes)),
+                timeout,
+            )
+        except asyncio.TimeoutError:
+            self.undelivered = sum(lane.queue.qsize() for lane in self.lanes)
+            self.log_manager.warning(
+                "Router closed with undelivered records: "
+                + ", ".join(f"{lane.name}={lane.queue.qsize()}" for lane in self.lanes),
+            )
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        return self.undelivered
+
+    def __repr__(self):
+        return f"Router({', '.join(lane.name for lane in self.lanes)})"
@@ -0,0 +1,349 @@
+"""
+Cryorithm™ | Managers | Workers
+"""
+
+# MIT License
+#
+# Copyright © 2024 Joshua M. Dotson (contact@jmdots.com)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import hashlib
+import multiprocessing
+import queue
+import signal
+import threading
+import time
+from bisect import bisect
+from collections import defaultdict
+
+from cryorithm.managers.metrics import MetricsRegistry, registry
+
+WORKER_RESTARTS = registry.counter(
+    "cryorithm_worker_restarts_total",
+    "Worker processes restarted after exiting with an error.",
+    ["worker"],
+)
+WORKERS_ALIVE = registry.gauge(
+    "cryorithm_workers_alive",
+    "Worker processes currently running.",
+)
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """
+    Consistent hash ring mapping keys, such as tickers, to nodes.
+
+    Each node is placed on the ring `replicas` times, so keys spread evenly
+    and adding or removing a node only moves roughly 1/N of the keys.
+
+    Attributes:
+        nodes (list): Node names on the ring.
+    """
+
+    def __init__(self, nodes, replicas=128):
+        self.nodes = list(nodes)
+        if not self.nodes:
+            raise ValueError("HashRing requires at least one node")
+        points = sorted(
+            (_hash(f"{node}#{replica}"), node)
+            for node in self.nodes
+            for replica in range(replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def node_for(self, key):
+        """Returns the node owning a key."""
+        index = bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._owners[index]
+
+    def assign(self, keys):
+        """
+        Returns the keys owned by every node.
+
+        Returns:
+            dict: Node name to the list of its keys, in input order. Nodes
+                without keys map to an empty list.
+        """
+        shards = {node: [] for node in self.nodes}
+        for key in keys:
+            shards[self.node_for(key)].append(key)
+        return shards
+
+
+def _worker_main(target, name, config, snapshots, report_interval):
+    """Runs `target(name, config)` in a worker process, reporting metrics."""
+    # The supervisor stops workers with SIGTERM; raising KeyboardInterrupt
+    # lets the target's cleanup run, e.g. flushing its producer.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    stopped = threading.Event()
+
+    def report():
+        while not stopped.wait(report_interval):
+            snapshots.put((name, registry.collect()))
+
+    reporter = threading.Thread(target=report, name="cryorithm-metrics-report")
+    reporter.daemon = True
+    reporter.start()
+    try:
+        target(name, config)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stopped.set()
+        snapshots.put((name, registry.collect()))
+
+
+class WorkerPool:
+    """
+    Shards tickers across worker processes and supervises them.
+
+    Tickers are assigned to workers with a HashRing, so a worker's shard only
+    changes for a fraction of tickers when the worker count changes. Each
+    worker runs `target(name, config)` in its own process with `config`'s
+    'ticker' replaced by its shard. A worker that exits with an error is
+    restarted with exponential backoff, which starts over once a worker has
+    run for `stable_after` seconds; a worker that exits cleanly is done.
+    `stop()` sends workers SIGTERM, which they handle like an interrupt, so
+    their outputs are flushed and their last metrics are reported.
+
+    Workers periodically send a snapshot of their metrics registry to the
+    parent, and `registry` renders the sum of the parent's own metrics and the
+    latest snapshot of every worker, so it can be exported by a
+    MetricsManager like the process-wide registry.
+
+    Attributes:
+        shards (dict): Worker name to the list of its tickers.
+        restarts (dict): Worker name to the number of restarts so far.
+    """
+
+    def __init__(
+        self,
+        target,
+        config,
+        tickers,
+        workers,
+        log_manager,
+        report_interval=5.0,
+        restart_delay=1.0,
+        max_restart_delay=60.0,
+        stable_after=300.0,
+    ):
+        """
+        Initializes the pool without starting any process.
+
+        Args:
+            target (callable): Picklable module-level function called as
+                `target(name, config)` in every worker process.
+            config (dict): Pipeline configuration passed to the workers.
+            tickers (list): The ticker universe to shard.
+            workers (int): Number of worker processes.
+            log_manager (LogManager): Log manager of the parent process.
+            report_interval (float, optional): Seconds between metric snapshots
+                sent by workers (default: 5.0).
+            restart_delay (float, optional): Initial delay before restarting a
+                crashed worker, doubled on every consecutive crash
+                (default: 1.0).
+            max_restart_delay (float, optional): Upper bound of the restart
+                delay (default: 60.0).
+            stable_after (float, optional): Seconds a worker must run before
+                a crash is no longer counted as consecutive (default: 300.0).
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+
+        self.target = target
+        self.config = config
+        self.log_manager = log_manager
+        self.report_interval = report_interval
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.stable_after = stable_after
+
+        ring = HashRing([f"worker-{index}" for index in range(workers)])
+        self.shards = {
+            name: shard for name, shard in ring.assign(tickers).items() if shard
+        }
+        self.restarts = defaultdict(int)
+        self._crashes = defaultdict(int)
+        self.registry = _PoolRegistry(registry)
+
+        # Spawn, not fork: the parent runs logging and metrics threads.
+        self._context = multiprocessing.get_context("spawn")
+        self._snapshots = self._context.Queue()
+        self._processes = {}
+        self._started_at = {}
+        self._restart_at = {}
+        self._stopping = threading.Event()
+
+    def _start_worker(self, name):
+        config = dict(self.config, ticker=self.shards[name], workers=1)
+        process = self._context.Process(
+            target=_worker_main,
+            args=(self.target, name, config, self._snapshots, self.report_interval),
+            name=f"cryorithm-{name}",
+            daemon=True,
+        )
+        process.start()
+        self._processes[name] = process
+        self._started_at[name] = time.monotonic()
+        self.log_manager.info(
+            "Started {worker} with {count} tickers",
+            worker=name,
+            count=len(self.shards[name]),
+            pid=process.pid,
+            event="worker",
+        )
+
+    def _drain_snapshots(self):
+        while True:
+            try:
+                name, snapshot = self._snapshots.get_nowait()
+            except queue.Empty:
+                return
+            self.registry.update(name, snapshot)
+
+    def _check_workers(self):
+        now = time.monotonic()
+        for name, process in list(self._processes.items()):
+            if process.is_alive():
+                continue
+            del self._processes[name]
+            self._drain_snapshots()
+            self.registry.retire(name)
+            if process.exitcode == 0:
+                self.log_manager.info("{worker} finished", worker=name, event="worker")
+                continue
+
+            if now - self._started_at[name] >= self.stable_after:
+                self._crashes[name] = 0
+            delay = min(
+                self.max_restart_delay,
+                self.restart_delay * 2 ** self._crashes[name],
+            )
+            self._crashes[name] += 1
+            self._restart_at[name] = now + delay
+            self.log_manager.warning(
+                "{worker} exited with code {code}, restarting in {delay:.1f}s",
+                worker=name,
+                code=process.exitcode,
+                delay=delay,
+                event="worker",
+            )
+
+        for name, restart_at in list(self._restart_at.items()):
+            if restart_at <= now and not self._stopping.is_set():
+                del self._restart_at[name]
+                self.restarts[name] += 1
+                WORKER_RESTARTS.labels(name).inc()
+                self._start_worker(name)
+
+        WORKERS_ALIVE.set(len(self._processes))
+
+    def run(self, poll_interval=0.5):
+        """
+        Starts every worker and supervises them until all have finished or
+        `stop()` is called.
+        """
+        for name in self.shards:
+            self._start_worker(name)
+        try:
+            while (self._processes or self._restart_at) and not self._stopping.wait(
+                poll_interval,
+            ):
+                self._drain_snapshots()
+                self._check_workers()
+        finally:
+            self.stop()
+
+    def stop(self, timeout=10.0):
+        """
+        Stops the workers with SIGTERM and waits up to `timeout` seconds for
+        them to shut down cleanly, then kills those still running.
+        """
+        self._stopping.set()
+        self._restart_at.clear()
+        processes = list(self._processes.values())
+        self._processes.clear()
+        for process in processes:
+            process.terminate()
+        deadline = time.monotonic() + timeout
+        for process in processes:
+            # Snapshots are drained while waiting, so a worker never blocks
+            # on a full queue while exiting.
+            while process.is_alive() and time.monotonic() < deadline:
+                self._drain_snapshots()
+                process.join(0.05)
+            if process.is_alive():
+                self.log_manager.warning(
+                    "{worker} did not stop in time and was killed",
+                    worker=process.name,
+                    event="worker",
+                )
+                process.kill()
+                process.join()
+        self._drain_snapshots()
+        WORKERS_ALIVE.set(0)
+
+
+class _PoolRegistry:
+    """Renders the parent's registry merged with the latest worker snapshots."""
+
+    def __init__(self, parent):
+        self.parent = parent
+        self._snapshots = {}
+        # Totals of exited worker processes, so counters survive restarts.
+        self._retired = MetricsRegistry()
+        self._lock = threading.Lock()
+
+    def update(self, worker, snapshot):
+        with self._lock:
+            self._snapshots[worker] = snapshot
+
+    def retire(self, worker):
+        with self._lock:
+            snapshot = self._snapshots.pop(worker, None)
+            if snapshot is not None:
+                # Gauges describe a live process and are not carried over.
+                self._retired.merge(
+                    {
+                        name: sample
+                        for name, sample in snapshot.items()
+                        if sample[0] != "gauge"
+                    },
+                )
+
+    def render(self):
+        # Gauges are per process, e.g. a job interval; they are labelled with
+        # their worker rather than summed.
+        merged = MetricsRegistry()
+        merged.merge(self.parent.collect(), gauge_labels={"worker": "supervisor"})
+        with self._lock:
+            retired = self._retired.collect()
+            snapshots = list(self._snapshots.items())
+        merged.merge(retired)
+        for worker, snapshot in snapshots:
+            merged.merge(snapshot, gauge_labels={"worker": worker})
+        return merged.render()
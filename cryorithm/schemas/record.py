@@ -0,0 +1,159 @@
+"""
+Cryorithm™ | Schemas | Record
+"""
+
+# MIT License
+#
+# Copyright © 2024 Joshua M. Dotson (contact@jmdots.com)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+from collections.abc import Mapping
+from functools import lru_cache
+
+# Type names usable in a field projection, and the casts they apply.
+FIELD_TYPES = {"any": None, "bool": bool, "float": float, "int": int, "str": str}
+
+
+class Record(Mapping):
+    """
+    Base of the compact snapshot records built by `record_type`.
+
+    A record stores one value per projected field in `__slots__` rather than
+    in a per-instance dict, which takes a fraction of the memory of the full
+    payload dict. Missing fields are stored as None and are not part of the
+    mapping, so a record reads like the dict of its present fields.
+    """
+
+    __slots__ = ()
+    fields = ()
+    types = ()
+
+    def __init__(self, values):
+        for field, cast in zip(self.fields, self.types):
+            value = values.get(field)
+            if value is not None and cast is not None:
+                try:
+                    value = cast(value)
+                except (TypeError, ValueError):
+                    value = None
+            setattr(self, field, value)
+
+    def __getitem__(self, field):
+        if field in self.fields:
+            value = getattr(self, field)
+            if value is not None:
+                return value
+        raise KeyError(field)
+
+    def __iter__(self):
+        for field in self.fields:
+            if getattr(self, field) is not None:
+                yield field
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __reduce__(self):
+        pairs = tuple(zip(self.fields, (_type_name(t) for t in self.types)))
+        return _rebuild, (pairs, type(self).__name__, dict(self))
+
+    def __repr__(self):
+        values = ", ".join(f"{field}={value!r}" for field, value in self.items())
+        return f"{type(self).__name__}({values})"
+
+
+def _type_name(cast):
+    return next(name for name, value in FIELD_TYPES.items() if value is cast)
+
+
+def _rebuild(pairs, name, values):
+    return record_type(pairs, name)(values)
+
+
+@lru_cache(maxsize=None)
+def record_type(pairs, name="Record"):
+    """
+    Returns the record class of a field projection.
+
+    Classes are cached, so every projection of the same fields shares one
+    class.
+
+    Args:
+        pairs (tuple): (field, type name) pairs; see FIELD_TYPES.
+        name (str, optional): Class name (default: 'Record').
+
+    Returns:
+        type: A Record subclass with one slot per field.
+    """
+    fields = tuple(field for field, _ in pairs)
+    for field, type_name in pairs:
+        if not field.isidentifier() or hasattr(Record, field):
+            raise ValueError(f"Invalid projected field name: {field}")
+        if type_name not in FIELD_TYPES:
+            raise ValueError(f"Unknown type {type_name!r} of field {field}")
+    return type(
+        name,
+        (Record,),
+        {
+            "__slots__": fields,
+            "fields": fields,
+            "types": tuple(FIELD_TYPES[type_name] for _, type_name in pairs),
+        },
+    )
+
+
+class Projection:
+    """
+    Projects full sensor payloads onto a fixed set of fields.
+
+    Attributes:
+        fields (tuple): Projected field names.
+        record_type (type): Record class holding the projected values.
+    """
+
+    def __init__(self, fields, name="Record"):
+        """
+        Initializes the projection.
+
+        Args:
+            fields (list or dict): Field names, or a mapping of field name to
+                type name (see FIELD_TYPES). Listed fields keep their values
+                as they are.
+            name (str, optional): Name of the record class (default:
+                'Record').
+        """
+        if isinstance(fields, Mapping):
+            pairs = tuple((str(f), str(t or "any")) for f, t in fields.items())
+        else:
+            pairs = tuple((str(field), "any") for field in fields)
+        if not pairs:
+            raise ValueError("A projection needs at least one field")
+        self.record_type = record_type(pairs, name)
+        self.fields = self.record_type.fields
+
+    def __call__(self, payload):
+        """
+        Returns the record of a payload dict; fields it lacks are missing.
+        """
+        return self.record_type(payload)
+
+    def __repr__(self):
+        return f"Projection({len(self.fields)} fields)"
@@ -0,0 +1,297 @@
+"""
+Cryorithm™ | Schemas | Sensor Status
+"""
+
+# MIT License
+#
+# Copyright © 2024 Joshua M. Dotson (contact@jmdots.com)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import math
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional compact encoding
+    msgpack = None
+
+SCHEMA = "cryorithm.sensor_status"
+SCHEMA_VERSION = 1
+
+CONTENT_TYPES = {
+    "json": "application/json",
+    "msgpack": "application/msgpack",
+}
+
+# Required envelope fields and their types, per message type.
+_COMMON_FIELDS = {"schema": str, "v": int, "type": str, "ticker": str, "ts": float}
+_TYPE_FIELDS = {
+    "delta": {"keyframe": bool, "changes": dict, "removed": list},
+    "signal": {"field": str, "signal": str, "value": float},
+}
+
+
+class SchemaError(ValueError):
+    """Raised when a message does not match the sensor status schema."""
+
+
+def to_message(record):
+    """
+    Wraps a JobManager record (a snapshot delta or a signal) in the envelope.
+    """
+    message = {
+        "schema": SCHEMA,
+        "v": SCHEMA_VERSION,
+        "type": record.get("type", "delta"),
+        "ticker": record["ticker"],
+        "ts": float(record["timestamp"]),
+    }
+    for key, value in record.items():
+        if key not in ("type", "ticker", "timestamp"):
+            message[key] = value
+    return message
+
+
+def from_message(message):
+    """
+    Turns a decoded envelope back into a JobManager record.
+    """
+    record = {
+        key: value for key, value in message.items() if key not in ("schema", "v", "ts")
+    }
+    record["timestamp"] = message["ts"]
+    return record
+
+
+def validate(message):
+    """
+    Checks the envelope of a message once, at the encode/decode edge.
+
+    Only envelope fields are checked; the fundamentals inside `changes` are
+    passed through as-is.
+
+    Raises:
+        SchemaError: When a required field is missing or has the wrong type.
+    """
+    fields = dict(_COMMON_FIELDS)
+    fields.update(_TYPE_FIELDS.get(message.get("type"), {}))
+    for name, expected in fields.items():
+        value = message.get(name)
+        if expected is float and isinstance(value, int) and not isinstance(value, bool):
+            continue
+        if not isinstance(value, expected):
+            raise SchemaError(
+                f"Field {name!r} must be {expected.__name__}, got {value!r}",
+            )
+    if message["schema"] != SCHEMA:
+        raise SchemaError(f"Unknown schema {message['schema']!r}")
+    return message
+
+
+def _sanitize(value):
+    # NaN and infinity are not valid JSON; encode them as null.
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {key: _sanitize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_sanitize(item) for item in value]
+    return value
+
+
+class StatusCodec:
+    """
+    Encoder/decoder for versioned sensor status messages.
+
+    The same message is produced regardless of destination. JSON uses orjson
+    when it is installed and the standard library otherwise; MessagePack is a
+    compact binary alternative available when `msgpack` is installed. The
+    encoding and schema version travel in Kafka headers, so consumers can
+    decode messages of any supported encoding.
+
+    Attributes:
+        format (str): 'json' or 'msgpack'.
+        content_type (str): MIME type of encoded messages.
+    """
+
+    def __init__(self, format="json"):
+        if format not in CONTENT_TYPES:
+            raise ValueError(f"Unknown encoding {format!r}")
+        if format == "msgpack" and msgpack is None:
+            raise ImportError("The msgpack encoding requires the 'msgpack' package")
+
+        self.format = format
+        self.content_type = CONTENT_TYPES[format]
+
+    @property
+    def headers(self):
+        """Kafka headers describing messages produced by this codec."""
+        return [
+            ("content-type", self.content_type.encode()),
+            ("schema-version", str(SCHEMA_VERSION).encode()),
+        ]
+
+    def encode(self, record):
+        """
+        Validates a record's envelope and encodes it to bytes.
+        """
+        message = validate(to_message(record))
+        if self.format == "msgpack":
+            return msgpack.packb(message, default=str, use_bin_type=True)
+        if orjson is not None:
+            # orjson writes NaN as null natively.
+            return orjson.dumps(
+                message,
+                default=str,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+            )
+        return json.dumps(
+            _sanitize(message),
+            default=str,
+            separators=(",", ":"),
+            allow_nan=False,
+        ).encode("utf-8")
+
+    @staticmethod
+    def decode(payload, headers=None):
+        """
+        Decodes a message of any supported encoding and version.
+
+        Args:
+            payload (bytes): Encoded message.
+            headers (list, optional): Kafka headers; when absent, the encoding
+                is sniffed from the payload (default: None).
+
+        Returns:
+            dict: The record.
+
+        Raises:
+            SchemaError: When the message is invalid or from another schema
+                version.
+        """
+        content_type = dict(headers or ()).get("content-type")
+        if isinstance(content_type, bytes):
+            content_type = content_type.decode()
+        if content_type is None:
+            content_type = (
+                CONTENT_TYPES["json"]
+                if payload[:1] in (b"{", b" ")
+                else CONTENT_TYPES["msgpack"]
+            )
+
+        if content_type == CONTENT_TYPES["msgpack"]:
+            if msgpack is None:
+                raise SchemaError("Received msgpack message but msgpack is missing")
+            message = msgpack.unpackb(payload, raw=False)
+        elif orjson is not None:
+            message = orjson.loads(payload)
+        else:
+            message = json.loads(payload)
+        return StatusCodec._finish(message)
+
+    @staticmethod
+    def decode_many(messages):
+        """
+        Decodes many messages at once.
+
+        Runs of JSON messages are parsed with a single call, by joining their
+        payloads into one JSON array, and runs of MessagePack messages are
+        read from one streaming unpacker. If a run fails to parse as a whole,
+        its messages are decoded one by one so a single bad message only
+        affects itself.
+
+        Args:
+            messages (list): (payload, headers) pairs.
+
+        Returns:
+            tuple: The decoded records, and a list of (index, SchemaError or
+                ValueError) for the messages that could not be decoded.
+        """
+        records = []
+        errors = []
+        run, run_type, run_start = [], None, 0
+
+        def flush():
+            try:
+                decoded = StatusCodec._parse_run(run, run_type)
+            except Exception:
+                decoded = None
+            for offset, payload in enumerate(run):
+                try:
+                    if decoded is None:
+                        record = StatusCodec.decode(
+                            payload,
+                            [("content-type", run_type)],
+                        )
+                    else:
+                        record = StatusCodec._finish(decoded[offset])
+                except (SchemaError, ValueError, TypeError) as e:
+                    errors.append((run_start + offset, e))
+                else:
+                    records.append(record)
+
+        for index, (payload, headers) in enumerate(messages):
+            content_type = dict(headers or ()).get("content-type")
+            if isinstance(content_type, bytes):
+                content_type = content_type.decode()
+            if content_type is None:
+                content_type = (
+                    CONTENT_TYPES["json"]
+                    if payload[:1] in (b"{", b" ")
+                    else CONTENT_TYPES["msgpack"]
+                )
+            if run and content_type != run_type:
+                flush()
+                run = []
+            if not run:
+                run_type, run_start = content_type, index
+            run.append(payload)
+        if run:
+            flush()
+        return records, errors
+
+    @staticmethod
+    def _parse_run(payloads, content_type):
+        if content_type == CONTENT_TYPES["msgpack"]:
+            if msgpack is None:
+                raise SchemaError("Received msgpack message but msgpack is missing")
+            unpacker = msgpack.Unpacker(raw=False)
+            unpacker.feed(b"".join(payloads))
+            messages = list(unpacker)
+        else:
+            array = b"[" + b",".join(payloads) + b"]"
+            messages = orjson.loads(array) if orjson is not None else json.loads(array)
+        if len(messages) != len(payloads):
+            raise SchemaError("Message boundaries were lost")
+        return messages
+
+    @staticmethod
+    def _finish(message):
+        if not isinstance(message, dict):
+            raise SchemaError("Message must be a mapping")
+        version = message.get("v")
+        if version != SCHEMA_VERSION:
+            raise SchemaError(f"Unsupported schema version {version!r}")
+        return from_message(validate(message))
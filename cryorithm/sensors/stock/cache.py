@@ -0,0 +1,394 @@
+"""
+Cryorithm™ | Sensors | Stock | Cache
+"""
+
+# MIT License
+#
+# Copyright © 2024 Joshua M. Dotson (contact@jmdots.com)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from cryorithm.managers.metrics import registry
+
+CACHE_LOOKUPS = registry.counter(
+    "cryorithm_fetch_cache_lookups_total",
+    "Fetch cache lookups by result: fresh hit per tier, stale hit or miss.",
+    ["result"],
+)
+CACHE_REFRESH_ERRORS = registry.counter(
+    "cryorithm_fetch_cache_refresh_errors_total",
+    "Background refreshes of stale fetch cache entries that failed.",
+)
+
+# Freshness of groups of fields, in seconds: 'ttl' while an entry is fresh
+# and 'stale' for how long after that it is still served while a refresh
+# runs. Fields outside every group use DEFAULT_FIELD_POLICY;
+# 'fetch_cache_groups' overrides both. A scheduled job never reuses quotes
+# from its previous fire: with the default per-minute schedule, the 'quote'
+# group only shares a fetch within one fire, e.g. between processes, and
+# serves ad-hoc or faster polling.
+DEFAULT_FIELD_GROUPS = {
+    "quote": {
+        "fields": [
+            "currentPrice",
+            "previousClose",
+            "regularMarketChangePercent",
+            "volume",
+            "averageVolume",
+            "marketCap",
+            "dayHigh",
+            "dayLow",
+            "bid",
+            "ask",
+        ],
+        "ttl": 60,
+        "stale": 240,
+    },
+    "profile": {
+        "fields": [
+            "shortName",
+            "longName",
+            "currency",
+            "exchange",
+            "sector",
+            "industry",
+            "longBusinessSummary",
+        ],
+        "ttl": 86400,
+        "stale": 604800,
+    },
+}
+DEFAULT_FIELD_POLICY = {"ttl": 900, "stale": 3600}
+
+
+def schedule_interval(schedule_time, samples=8):
+    """
+    Returns the shortest interval, in seconds, between fires of a cron
+    expression over its next `samples` fires.
+    """
+    from apscheduler.triggers.cron import CronTrigger
+
+    trigger = CronTrigger.from_crontab(schedule_time, timezone="UTC")
+    fires = []
+    previous, now = None, datetime.now(timezone.utc)
+    for _ in range(samples):
+        now = trigger.get_next_fire_time(previous, now)
+        fires.append(now)
+        previous, now = now, now + timedelta(microseconds=1)
+    return min((b - a).total_seconds() for a, b in zip(fires, fires[1:]))
+
+
+class SQLiteFetchStore:
+    """
+    On-disk tier of the fetch cache, shared across runs and processes.
+
+    Payloads are stored as JSON with the time they were fetched. When the
+    table grows beyond `max_entries`, the least recently fetched entries are
+    evicted.
+
+    Attributes:
+        path (Path): Location of the SQLite database file.
+        max_entries (int): Entries kept before eviction, or None for no limit.
+    """
+
+    def __init__(self, path, max_entries=100000):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.path),
+            timeout=10,
+            check_same_thread=False,
+        )
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS fetches ("
+                "ticker TEXT PRIMARY KEY, payload TEXT NOT NULL, "
+                "fetched_at REAL NOT NULL)",
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS fetches_fetched_at ON fetches (fetched_at)",
+            )
+
+    def get(self, ticker):
+        """
+        Returns (fetched_at, payload) of a ticker, or None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fetched_at, payload FROM fetches WHERE ticker = ?",
+                (ticker,),
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def set(self, ticker, fetched_at, payload):
+        with self._lock, self._conn:
+            # Another process may have stored a newer fetch meanwhile.
+            self._conn.execute(
+                "INSERT INTO fetches VALUES (?, ?, ?) "
+                "ON CONFLICT (ticker) DO UPDATE SET "
+                "payload = excluded.payload, fetched_at = excluded.fetched_at "
+                "WHERE excluded.fetched_at > fetches.fetched_at",
+                (ticker, json.dumps(payload, default=str), fetched_at),
+            )
+            if self.max_entries is not None:
+                self._conn.execute(
+                    "DELETE FROM fetches WHERE ticker IN ("
+                    "SELECT ticker FROM fetches ORDER BY fetched_at DESC "
+                    "LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM fetches").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+
+class FetchCache:
+    """
+    Two-level cache of upstream fetches with stale-while-revalidate.
+
+    Lookups go to an in-process LRU first and to the optional shared SQLite
+    store next. How long an entry is fresh depends on the fields the caller
+    uses: the shortest TTL among the field groups they touch. A fresh entry
+    is returned as is. A stale one, within the group's 'stale' window, is
+    returned immediately while one background refresh updates both tiers.
+    Anything older waits for a refresh.
+
+    Refreshes are single-flight: concurrent lookups of a ticker share one
+    upstream call. Entries are stamped with the time their upstream request
+    started, so an entry's age never understates how old its data is.
+
+    Scheduled callers pass the `interval` between their fires. Their TTL is
+    shortened by half an interval, so an entry fetched at one fire is not
+    served at the next because the fires drifted closer than the TTL. When
+    the TTL is no longer than the interval, stale entries are not served to
+    them either: that would hand out the previous fire's data. A quote TTL
+    of a minute thus only saves upstream calls for a per-minute schedule
+    within a fire; raise it to reuse quotes across fires.
+
+    Payloads are reduced to `fields` before they are cached, so neither tier
+    holds the upstream fields no caller projects.
+
+    Attributes:
+        store (SQLiteFetchStore): Shared tier, or None for memory only.
+        fields (tuple): Fields kept from every payload, or None for all.
+        max_entries (int): Entries kept in memory before the least recently
+            used one is evicted.
+        field_groups (dict): Field groups with their 'fields', 'ttl' and
+            'stale' seconds.
+    """
+
+    def __init__(
+        self,
+        store=None,
+        max_entries=10000,
+        field_groups=None,
+        default_policy=None,
+        fields=None,
+        clock=time.time,
+    ):
+        self.store = store
+        self.max_entries = max_entries
+        self.fields = tuple(fields) if fields is not None else None
+        self.field_groups = dict(DEFAULT_FIELD_GROUPS)
+        self.field_groups.update(field_groups or {})
+        self.default_policy = dict(DEFAULT_FIELD_POLICY, **(default_policy or {}))
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._refreshes = set()
+        self._policies = {}
+        self.stats = {"memory": 0, "disk": 0, "stale": 0, "miss": 0, "errors": 0}
+
+    @classmethod
+    def from_config(cls, config, fields=None):
+        """
+        Builds a cache from a ConfigManager configuration dict, keeping
+        `fields` of every payload (default: None, the whole payload).
+        """
+        groups = dict(config.get("fetch_cache_groups") or {})
+        default_policy = groups.pop("default", None)
+        store = None
+        if config.get("fetch_cache_path"):
+            store = SQLiteFetchStore(config["fetch_cache_path"])
+        return cls(
+            store,
+            max_entries=int(config.get("fetch_cache_entries", 10000)),
+            field_groups=groups,
+            default_policy=default_policy,
+            fields=fields,
+        )
+
+    def policy(self, fields=None):
+        """
+        Returns the (ttl, stale) seconds that apply to a set of fields.
+
+        Args:
+            fields (iterable, optional): Fields the caller uses (default:
+                None, every field).
+
+        Returns:
+            tuple: The shortest TTL and stale window of the touched groups.
+        """
+        key = None if fields is None else frozenset(fields)
+        policy = self._policies.get(key)
+        if policy is None:
+            policies = []
+            grouped = set()
+            for group in self.field_groups.values():
+                group_fields = set(group.get("fields", ()))
+                grouped |= group_fields
+                if key is None or key & group_fields:
+                    policies.append(group)
+            if key is None or key - grouped:
+                policies.append(self.default_policy)
+            policy = (
+                min(float(p.get("ttl", self.default_policy["ttl"])) for p in policies),
+                min(
+                    float(p.get("stale", self.default_policy["stale"]))
+                    for p in policies
+                ),
+            )
+            self._policies[key] = policy
+        return policy
+
+    def _remember(self, ticker, entry):
+        self._entries[ticker] = entry
+        self._entries.move_to_end(ticker)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _count(self, result):
+        self.stats[result] += 1
+        CACHE_LOOKUPS.labels(result).inc()
+
+    async def get(self, ticker, loader, fields=None, interval=None):
+        """
+        Returns the payload of a ticker, from the cache or from `loader`.
+
+        Args:
+            ticker (str): Stock ticker symbol.
+            loader (callable): Coroutine function fetching the ticker's
+                payload from upstream, called with no arguments.
+            fields (iterable, optional): Fields the caller uses; selects the
+                TTLs that apply (default: None, every field).
+            interval (float, optional): Seconds between the caller's
+                scheduled lookups (default: None, unscheduled).
+
+        Returns:
+            dict: The payload.
+        """
+        ttl, stale = self.policy(fields)
+        if interval:
+            if ttl <= interval:
+                stale = 0.0
+            ttl = max(ttl - interval / 2, 0.0)
+        now = self._clock()
+        entry = self._entries.get(ticker)
+        if entry is not None and now - entry[0] < ttl:
+            self._entries.move_to_end(ticker)
+            self._count("memory")
+            return entry[1]
+
+        # Another process may have fetched the ticker more recently.
+        if self.store is not None:
+            stored = await asyncio.to_thread(self.store.get, ticker)
+            if stored is not None and (entry is None or stored[0] > entry[0]):
+                entry = stored
+                self._remember(ticker, entry)
+                if now - entry[0] < ttl:
+                    self._count("disk")
+                    return entry[1]
+
+        if entry is not None and now - entry[0] < ttl + stale:
+            self._count("stale")
+            if ticker not in self._inflight:
+                task = asyncio.create_task(self._background_refresh(ticker, loader))
+                self._refreshes.add(task)
+                task.add_done_callback(self._refreshes.discard)
+            return entry[1]
+
+        self._count("miss")
+        return await self._refresh(ticker, loader)
+
+    async def _refresh(self, ticker, loader):
+        inflight = self._inflight.get(ticker)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._load(ticker, loader))
+            self._inflight[ticker] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(ticker, None))
+        # Shielded, so a cancelled caller does not cancel the shared fetch.
+        return await asyncio.shield(inflight)
+
+    async def _load(self, ticker, loader):
+        fetched_at = self._clock()
+        payload = await loader()
+        if self.fields is not None:
+            payload = {f: payload[f] for f in self.fields if f in payload}
+        self._remember(ticker, (fetched_at, payload))
+        if self.store is not None:
+            await asyncio.to_thread(self.store.set, ticker, fetched_at, payload)
+        return payload
+
+    async def _background_refresh(self, ticker, loader):
+        try:
+            await self._refresh(ticker, loader)
+        except Exception:
+            # The stale entry keeps being served until a refresh succeeds.
+            self.stats["errors"] += 1
+            CACHE_REFRESH_ERRORS.inc()
+
+    def get_stats(self):
+        """
+        Returns lookup counts by result and the number of cached entries.
+        """
+        lookups = sum(self.stats[k] for k in ("memory", "disk", "stale", "miss"))
+        hits = lookups - self.stats["miss"]
+        return dict(
+            self.stats,
+            entries=len(self._entries),
+            hit_ratio=hits / lookups if lookups else 0.0,
+        )
+
+    async def close(self):
+        """
+        Waits for background refreshes and closes the shared store.
+        """
+        if self._refreshes:
+            await asyncio.gather(*self._refreshes, return_exceptions=True)
+        if self.store is not None:
+            self.store.close()
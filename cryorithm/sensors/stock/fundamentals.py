@@ -25,14 +25,283 @@ Cryorithm™ | Sensors | Stock | Fundamentals
 # SOFTWARE.
 
 import asyncio
-import yfinance as yf
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from cryorithm.managers.metrics import registry
+from cryorithm.schemas.record import Projection
+from cryorithm.sensors.stock.cache import schedule_interval
+
+# Upstream host of yfinance, used as the key of the shared UpstreamGuard.
+YAHOO_HOST = "query2.finance.yahoo.com"
+
+FETCH_SECONDS = registry.histogram(
+    "cryorithm_sensor_fetch_seconds",
+    "Duration of single-ticker upstream fetches.",
+    ["sensor"],
+)
+FETCH_ERRORS = registry.counter(
+    "cryorithm_sensor_fetch_errors_total",
+    "Single-ticker upstream fetches that raised an error.",
+    ["sensor"],
+)
+
+
+def fetch_ticker_info(ticker_symbol):
+    """
+    Fetches the yfinance `info` dict for a single ticker.
+
+    This is the default data source used by the stock sensors. It is a
+    blocking call and is always run on an executor thread. yfinance, and
+    pandas with it, is imported on first use, so pipelines with another
+    fetcher never load it.
+
+    Args:
+        ticker_symbol (str): Stock ticker symbol.
+
+    Returns:
+        dict: The fundamentals reported by Yahoo Finance.
+    """
+    import yfinance as yf
+
+    return yf.Ticker(ticker_symbol).info
 
 
 class StockSensor:
-    def __init__(self, ticker_symbol):
+    def __init__(
+        self,
+        ticker_symbol,
+        schedule_time="* * * * *",
+        fetcher=fetch_ticker_info,
+        executor=None,
+        guard=None,
+        fields=None,
+        cache=None,
+    ):
+        """
+        Initializes a sensor that fetches fundamentals for a single ticker.
+
+        Args:
+            ticker_symbol (str): Stock ticker symbol.
+            schedule_time (str, optional): Cron expression used by the JobManager
+                (default: '* * * * *').
+            fetcher (callable, optional): Data source called with the ticker
+                symbol (default: fetch_ticker_info).
+            executor (Executor, optional): Executor for the blocking fetch
+                (default: None, the event loop's default executor).
+            guard (UpstreamGuard, optional): Shared rate limiter and circuit
+                breaker of the upstream host (default: None).
+            fields (list or dict, optional): Field projection; the fetched
+                payload is reduced to a compact StockRecord of these fields
+                (default: None, the full payload dict).
+            cache (FetchCache, optional): Cache consulted before the upstream
+                fetch (default: None).
+        """
         self.ticker = ticker_symbol
+        self.name = f"StockSensor[{ticker_symbol}]"
+        self.schedule_time = schedule_time
+        self.fetcher = fetcher
+        self.executor = executor
+        self.guard = guard
+        self.projection = Projection(fields, "StockRecord") if fields else None
+        self.cache = cache
+        self._interval = schedule_interval(schedule_time) if cache is not None else None
+
+    async def _fetch(self):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.fetcher, self.ticker)
+
+    async def _load(self):
+        started = time.perf_counter()
+        try:
+            if self.guard is not None:
+                info = await self.guard.call(self._fetch)
+            else:
+                info = await self._fetch()
+        except Exception:
+            FETCH_ERRORS.labels("StockSensor").inc()
+            raise
+        finally:
+            FETCH_SECONDS.labels("StockSensor").observe(time.perf_counter() - started)
+        return info
 
     async def fetch_data(self):
-        loop = asyncio.get_event_loop()
-        info = await loop.run_in_executor(None, lambda: yf.Ticker(self.ticker).info)
+        if self.cache is not None:
+            fields = self.projection.fields if self.projection is not None else None
+            info = await self.cache.get(
+                self.ticker,
+                self._load,
+                fields,
+                self._interval,
+            )
+        else:
+            info = await self._load()
+        if self.projection is not None:
+            return self.projection(info)
+        return info
+
+
+class BatchResult:
+    """
+    Outcome of a batched fetch.
+
+    Attributes:
+        results (dict): Fetched data keyed by ticker symbol.
+        errors (dict): Exceptions keyed by ticker symbol for failed fetches.
+    """
+
+    __slots__ = ("results", "errors")
+
+    def __init__(self, results=None, errors=None):
+        self.results = results if results is not None else {}
+        self.errors = errors if errors is not None else {}
+
+    def __bool__(self):
+        return bool(self.results)
+
+    def __repr__(self):
+        return f"BatchResult(results={len(self.results)}, errors={len(self.errors)})"
+
+
+class StockBatchSensor:
+    """
+    Fetches fundamentals for many tickers with bounded concurrency.
+
+    Blocking fetches run on a dedicated thread pool sized to
+    `max_concurrency`, so a large watchlist never floods the event loop's
+    default executor. Coroutine fetchers are awaited directly under the same
+    concurrency limit. A failing ticker is recorded in `BatchResult.errors`
+    and does not abort the rest of the batch.
+
+    Attributes:
+        tickers (list): Stock ticker symbols fetched on every run.
+        max_concurrency (int): Maximum number of in-flight fetches.
+        fetcher (callable): Data source called with a single ticker symbol.
+    """
+
+    def __init__(
+        self,
+        tickers,
+        schedule_time="* * * * *",
+        max_concurrency=16,
+        fetcher=fetch_ticker_info,
+        executor=None,
+        guard=None,
+        fields=None,
+        cache=None,
+    ):
+        """
+        Initializes the batch sensor.
+
+        Args:
+            tickers (list): Stock ticker symbols.
+            schedule_time (str, optional): Cron expression used by the JobManager
+                (default: '* * * * *').
+            max_concurrency (int, optional): Maximum number of in-flight fetches
+                (default: 16).
+            fetcher (callable, optional): Data source called with a ticker symbol,
+                either blocking or a coroutine function (default:
+                fetch_ticker_info).
+            executor (Executor, optional): Executor for blocking fetches. When
+                omitted, the sensor creates and owns a thread pool
+                (default: None).
+            guard (UpstreamGuard, optional): Shared rate limiter and circuit
+                breaker of the upstream host. Every ticker fetch goes through
+                it, including retries (default: None).
+            fields (list or dict, optional): Field projection; every fetched
+                payload is reduced to a compact StockRecord of these fields
+                as soon as it arrives (default: None, full payload dicts).
+            cache (FetchCache, optional): Cache consulted before every ticker
+                fetch; cache hits skip the concurrency limit and the guard
+                (default: None).
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self.tickers = list(tickers)
+        self.name = f"StockBatchSensor[{len(self.tickers)} tickers]"
+        self.schedule_time = schedule_time
+        self.max_concurrency = max_concurrency
+        self.fetcher = fetcher
+        self._executor = executor
+        self._owns_executor = executor is None
+        self.guard = guard
+        self.projection = Projection(fields, "StockRecord") if fields else None
+        self.cache = cache
+        self._interval = schedule_interval(schedule_time) if cache is not None else None
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency,
+                thread_name_prefix="cryorithm-fetch",
+            )
+        return self._executor
+
+    async def _fetch(self, ticker):
+        if asyncio.iscoroutinefunction(self.fetcher):
+            return await self.fetcher(ticker)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), self.fetcher, ticker)
+
+    async def _load(self, semaphore, ticker):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                if self.guard is not None:
+                    info = await self.guard.call(self._fetch, ticker)
+                else:
+                    info = await self._fetch(ticker)
+            except Exception:
+                FETCH_ERRORS.labels("StockBatchSensor").inc()
+                raise
+            finally:
+                FETCH_SECONDS.labels("StockBatchSensor").observe(
+                    time.perf_counter() - started,
+                )
         return info
+
+    async def _fetch_one(self, semaphore, ticker):
+        if self.cache is not None:
+            fields = self.projection.fields if self.projection is not None else None
+            loader = partial(self._load, semaphore, ticker)
+            info = await self.cache.get(ticker, loader, fields, self._interval)
+        else:
+            info = await self._load(semaphore, ticker)
+        # Projected right away, so full payloads never pile up in a batch.
+        if self.projection is not None:
+            return self.projection(info)
+        return info
+
+    async def fetch_data(self, tickers=None):
+        """
+        Fetches every ticker concurrently.
+
+        Args:
+            tickers (list, optional): Overrides the configured tickers for this
+                call only (default: None).
+
+        Returns:
+            BatchResult: Per-ticker results and per-ticker errors.
+        """
+        tickers = self.tickers if tickers is None else list(tickers)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        outcomes = await asyncio.gather(
+            *(self._fetch_one(semaphore, ticker) for ticker in tickers),
+            return_exceptions=True,
+        )
+
+        batch = BatchResult()
+        for ticker, outcome in zip(tickers, outcomes):
+            if isinstance(outcome, Exception):
+                batch.errors[ticker] = outcome
+            else:
+                batch.results[ticker] = outcome
+        return batch
+
+    def close(self):
+        """Shuts down the thread pool if it is owned by this sensor."""
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
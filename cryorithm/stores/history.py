@@ -0,0 +1,474 @@
+"""
+Cryorithm™ | Stores | History
+"""
+
+# MIT License
+#
+# Copyright © 2024 Joshua M. Dotson (contact@jmdots.com)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from numbers import Number
+from pathlib import Path
+
+import numpy as np
+
+TIMESTAMP = "timestamp"
+_SCHEMA_FILE = "_schema.json"
+_SAFE_NAME = re.compile(r"^[A-Za-z0-9_.-]+$")
+# Tickers name directories, so they are restricted to plain symbols.
+_TICKER = re.compile(r"^[A-Za-z0-9.^=-]{1,16}$")
+
+
+def _is_numeric(value):
+    return isinstance(value, Number) and not isinstance(value, bool)
+
+
+def is_valid_ticker(ticker):
+    """Returns whether a ticker is a symbol the store can use as a directory."""
+    return (
+        isinstance(ticker, str)
+        and _TICKER.match(ticker) is not None
+        and ticker not in (".", "..")
+    )
+
+
+def _fsync(path):
+    # Opening read-only works for directories too, to persist their entries.
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _day(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+class HistoryStore:
+    """
+    Append-only columnar store of sensor snapshots.
+
+    Snapshots are partitioned by ticker and UTC day. Inside a partition every
+    field is its own column file: numeric fields are raw little-endian float64
+    arrays (NaN where missing) that are memory-mapped on read, and all other
+    fields are JSON lines. A numeric column that later receives other values
+    is rewritten as JSON lines instead of losing them. Queries only open the
+    partitions in the requested time range and only the projected columns, so
+    reading a handful of fields over months of history never touches the rest
+    of the data.
+
+    Each partition's `_schema.json` records the committed row count and the
+    committed byte length of every column. It is replaced atomically after the
+    columns are written, so a crash mid-append leaves trailing bytes that are
+    ignored by readers and truncated by the next append. An append writes all
+    its partitions first and syncs them in one pass before committing any
+    schema.
+
+    Layout:
+        <root>/<TICKER>/<YYYY-MM-DD>/_schema.json
+        <root>/<TICKER>/<YYYY-MM-DD>/timestamp.f8
+        <root>/<TICKER>/<YYYY-MM-DD>/<field>.f8 | <field>.jsonl
+
+    Attributes:
+        root (Path): Root directory of the store.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root).expanduser()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _file_name(field, kind):
+        name = field if _SAFE_NAME.match(field) and not field.startswith("_") else None
+        if name is None:
+            name = "_" + field.encode("utf-8").hex()
+        return f"{name}.{kind}"
+
+    @staticmethod
+    def _load_schema(partition):
+        path = partition / _SCHEMA_FILE
+        if not path.exists():
+            return {"rows": 0, "columns": {}}
+        with path.open("r") as f:
+            return json.load(f)
+
+    @staticmethod
+    def _write_schema(partition, schema):
+        tmp_path = partition / f"{_SCHEMA_FILE}.tmp"
+        with tmp_path.open("w") as f:
+            json.dump(schema, f)
+        return tmp_path
+
+    def append(self, ticker, snapshot, timestamp=None):
+        """
+        Appends one snapshot.
+
+        Args:
+            ticker (str): Stock ticker symbol.
+            snapshot (dict): Fields of the snapshot.
+            timestamp (float, optional): Epoch seconds (default: now).
+        """
+        self.append_many([(ticker, timestamp, snapshot)])
+
+    def append_many(self, records):
+        """
+        Appends many snapshots, writing each partition's columns once.
+
+        Args:
+            records (iterable): (ticker, timestamp, snapshot) tuples. A
+                timestamp of None means now.
+
+        Raises:
+            ValueError: If a ticker is not a valid symbol; nothing is written.
+        """
+        partitions = defaultdict(list)
+        now = time.time()
+        for ticker, timestamp, snapshot in records:
+            if not is_valid_ticker(ticker):
+                raise ValueError(f"Invalid ticker: {ticker!r}")
+            timestamp = now if timestamp is None else float(timestamp)
+            partitions[(ticker, _day(timestamp))].append((timestamp, snapshot))
+
+        with self._lock:
+            written = [
+                self._write_partition(self.root / ticker / day, rows)
+                for (ticker, day), rows in partitions.items()
+            ]
+            # Everything written is made durable in one pass, before any
+            # schema commits its rows.
+            for path in dict.fromkeys(p for _, paths, _ in written for p in paths):
+                _fsync(path)
+            for partition, _, _ in written:
+                os.replace(partition / f"{_SCHEMA_FILE}.tmp", partition / _SCHEMA_FILE)
+            for partition, _, retired in written:
+                _fsync(partition)
+                for path in retired:
+                    path.unlink(missing_ok=True)
+
+    def _write_partition(self, partition, rows):
+        """
+        Writes rows and a pending schema to a partition without syncing.
+
+        Returns:
+            tuple: (partition, paths to fsync before the schema is committed,
+            column files the new schema no longer uses).
+        """
+        paths = [d.parent for d in (partition.parent, partition) if not d.exists()]
+        partition.mkdir(parents=True, exist_ok=True)
+        schema = self._load_schema(partition)
+        columns = schema["columns"]
+        committed = schema["rows"]
+        retired = []
+
+        # New fields are typed by their first value and backfilled as missing.
+        for _, snapshot in rows:
+            for field, value in snapshot.items():
+                if field == TIMESTAMP or field in columns:
+                    continue
+                kind = "f8" if _is_numeric(value) else "jsonl"
+                path = partition / self._file_name(field, kind)
+                with path.open("wb") as f:
+                    f.write(self._encode(kind, [None] * committed))
+                columns[field] = {
+                    "kind": kind,
+                    "file": path.name,
+                    "bytes": path.stat().st_size,
+                }
+                paths.append(partition)
+        columns.setdefault(
+            TIMESTAMP,
+            {"kind": "f8", "file": "timestamp.f8", "bytes": 0},
+        )
+
+        for field, column in list(columns.items()):
+            if field == TIMESTAMP:
+                values = [timestamp for timestamp, _ in rows]
+            else:
+                values = [snapshot.get(field) for _, snapshot in rows]
+            if column["kind"] == "f8" and any(
+                value is not None and not _is_numeric(value) for value in values
+            ):
+                # A numeric column that receives other values becomes JSON,
+                # rather than storing them as missing.
+                retired.append(partition / column["file"])
+                column = columns[field] = self._widen(
+                    partition,
+                    field,
+                    column,
+                    committed,
+                )
+                paths.append(partition)
+            path = partition / column["file"]
+            with path.open("ab") as f:
+                f.truncate(column["bytes"])
+                f.write(self._encode(column["kind"], values))
+            column["bytes"] = path.stat().st_size
+            paths.append(path)
+
+        schema["rows"] = committed + len(rows)
+        paths.append(self._write_schema(partition, schema))
+        return partition, paths, retired
+
+    def _widen(self, partition, field, column, rows):
+        values = self._read_column(partition, column, rows).tolist()
+        path = partition / self._file_name(field, "jsonl")
+        with path.open("wb") as f:
+            # NaN marks a gap in numeric columns, null in JSON ones.
+            f.write(self._encode("jsonl", [v if v == v else None for v in values]))
+        return {"kind": "jsonl", "file": path.name, "bytes": path.stat().st_size}
+
+    @staticmethod
+    def _encode(kind, values):
+        if kind == "f8":
+            return np.array(
+                [v if _is_numeric(v) else np.nan for v in values],
+                dtype="<f8",
+            ).tobytes()
+        return "".join(
+            json.dumps(v, default=str, separators=(",", ":")) + "\n" for v in values
+        ).encode("utf-8")
+
+    @staticmethod
+    def _read_column(partition, column, rows):
+        path = partition / column["file"]
+        if column["kind"] == "f8":
+            if rows == 0:
+                return np.empty(0, dtype="<f8")
+            return np.memmap(path, dtype="<f8", mode="r", shape=(rows,))
+        with path.open("rb") as f:
+            lines = f.read(column["bytes"]).splitlines()[:rows]
+        values = np.empty(len(lines), dtype=object)
+        for i, line in enumerate(lines):
+            values[i] = json.loads(line)
+        return values
+
+    def tickers(self):
+        """Returns the tickers present in the store."""
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir())
+
+    def _partitions(self, ticker, start, end):
+        if not is_valid_ticker(ticker):
+            return
+        ticker_dir = self.root / ticker
+        if not ticker_dir.is_dir():
+            return
+        first = _day(start) if start is not None else None
+        last = _day(end) if end is not None else None
+        for partition in sorted(ticker_dir.iterdir()):
+            day = partition.name
+            if (first and day < first) or (last and day > last):
+                continue
+            yield partition
+
+    def latest(self, ticker):
+        """
+        Returns the last stored snapshot of a ticker, or None.
+
+        Missing fields are omitted, as in `iter_snapshots()`.
+        """
+        for partition in reversed(list(self._partitions(ticker, None, None))):
+            block = self._query_partition(partition, ticker, None, None, None)
+            if block:
+                # The last appended of the latest rows wins.
+                timestamps = block[TIMESTAMP][::-1]
+                last = len(timestamps) - 1 - int(np.argmax(timestamps))
+                row = {name: col[[last]] for name, col in block.items()}
+                return next(self._block_rows(ticker, row))[2]
+        return None
+
+    def query(self, tickers=None, start=None, end=None, fields=None):
+        """
+        Reads snapshots of a ticker set over a time range.
+
+        Args:
+            tickers (list, optional): Tickers to read (default: all tickers).
+            start (float, optional): Inclusive lower bound, epoch seconds
+                (default: None, unbounded).
+            end (float, optional): Exclusive upper bound, epoch seconds
+                (default: None, unbounded).
+            fields (list, optional): Fields to project (default: all fields).
+
+        Returns:
+            dict: Column arrays of equal length, including 'ticker' and
+            'timestamp', sorted by ticker and then timestamp. Numeric fields
+            are float64 arrays; other fields are object arrays.
+        """
+        if tickers is None:
+            tickers = self.tickers()
+
+        blocks = []
+        names = {"ticker": None, TIMESTAMP: None}
+        for ticker in tickers:
+            for partition in self._partitions(ticker, start, end):
+                block = self._query_partition(partition, ticker, start, end, fields)
+                if block:
+                    blocks.append(block)
+                    names.update(dict.fromkeys(block))
+        if fields is not None:
+            names = dict.fromkeys(["ticker", TIMESTAMP, *fields])
+
+        result = {}
+        for name in names:
+            parts = [
+                block.get(name, np.full(len(block[TIMESTAMP]), np.nan))
+                for block in blocks
+            ]
+            if not parts:
+                result[name] = np.empty(0)
+            elif all(part.dtype == np.float64 for part in parts):
+                result[name] = np.concatenate(parts)
+            else:
+                result[name] = np.concatenate([part.astype(object) for part in parts])
+        return result
+
+    def _query_partition(self, partition, ticker, start, end, fields):
+        schema = self._load_schema(partition)
+        rows, columns = schema["rows"], schema["columns"]
+        if not rows:
+            return None
+
+        timestamps = self._read_column(partition, columns[TIMESTAMP], rows)
+        mask = np.ones(rows, dtype=bool)
+        if start is not None:
+            mask &= timestamps >= start
+        if end is not None:
+            mask &= timestamps < end
+        count = int(mask.sum())
+        if not count:
+            return None
+
+        block = {
+            "ticker": np.full(count, ticker, dtype=object),
+            TIMESTAMP: np.array(timestamps[mask]),
+        }
+        for field in fields if fields is not None else columns:
+            if field == TIMESTAMP or field not in columns:
+                continue
+            values = self._read_column(partition, columns[field], rows)
+            block[field] = np.array(values[mask])
+        return block
+
+    def iter_snapshots(
+        self, tickers=None, start=None, end=None, fields=None, window=3600
+    ):
+        """
+        Lazily yields stored snapshots in time order.
+
+        Each day partition is read once, and its snapshots are built one
+        `window` of seconds at a time across all tickers, so memory use
+        depends on a day of columns and the number of tickers, not on the
+        length of the history.
+
+        Args:
+            tickers (list, optional): Tickers to read (default: all tickers).
+            start (float, optional): Inclusive lower bound, epoch seconds
+                (default: None, unbounded).
+            end (float, optional): Exclusive upper bound, epoch seconds
+                (default: None, unbounded).
+            fields (list, optional): Fields to project (default: all fields).
+            window (float, optional): Seconds read per step (default: 3600).
+
+        Yields:
+            tuple: (timestamp, ticker, snapshot) with missing fields omitted,
+            ordered by timestamp and then ticker.
+        """
+        if tickers is None:
+            tickers = self.tickers()
+        tickers = [ticker for ticker in tickers if is_valid_ticker(ticker)]
+        days = sorted(
+            {
+                partition.name
+                for ticker in tickers
+                for partition in self._partitions(ticker, start, end)
+            },
+        )
+        for day in days:
+            day_start = (
+                datetime.strptime(day, "%Y-%m-%d")
+                .replace(tzinfo=timezone.utc)
+                .timestamp()
+            )
+            day_end = day_start + 86400 if end is None else min(day_start + 86400, end)
+            day_start = day_start if start is None else max(day_start, start)
+            # Each partition is read once per day and sliced into windows.
+            blocks = []
+            for ticker in tickers:
+                partition = self.root / ticker / day
+                if not partition.is_dir():
+                    continue
+                block = self._query_partition(
+                    partition,
+                    ticker,
+                    day_start,
+                    day_end,
+                    fields,
+                )
+                if block:
+                    order = np.argsort(block[TIMESTAMP], kind="stable")
+                    blocks.append(
+                        (ticker, {name: col[order] for name, col in block.items()}),
+                    )
+            window_start = day_start
+            while window_start < day_end:
+                window_end = min(window_start + window, day_end)
+                rows = []
+                for ticker, block in blocks:
+                    lo, hi = np.searchsorted(
+                        block[TIMESTAMP],
+                        [window_start, window_end],
+                        side="left",
+                    )
+                    if hi > lo:
+                        window_block = {name: col[lo:hi] for name, col in block.items()}
+                        rows.extend(self._block_rows(ticker, window_block))
+                rows.sort(key=lambda row: (row[0], row[1]))
+                yield from rows
+                window_start = window_end
+
+    @staticmethod
+    def _block_rows(ticker, block):
+        names = [name for name in block if name not in ("ticker", TIMESTAMP)]
+        timestamps = block[TIMESTAMP].tolist()
+        columns = [block[name].tolist() for name in names]
+        rows = zip(*columns) if columns else [()] * len(timestamps)
+        for timestamp, values in zip(timestamps, rows):
+            snapshot = {
+                name: value
+                for name, value in zip(names, values)
+                if value is not None and value == value  # NaN marks a gap.
+            }
+            yield timestamp, ticker, snapshot
+
+    def query_frame(self, tickers=None, start=None, end=None, fields=None):
+        """
+        Same as `query()`, returned as a pandas DataFrame.
+        """
+        import pandas as pd
+
+        return pd.DataFrame(self.query(tickers, start, end, fields))
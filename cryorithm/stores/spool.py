@@ -0,0 +1,401 @@
+"""
+Cryorithm™ | Stores | Spool
+"""
+
+# MIT License
+#
+# Copyright © 2024 Joshua M. Dotson (contact@jmdots.com)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import asyncio
+import fcntl
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from pathlib import Path
+
+from cryorithm.managers.metrics import registry
+
+# Frame header: body length, CRC-32 of the body, key length, headers length.
+_FRAME = struct.Struct(">IIHH")
+_SEGMENT_NAME = re.compile(r"^(\d{20})\.(open|seg)$")
+_CHECKPOINT_FILE = "checkpoint"
+_LOCK_FILE = ".lock"
+
+SPOOL_APPENDED = registry.counter(
+    "cryorithm_spool_appended_total",
+    "Records appended to the write-ahead spool.",
+)
+SPOOL_BACKLOG_BYTES = registry.gauge(
+    "cryorithm_spool_backlog_bytes",
+    "Bytes in spool segments not yet drained.",
+)
+SPOOL_FSYNC_SECONDS = registry.histogram(
+    "cryorithm_spool_fsync_seconds",
+    "Duration of batched spool fsyncs.",
+)
+
+
+def _encode_headers(headers):
+    parts = [bytes([len(headers or ())])]
+    for name, value in headers or ():
+        name = name.encode()
+        if isinstance(value, str):
+            value = value.encode()
+        parts.append(struct.pack(">B", len(name)) + name)
+        parts.append(struct.pack(">H", len(value)) + value)
+    return b"".join(parts)
+
+
+def _decode_headers(blob):
+    headers = []
+    view = memoryview(blob)[1:]
+    for _ in range(blob[0]):
+        size = view[0]
+        name, view = bytes(view[1:][:size]).decode(), view[1:][size:]
+        (size,) = struct.unpack_from(">H", view)
+        value, view = bytes(view[2:][:size]), view[2:][size:]
+        headers.append((name, value))
+    return headers
+
+
+def encode_frame(key, value, headers=None):
+    """Encodes one spool record as a length-prefixed, checksummed frame."""
+    if isinstance(key, str):
+        key = key.encode()
+    key = key or b""
+    header_blob = _encode_headers(headers)
+    body = key + header_blob + value
+    return _FRAME.pack(len(body), zlib.crc32(body), len(key), len(header_blob)) + body
+
+
+def read_frames(path, offset=0, max_records=None):
+    """
+    Reads frames from a segment file.
+
+    Reading stops at the end of the file, after `max_records` records, or at
+    the first torn or corrupt frame, which can only be the tail of a segment
+    that was being written when the process died.
+
+    Returns:
+        tuple: A list of `SpoolRecord` and the offset after the last one.
+    """
+    records = []
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while max_records is None or len(records) < max_records:
+            header = f.read(_FRAME.size)
+            if len(header) < _FRAME.size:
+                break
+            length, crc, key_length, headers_length = _FRAME.unpack(header)
+            body = f.read(length)
+            if len(body) < length or zlib.crc32(body) != crc:
+                break
+            value_start = key_length + headers_length
+            records.append(
+                SpoolRecord(
+                    segment=int(Path(path).name[:20]),
+                    offset=offset,
+                    key=body[:key_length] or None,
+                    headers=_decode_headers(body[key_length:value_start]),
+                    value=body[value_start:],
+                ),
+            )
+            offset += _FRAME.size + length
+    return records, offset
+
+
+class SpoolRecord:
+    """
+    A record read back from the spool.
+
+    Attributes:
+        segment (int): Sequence number of the record's segment.
+        offset (int): Byte offset of the record in its segment.
+        key (bytes): Message key, or None.
+        headers (list): Message headers as (name, bytes) pairs.
+        value (bytes): Message payload.
+    """
+
+    __slots__ = ("segment", "offset", "key", "headers", "value")
+
+    def __init__(self, segment, offset, key, headers, value):
+        self.segment = segment
+        self.offset = offset
+        self.key = key
+        self.headers = headers
+        self.value = value
+
+    @property
+    def position(self):
+        """Spool position `<segment>:<offset>`, unique within one spool."""
+        return f"{self.segment}:{self.offset}"
+
+
+class Spool:
+    """
+    Durable append-only write-ahead spool of messages.
+
+    Records are appended to the active segment file, `<sequence>.open`, and
+    made durable by a group commit: `append()` returns once an fsync covering
+    the record has completed, and a single fsync serves every record appended
+    in the meantime. The active segment is sealed, i.e. fsynced and renamed
+    to `<sequence>.seg`, once it exceeds `segment_bytes` or `segment_age`
+    seconds. Only sealed segments are drained.
+
+    Drain progress is kept in a checkpoint file holding the segment and byte
+    offset of the next undelivered record. `ack()` advances it and deletes
+    fully drained segments. On restart, a segment left open by a crash is
+    sealed as is; a torn final frame is skipped by the CRC check.
+
+    A spool directory belongs to one process: an exclusive lock on its
+    `.lock` file is held until `close()`, and opening a directory another
+    process holds raises RuntimeError.
+
+    Attributes:
+        path (Path): Spool directory.
+        segment_bytes (int): Size at which the active segment is sealed.
+        segment_age (float): Age in seconds at which a non-empty active
+            segment is sealed.
+        fsync_interval (float): Maximum seconds an append waits for the group
+            commit.
+    """
+
+    def __init__(
+        self,
+        path,
+        segment_bytes=64 * 1024 * 1024,
+        segment_age=1.0,
+        fsync_interval=0.01,
+        clock=time.monotonic,
+    ):
+        self.path = Path(path).expanduser()
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.segment_age = segment_age
+        self.fsync_interval = fsync_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._file = None
+        self._sequence = 0
+        self._size = 0
+        self._opened_at = 0.0
+        self._unsynced = []
+        self._commit_task = None
+
+        self._lock_file = open(self.path / _LOCK_FILE, "a")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock_file.close()
+            raise RuntimeError(
+                f"Spool directory {self.path} is in use by another process",
+            ) from None
+
+        # Seal whatever a previous process left open. Sequence numbers never go
+        # back below the checkpoint, even when every segment was drained.
+        self._sequence = self.checkpoint()[0]
+        for sequence, state in self._segments(include_open=True):
+            if state == "open":
+                self._segment_path(sequence, "open").rename(
+                    self._segment_path(sequence, "seg"),
+                )
+            self._sequence = max(self._sequence, sequence)
+        self._update_backlog()
+
+    def _segment_path(self, sequence, state):
+        return self.path / f"{sequence:020d}.{state}"
+
+    def _segments(self, include_open=False):
+        segments = []
+        for entry in self.path.iterdir():
+            match = _SEGMENT_NAME.match(entry.name)
+            if match and (include_open or match.group(2) == "seg"):
+                segments.append((int(match.group(1)), match.group(2)))
+        return sorted(segments)
+
+    def sealed_segments(self):
+        """Returns the paths of sealed segments in append order."""
+        return [self._segment_path(sequence, "seg") for sequence, _ in self._segments()]
+
+    def _open_segment(self):
+        self._sequence += 1
+        self._file = open(self._segment_path(self._sequence, "open"), "ab")
+        self._size = 0
+        self._opened_at = self._clock()
+
+    def _seal(self):
+        # Called with the lock held.
+        if self._file is None:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+        self._segment_path(self._sequence, "open").rename(
+            self._segment_path(self._sequence, "seg"),
+        )
+
+    def write(self, key, value, headers=None):
+        """
+        Appends a record without waiting for it to become durable.
+
+        Use `append()` from async code, or call `sync()` afterwards.
+        """
+        frame = encode_frame(key, value, headers)
+        with self._lock:
+            if self._file is None:
+                self._open_segment()
+            self._file.write(frame)
+            self._size += len(frame)
+            if self._size >= self.segment_bytes:
+                self._seal()
+        SPOOL_APPENDED.inc()
+        SPOOL_BACKLOG_BYTES.inc(len(frame))
+
+    def sync(self):
+        """Makes every record written so far durable."""
+        with SPOOL_FSYNC_SECONDS.time(), self._lock:
+            if self._file is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+
+    def roll(self, force=False):
+        """
+        Seals the active segment once it is older than `segment_age`, so its
+        records become drainable.
+
+        Returns:
+            bool: Whether a segment was sealed.
+        """
+        with self._lock:
+            if self._file is None or self._size == 0:
+                return False
+            if force or self._clock() - self._opened_at >= self.segment_age:
+                self._seal()
+                return True
+        return False
+
+    async def append(self, key, value, headers=None):
+        """
+        Appends a record and waits until it is durable on disk.
+
+        Concurrent appends share one fsync, issued at most `fsync_interval`
+        seconds after the first of them.
+        """
+        self.write(key, value, headers)
+        future = asyncio.get_running_loop().create_future()
+        self._unsynced.append(future)
+        if self._commit_task is None or self._commit_task.done():
+            self._commit_task = asyncio.ensure_future(self._group_commit())
+        await future
+
+    async def _group_commit(self):
+        while self._unsynced:
+            await asyncio.sleep(self.fsync_interval)
+            waiters, self._unsynced = self._unsynced, []
+            try:
+                await asyncio.to_thread(self.sync)
+            except Exception as e:
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(e)
+            else:
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(None)
+
+    def checkpoint(self):
+        """Returns the (segment, offset) of the next record to drain."""
+        try:
+            segment, offset = (self.path / _CHECKPOINT_FILE).read_text().split(":")
+            return int(segment), int(offset)
+        except (FileNotFoundError, ValueError):
+            return 0, 0
+
+    def read(self, max_records=10000):
+        """
+        Returns the next undrained records of the oldest sealed segments.
+
+        Records are returned from the checkpoint on, and never span more than
+        the first sealed segment that still has records.
+        """
+        segment, offset = self.checkpoint()
+        for path in self.sealed_segments():
+            sequence = int(path.name[:20])
+            if sequence < segment:
+                continue
+            records, _ = read_frames(
+                path,
+                offset if sequence == segment else 0,
+                max_records=max_records,
+            )
+            if records:
+                return records
+            # Fully drained segment; it is removed by the next ack().
+        return []
+
+    def ack(self, record):
+        """
+        Marks every record up to and including `record` as delivered.
+
+        The checkpoint is written atomically and segments before it are
+        deleted.
+        """
+        path = self._segment_path(record.segment, "seg")
+        _, next_offset = read_frames(path, record.offset, max_records=1)
+        checkpoint = self.path / _CHECKPOINT_FILE
+        tmp_path = checkpoint.with_name(f".{_CHECKPOINT_FILE}.tmp")
+        with open(tmp_path, "w") as f:
+            f.write(f"{record.segment}:{next_offset}")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, checkpoint)
+
+        done = path.stat().st_size <= next_offset
+        for sealed in self.sealed_segments():
+            sequence = int(sealed.name[:20])
+            if sequence < record.segment or (done and sequence == record.segment):
+                sealed.unlink()
+        self._update_backlog()
+
+    def _update_backlog(self):
+        segment, offset = self.checkpoint()
+        backlog = 0
+        for sequence, state in self._segments(include_open=True):
+            try:
+                size = self._segment_path(sequence, state).stat().st_size
+            except FileNotFoundError:
+                # Sealed concurrently; its bytes are counted on the next update.
+                continue
+            backlog += size - offset if sequence == segment else size
+        SPOOL_BACKLOG_BYTES.set(max(backlog, 0))
+
+    def close(self):
+        """Seals the active segment and releases the spool directory."""
+        with self._lock:
+            self._seal()
+        if not self._lock_file.closed:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
@@ -0,0 +1,210 @@
+"""
+Cryorithm™ | Transforms | Diff
+"""
+
+# MIT License
+#
+# Copyright © 2024 Joshua M. Dotson (contact@jmdots.com)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import math
+import time
+from numbers import Number
+
+_MISSING = object()
+
+
+class SnapshotDelta:
+    """
+    Field-level change between two snapshots of the same ticker.
+
+    Attributes:
+        ticker (str): Stock ticker symbol.
+        changes (dict): New values of added or changed fields. For keyframes,
+            the complete snapshot.
+        removed (list): Fields present in the previous snapshot but not in the
+            current one.
+        keyframe (bool): Whether this delta carries the full snapshot.
+        timestamp (float): Time the delta was computed, in epoch seconds.
+    """
+
+    __slots__ = ("ticker", "changes", "removed", "keyframe", "timestamp")
+
+    def __init__(self, ticker, changes, removed=(), keyframe=False, timestamp=None):
+        self.ticker = ticker
+        self.changes = changes
+        self.removed = list(removed)
+        self.keyframe = keyframe
+        self.timestamp = timestamp if timestamp is not None else time.time()
+
+    def __bool__(self):
+        return self.keyframe or bool(self.changes) or bool(self.removed)
+
+    def __repr__(self):
+        kind = "keyframe" if self.keyframe else "delta"
+        return (
+            f"SnapshotDelta({self.ticker}, {kind}, changes={len(self.changes)}, "
+            f"removed={len(self.removed)})"
+        )
+
+    def to_dict(self):
+        return {
+            "ticker": self.ticker,
+            "keyframe": self.keyframe,
+            "timestamp": self.timestamp,
+            "changes": self.changes,
+            "removed": self.removed,
+        }
+
+
+class SnapshotDiffer:
+    """
+    Keeps the last emitted snapshot per ticker and computes field-level deltas.
+
+    Numeric fields only count as changed when they move by more than their
+    tolerance, relative to the last emitted value, so slow drift is still
+    reported once it accumulates. Ignored fields are never compared or
+    emitted. A full keyframe is emitted for the first snapshot of a ticker and
+    then every `keyframe_interval` seconds so downstream consumers can resync.
+
+    Attributes:
+        abs_tolerance (float): Default absolute tolerance for numeric fields.
+        rel_tolerance (float): Default relative tolerance for numeric fields.
+        field_tolerances (dict): Absolute tolerance per field, overriding the
+            defaults.
+        ignore_fields (set): Fields excluded from deltas.
+        keyframe_interval (float): Seconds between full keyframes, or None to
+            only send one for the first snapshot.
+    """
+
+    def __init__(
+        self,
+        abs_tolerance=0.0,
+        rel_tolerance=0.0,
+        field_tolerances=None,
+        ignore_fields=(),
+        keyframe_interval=3600,
+        clock=time.time,
+    ):
+        self.abs_tolerance = abs_tolerance
+        self.rel_tolerance = rel_tolerance
+        self.field_tolerances = dict(field_tolerances or {})
+        self.ignore_fields = set(ignore_fields)
+        self.keyframe_interval = keyframe_interval
+        self._clock = clock
+        self._snapshots = {}
+        self._keyframe_times = {}
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Builds a differ from a ConfigManager configuration dict.
+        """
+        ignore_fields = config.get("diff_ignore_fields") or ()
+        if isinstance(ignore_fields, str):
+            ignore_fields = [f.strip() for f in ignore_fields.split(",") if f.strip()]
+        keyframe_interval = config.get("diff_keyframe_interval")
+        return cls(
+            abs_tolerance=float(config.get("diff_abs_tolerance", 0.0)),
+            rel_tolerance=float(config.get("diff_rel_tolerance", 0.0)),
+            field_tolerances=config.get("diff_field_tolerances"),
+            ignore_fields=ignore_fields,
+            keyframe_interval=(
+                float(keyframe_interval) if keyframe_interval is not None else None
+            ),
+        )
+
+    def _is_changed(self, field, old, new):
+        if old is _MISSING:
+            return True
+        if (
+            isinstance(old, Number)
+            and isinstance(new, Number)
+            and not isinstance(old, bool)
+            and not isinstance(new, bool)
+        ):
+            old_finite, new_finite = math.isfinite(old), math.isfinite(new)
+            if not (old_finite and new_finite):
+                # Tolerances only apply between finite values; gaining or
+                # losing a value (NaN) or overflowing is always a change.
+                if old_finite != new_finite:
+                    return True
+                if math.isnan(old) and math.isnan(new):
+                    return False
+                return old != new
+            tolerance = self.field_tolerances.get(
+                field,
+                max(self.abs_tolerance, self.rel_tolerance * abs(old)),
+            )
+            return abs(new - old) > tolerance
+        return old != new
+
+    def diff(self, ticker, snapshot, now=None):
+        """
+        Compares a snapshot against the last one emitted for the ticker.
+
+        Args:
+            ticker (str): Stock ticker symbol.
+            snapshot (dict): Current fundamentals.
+            now (float, optional): Time of the snapshot, e.g. when replaying
+                history (default: None, the differ's clock).
+
+        Returns:
+            SnapshotDelta: The delta, which is falsy when nothing changed.
+        """
+        if now is None:
+            now = self._clock()
+        current = {k: v for k, v in snapshot.items() if k not in self.ignore_fields}
+        previous = self._snapshots.get(ticker)
+        last_keyframe = self._keyframe_times.get(ticker)
+
+        if previous is None or (
+            self.keyframe_interval is not None
+            and now - last_keyframe >= self.keyframe_interval
+        ):
+            self._snapshots[ticker] = current
+            self._keyframe_times[ticker] = now
+            return SnapshotDelta(ticker, dict(current), keyframe=True, timestamp=now)
+
+        changes = {
+            field: value
+            for field, value in current.items()
+            if self._is_changed(field, previous.get(field, _MISSING), value)
+        }
+        removed = [field for field in previous if field not in current]
+
+        # Only advance the baseline for emitted fields, so sub-tolerance moves
+        # accumulate until they are large enough to report.
+        previous.update(changes)
+        for field in removed:
+            del previous[field]
+
+        return SnapshotDelta(ticker, changes, removed, timestamp=now)
+
+    def reset(self, ticker=None):
+        """
+        Forgets the stored snapshot of one ticker, or of all tickers.
+        """
+        if ticker is None:
+            self._snapshots.clear()
+            self._keyframe_times.clear()
+        else:
+            self._snapshots.pop(ticker, None)
+            self._keyframe_times.pop(ticker, None)
@@ -0,0 +1,111 @@
+"""
+Measures event-loop latency while logging large data records, comparing the
+synchronous text sink with the queue-backed JSON lines sink.
+
+Usage: python ./helpers/bench_log_latency.py [--records N] [--fields N]
+           [--burst N] [--pause SECONDS]
+"""
+
+# MIT License
+#
+# Copyright © 2024 Joshua M. Dotson (contact@jmdots.com)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from loguru import logger
+
+from cryorithm.managers.log import LogManager
+
+
+async def monitor_lag(stop, interval, samples):
+    # Each sample is how late a short sleep resumes, i.e. event-loop blocking.
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - started - interval)
+
+
+async def log_records(log_manager, records, payload, burst, pause):
+    # Mimics sweeps: a burst of data events, then the loop is idle until the
+    # next tick.
+    for i in range(records):
+        log_manager.info("Data fetched from {sensor}", sensor="bench", data=payload)
+        if i % burst == burst - 1:
+            await asyncio.sleep(pause)
+
+
+async def measure(log_manager, records, payload, burst, pause, interval=0.001):
+    stop = asyncio.Event()
+    samples = []
+    monitor = asyncio.create_task(monitor_lag(stop, interval, samples))
+    started = time.perf_counter()
+    await log_records(log_manager, records, payload, burst, pause)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await monitor
+    samples.sort()
+    return {
+        "elapsed_s": elapsed,
+        "lag_p50_ms": statistics.median(samples) * 1000 if samples else 0.0,
+        "lag_p99_ms": samples[int(len(samples) * 0.99)] * 1000 if samples else 0.0,
+        "lag_max_ms": samples[-1] * 1000 if samples else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=5000)
+    parser.add_argument("--fields", type=int, default=150)
+    parser.add_argument("--burst", type=int, default=50)
+    parser.add_argument("--pause", type=float, default=0.02)
+    args = parser.parse_args()
+
+    payload = {f"field{i}": i * 1.5 for i in range(args.fields)}
+    logger.remove()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for log_format in ("text", "json"):
+            log_manager = LogManager(
+                sink=Path(tmp) / f"bench.{log_format}",
+                level="INFO",
+                structured=log_format == "json",
+                queue_size=args.records,
+            )
+            result = asyncio.run(
+                measure(log_manager, args.records, payload, args.burst, args.pause),
+            )
+            log_manager.close()
+            print(
+                f"{log_format:>5}: {args.records} records in "
+                f"{result['elapsed_s']:.3f}s, loop lag p50 "
+                f"{result['lag_p50_ms']:.2f}ms p99 {result['lag_p99_ms']:.2f}ms "
+                f"max {result['lag_max_ms']:.2f}ms",
+            )
+
+
+if __name__ == "__main__":
+    main()
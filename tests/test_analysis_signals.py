@@ -0,0 +1,69 @@
+"""
+Tests for cryorithm/analysis/signals.py
+"""
+
+import numpy as np
+import pytest
+
+from cryorithm.analysis.signals import (
+    SignalEngine,
+    build_panel,
+    rolling_zscore,
+    threshold_crossings,
+)
+from cryorithm.stores.history import HistoryStore
+
+
+def test_build_panel_keeps_empty_bins():
+    """Test bins without snapshots become rows and are forward-filled"""
+    columns = {
+        "ticker": ["DASH", "ABNB", "DASH", "DASH", "ABNB"],
+        "timestamp": [0.0, 10.0, 30.0, 190.0, 200.0],
+        "price": [1.0, 5.0, 2.0, 3.0, 6.0],
+    }
+    panel = build_panel(columns, "price", freq=60.0)
+    np.testing.assert_array_equal(panel.timestamps, [0.0, 60.0, 120.0, 180.0])
+    assert list(panel.tickers) == ["ABNB", "DASH"]
+    # The latest snapshot of a bin wins; empty bins carry the last value.
+    np.testing.assert_array_equal(
+        panel.values,
+        [[5.0, 2.0], [5.0, 2.0], [5.0, 2.0], [6.0, 3.0]],
+    )
+
+    gaps = build_panel(columns, "price", freq=60.0, ffill=False)
+    assert np.isnan(gaps.values[1:3]).all()
+
+
+def test_rolling_zscore():
+    """Test z-scores use the trailing window and skip flat windows"""
+    values = np.array([[1.0, 5.0], [2.0, 5.0], [3.0, 5.0], [10.0, 5.0]])
+    zscores = rolling_zscore(values, 3)
+    assert np.isnan(zscores[:2]).all()
+    assert zscores[2, 0] == pytest.approx(1.0)
+    assert zscores[3, 0] == pytest.approx(1.1471, abs=1e-4)
+    assert np.isnan(zscores[:, 1]).all()
+
+
+def test_threshold_crossings():
+    """Test crossings are marked only on the row that crosses"""
+    values = np.array([[0.0], [2.5], [3.0], [0.0], [-2.5], [np.nan], [-3.0]])
+    np.testing.assert_array_equal(
+        threshold_crossings(values, 2.0)[:, 0],
+        [0, 1, 0, 0, -1, 0, 0],
+    )
+
+
+def test_latest_signals_reads_history(tmp_path):
+    """Test a jump after a gap in the history is scored in the latest bin"""
+    history = HistoryStore(tmp_path)
+    rows = [("DASH", i * 60.0, {"currentPrice": 100.0 + i % 2}) for i in range(8)]
+    # Nothing is stored for the two bins before the jump.
+    rows.append(("DASH", 10 * 60.0, {"currentPrice": 120.0}))
+    history.append_many(rows)
+
+    engine = SignalEngine(["currentPrice"], window=10, zscore_threshold=2.0)
+    (signal,) = engine.latest_signals(history, now=10 * 60.0 + 5)
+    assert signal["ticker"] == "DASH"
+    assert signal["timestamp"] == 600.0
+    assert signal["signal"] == "zscore_cross_up"
+    assert signal["pct_change"] == pytest.approx(120.0 / 101.0 - 1.0)
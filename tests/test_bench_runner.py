@@ -0,0 +1,35 @@
+"""
+Tests for cryorithm/bench/runner.py
+"""
+
+import pytest
+
+from cryorithm.bench.runner import compare_reports, run_benchmark
+from cryorithm.managers.log import LogManager
+
+
+@pytest.mark.asyncio
+async def test_run_benchmark_end_to_end(tmp_path):
+    """Test a small benchmark drives every fake through the job path"""
+    log_manager = LogManager(sink=tmp_path / "bench.log", level="WARNING")
+    try:
+        report = await run_benchmark(
+            log_manager,
+            tickers=20,
+            rounds=2,
+            fetch_latency=0,
+            payload_fields=10,
+            openai=True,
+            openai_latency=0,
+        )
+    finally:
+        log_manager.close()
+
+    results = report["results"]
+    assert results["fetches"] == 40
+    assert results["kafka_messages"] == 40
+    assert results["llm_completions"] == 40
+    assert results["tickers_per_sec"] > 0
+
+    rows = {metric: change for metric, _, _, change in compare_reports(report, report)}
+    assert rows["tickers_per_sec"] == 0
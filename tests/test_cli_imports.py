@@ -0,0 +1,58 @@
+"""
+Tests for cryorithm/cli/imports.py
+"""
+
+import subprocess
+import sys
+
+from cryorithm.cli.imports import format_report, parse_importtime
+from cryorithm.managers.config import ConfigManager
+
+REPORT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _io
+import time:       300 |        420 |   encodings
+import time:        50 |        470 | site
+YAML configuration file not found
+"""
+
+
+def test_parse_importtime():
+    """Test timings, nesting depth and non-timing lines"""
+    timings = parse_importtime(REPORT)
+    assert [(t.module, t.depth) for t in timings] == [
+        ("_io", 2),
+        ("encodings", 1),
+        ("site", 0),
+    ]
+    assert timings[1].self_us == 300
+    assert timings[1].cumulative_us == 420
+    assert format_report(timings, top=1).splitlines()[1].startswith("site")
+
+
+def test_cli_does_not_import_heavy_stacks():
+    """Test the CLI module leaves destination and sensor stacks unloaded"""
+    heavy = ["yfinance", "pandas", "openai", "confluent_kafka", "apscheduler"]
+    code = (
+        "import sys, cryorithm.cli.main; "
+        f"print(','.join(m for m in {heavy!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == ""
+
+
+def test_config_lists_modules_of_destinations():
+    """Test only the configured destinations' modules are required"""
+    config_manager = ConfigManager()
+    assert "cryorithm.clients.kafka" not in config_manager.get_modules()
+
+    config_manager.update_from_cli({"destination": "kafka", "history_path": "h"})
+    modules = config_manager.get_modules()
+    assert "cryorithm.clients.kafka" in modules
+    assert "cryorithm.stores.history" in modules
+    assert "cryorithm.clients.openai" not in modules
@@ -0,0 +1,132 @@
+"""
+Tests for cryorithm/clients/kafka.py
+"""
+
+import threading
+
+import pytest
+from confluent_kafka import KafkaException
+
+from cryorithm.clients.kafka import (
+    KafkaDestination,
+    KafkaProducerClient,
+    send_to_kafka,
+)
+from cryorithm.managers.log import LogManager
+from cryorithm.managers.router import Router
+
+
+class FakeProducer:
+    """In-process stand-in for confluent_kafka.Producer."""
+
+    instances = 0
+
+    def __init__(self, config, fail=False):
+        FakeProducer.instances += 1
+        self.config = config
+        self.fail = fail
+        self.delivered = []
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def produce(self, topic, value=None, key=None, headers=None, on_delivery=None):
+        with self._lock:
+            self._pending.append((topic, value, key, on_delivery))
+
+    def poll(self, timeout=None):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for topic, value, key, on_delivery in pending:
+            self.delivered.append((topic, value, key))
+            on_delivery("broker down" if self.fail else None, value)
+        return len(pending)
+
+    def flush(self, timeout=None):
+        self.poll()
+        return 0
+
+
+@pytest.mark.asyncio
+async def test_producer_client_reuses_one_producer():
+    """Test many messages share a single long-lived producer"""
+    FakeProducer.instances = 0
+    client = KafkaProducerClient(
+        "localhost:9092",
+        "signals",
+        linger_ms=5,
+        producer_factory=FakeProducer,
+    )
+    async with client:
+        futures = [await client.produce(f"msg-{i}") for i in range(100)]
+        results = [await future for future in futures]
+
+    assert FakeProducer.instances == 1
+    assert results[0] == b"msg-0"
+    assert client.producer_config["linger.ms"] == 5
+
+
+@pytest.mark.asyncio
+async def test_producer_client_surfaces_delivery_errors():
+    """Test failed delivery reports raise from the awaited future"""
+    client = KafkaProducerClient(
+        "localhost:9092",
+        "signals",
+        producer_factory=lambda config: FakeProducer(config, fail=True),
+    )
+    async with client:
+        with pytest.raises(KafkaException):
+            await client.send("msg")
+
+
+@pytest.mark.asyncio
+async def test_send_to_kafka_uses_shared_producer():
+    """Test send_to_kafka forwards to the application's producer"""
+    client = KafkaProducerClient(
+        "localhost:9092",
+        "signals",
+        producer_factory=FakeProducer,
+    )
+    async with client:
+        await send_to_kafka("hello", {}, producer=client)
+        assert client._producer.delivered == [("signals", b"hello", None)]
+
+
+@pytest.mark.asyncio
+async def test_kafka_lane_delivers_batches(tmp_path):
+    """Test a Router lane hands batches to the destination's send_batch"""
+    client = KafkaProducerClient(
+        "localhost:9092",
+        "signals",
+        producer_factory=FakeProducer,
+    )
+    destination = KafkaDestination(client)
+    batches = []
+    send_batch = destination.send_batch
+
+    async def recording_send_batch(records):
+        batches.append(len(records))
+        await send_batch(records)
+
+    destination.send_batch = recording_send_batch
+    log_manager = LogManager(sink=tmp_path / "test.log")
+    router = Router(log_manager)
+    router.add(destination, name="kafka", batch_size=500)
+    async with client:
+        for i in range(100):
+            await router.route(
+                {
+                    "ticker": f"T{i}",
+                    "timestamp": 0.0,
+                    "keyframe": True,
+                    "changes": {"currentPrice": float(i)},
+                    "removed": [],
+                },
+            )
+        router.start()
+        await router.close()
+        producer = client._producer
+    log_manager.close()
+
+    assert batches == [100]
+    assert [key for _, _, key in producer.delivered] == [f"T{i}" for i in range(100)]
+    assert destination.failed == 0
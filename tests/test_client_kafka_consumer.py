@@ -0,0 +1,143 @@
+"""
+Tests for cryorithm/clients/kafka_consumer.py
+"""
+
+from cryorithm.bench.fakes import FakeBroker, FakeConsumer
+from cryorithm.clients.kafka import DEDUP_HEADER
+from cryorithm.clients.kafka_consumer import (
+    HistorySink,
+    KafkaBatchConsumer,
+    run_consumer,
+)
+from cryorithm.managers.log import LogManager
+from cryorithm.schemas.sensor_status import StatusCodec
+from cryorithm.stores.history import HistoryStore
+from cryorithm.transforms.diff import SnapshotDiffer
+
+
+def _fill(broker, count, codec):
+    for i in range(count):
+        record = {
+            "ticker": f"T{i % 10}",
+            "timestamp": 1_700_000_000 + i,
+            "keyframe": False,
+            "changes": {"currentPrice": 100.0 + i},
+            "removed": [],
+        }
+        headers = codec.headers + [(DEDUP_HEADER, f"node/1:{i}".encode())]
+        broker.append("signals", codec.encode(record), record["ticker"], headers)
+
+
+def _consumer(broker, **kwargs):
+    return KafkaBatchConsumer(
+        "localhost:9092",
+        "signals",
+        consumer_factory=lambda config: FakeConsumer(config, broker),
+        **kwargs,
+    )
+
+
+def test_batches_are_written_then_committed(tmp_path):
+    """Test records land in the history store and offsets are committed"""
+    broker = FakeBroker(partitions=3)
+    codec = StatusCodec("json")
+    _fill(broker, 1000, codec)
+    # A redelivered message carries the same dedup key and is dropped.
+    _fill(broker, 1, codec)
+    log_manager = LogManager(sink=tmp_path / "test.log")
+    history = HistoryStore(tmp_path / "history")
+
+    consumer = _consumer(broker, batch_size=256)
+    stats = run_consumer(consumer, HistorySink(history), log_manager, idle_batches=1)
+    consumer.close()
+    log_manager.close()
+
+    assert stats["consumed"] == 1000
+    assert stats["duplicates"] == 1
+    assert len(history.query(fields=["currentPrice"])["timestamp"]) == 1000
+    committed = sum(
+        broker.committed("cryorithm-consume", "signals", p) for p in range(3)
+    )
+    assert committed == 1001
+
+
+def test_decode_many_isolates_bad_messages():
+    """Test one undecodable message does not fail its batch"""
+    codec = StatusCodec("json")
+    good = codec.encode(
+        {"ticker": "A", "timestamp": 1, "keyframe": True, "changes": {}, "removed": []},
+    )
+    records, errors = StatusCodec.decode_many(
+        [(good, codec.headers), (b"{broken", codec.headers), (good, codec.headers)],
+    )
+    assert [record["ticker"] for record in records] == ["A", "A"]
+    assert [index for index, _ in errors] == [1]
+
+
+def test_history_sink_skips_invalid_tickers(tmp_path):
+    """Test tickers from topic content cannot write outside the history root"""
+    history = HistoryStore(tmp_path / "history")
+    log_manager = LogManager(sink=tmp_path / "test.log")
+    sink = HistorySink(history, log_manager=log_manager)
+    sink(
+        [
+            {"ticker": "../../escape", "timestamp": 0.0, "changes": {"a": 1.0}},
+            {"ticker": "DASH", "timestamp": 0.0, "changes": {"a": 1.0}},
+        ],
+    )
+    log_manager.close()
+
+    assert sink.rejected == 1
+    assert history.tickers() == ["DASH"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["history", "test.log"]
+    assert "invalid ticker" in (tmp_path / "test.log").read_text()
+
+
+def test_consumed_history_replays_full_snapshots(tmp_path):
+    """Test deltas are stored as full snapshots, so a replay sees no removals"""
+    broker = FakeBroker(partitions=1)
+    codec = StatusCodec("json")
+    updates = [
+        (True, {"currentPrice": 1.0, "volume": 10, "sector": "Tech"}, []),
+        (False, {"currentPrice": 2.0}, []),
+        (False, {"volume": 11}, ["sector"]),
+    ]
+    for i, (keyframe, changes, removed) in enumerate(updates):
+        record = {
+            "ticker": "DASH",
+            "timestamp": 1_700_000_000 + 60 * i,
+            "keyframe": keyframe,
+            "changes": changes,
+            "removed": removed,
+        }
+        broker.append("signals", codec.encode(record), "DASH", codec.headers)
+    log_manager = LogManager(sink=tmp_path / "test.log")
+    history = HistoryStore(tmp_path / "history")
+    consumer = _consumer(broker)
+    run_consumer(consumer, HistorySink(history), log_manager, idle_batches=1)
+    consumer.close()
+    log_manager.close()
+
+    snapshots = [snapshot for _, _, snapshot in history.iter_snapshots()]
+    assert snapshots == [
+        {"currentPrice": 1.0, "volume": 10, "sector": "Tech"},
+        {"currentPrice": 2.0, "volume": 10, "sector": "Tech"},
+        {"currentPrice": 2.0, "volume": 11},
+    ]
+    differ = SnapshotDiffer()
+    deltas = [differ.diff("DASH", snapshot) for snapshot in snapshots]
+    assert [delta.removed for delta in deltas] == [[], [], ["sector"]]
+
+    # After a restart, a delta is merged onto the last stored snapshot.
+    HistorySink(history)(
+        [
+            {
+                "ticker": "DASH",
+                "timestamp": 1_700_000_180,
+                "keyframe": False,
+                "changes": {"currentPrice": 3.0},
+                "removed": [],
+            },
+        ],
+    )
+    assert history.latest("DASH") == {"currentPrice": 3.0, "volume": 11}
@@ -0,0 +1,93 @@
+"""
+Tests for cryorithm/clients/llm.py
+"""
+
+import pytest
+
+from cryorithm.bench.fakes import fake_openai_analyst_http_client
+from cryorithm.clients.llm import LLMBatchDestination, LLMClient
+from cryorithm.clients.openai import OpenAIClientWrapper
+
+
+def _record(ticker):
+    changes = {f"noise{i}": i * 1.123456 for i in range(100)}
+    changes.update(currentPrice=123.456789, marketCap=1.5e9)
+    return {"ticker": ticker, "keyframe": True, "timestamp": 0, "changes": changes}
+
+
+def test_projection_drops_irrelevant_fields():
+    """Test only the configured fields are sent, compacted"""
+    destination = LLMBatchDestination(None, "gpt-4o-mini")
+    assert destination.project(_record("DASH")) == (
+        '{"ticker":"DASH","currentPrice":123.5,"marketCap":1500000000.0}'
+    )
+
+
+def test_pack_respects_token_budget():
+    """Test records are split into batches under the token budget"""
+    destination = LLMBatchDestination(
+        None,
+        "gpt-4o-mini",
+        token_budget=1000,
+        max_tickers=50,
+    )
+    batches = destination.pack([_record(f"T{i}") for i in range(100)])
+    assert len(batches) > 1
+    assert sum(len(batch) for batch in batches) == 100
+    assert all(len(batch) <= 50 for batch in batches)
+
+
+@pytest.mark.asyncio
+async def test_batch_is_demultiplexed_per_ticker():
+    """Test one request answers many tickers, each routed to its record"""
+    state = {}
+    client = OpenAIClientWrapper(
+        api_key="test-key",
+        base_url="http://mock.local/v1",
+        http_client=fake_openai_analyst_http_client(state=state),
+    )
+    results = {}
+    destination = LLMBatchDestination(
+        client,
+        "gpt-4o-mini",
+        on_result=lambda record, result: results.update(
+            {record["ticker"]: result["signal"]},
+        ),
+    )
+    await destination.send_batch([_record(f"T{i}") for i in range(20)])
+    await client.close()
+
+    assert state["requests"] == 1
+    assert sorted(results) == sorted(f"T{i}" for i in range(20))
+    assert destination.missing == 0
+
+
+class ScriptedLLMClient(LLMClient):
+    def __init__(self, lines):
+        self.lines = lines
+
+    async def create_chat_completion_stream(self, model, messages, **kwargs):
+        for line in self.lines:
+            yield line + "\n"
+
+
+@pytest.mark.asyncio
+async def test_non_string_tickers_in_answers_are_ignored():
+    """Test answer lines whose ticker is not a string do not fail the batch"""
+    results = []
+    destination = LLMBatchDestination(
+        ScriptedLLMClient(
+            [
+                '{"ticker": ["T0"], "signal": "bullish"}',
+                '{"ticker": {"symbol": "T0"}, "signal": "bullish"}',
+                '{"ticker": "T0", "signal": "neutral"}',
+            ],
+        ),
+        "gpt-4o-mini",
+        on_result=lambda record, result: results.append(result["signal"]),
+    )
+    await destination.send_batch([_record("T0"), _record("T1")])
+
+    assert results == ["neutral"]
+    assert destination.completed == 1
+    assert destination.missing == 1
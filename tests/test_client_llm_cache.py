@@ -0,0 +1,130 @@
+"""
+Tests for cryorithm/clients/llm_cache.py
+"""
+
+import pytest
+
+from cryorithm.bench.fakes import fake_openai_analyst_http_client
+from cryorithm.clients.llm import LLMBatchDestination, LLMClient
+from cryorithm.clients.llm_cache import (
+    LLM_CACHE_LOOKUPS,
+    CachedLLMClient,
+    MemoryCacheBackend,
+    SQLiteCacheBackend,
+    cache_key,
+)
+from cryorithm.clients.openai import OpenAIClientWrapper
+
+
+class FakeLLMClient(LLMClient):
+    def __init__(self):
+        self.calls = 0
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+    async def create_chat_completion_stream(self, model, messages, **kwargs):
+        self.calls += 1
+        for chunk in ["Hold", " DASH"]:
+            yield chunk
+
+
+async def _collect(client, content):
+    stream = client.create_chat_completion_stream(
+        "gpt-test",
+        [{"role": "user", "content": content}],
+    )
+    return [chunk async for chunk in stream]
+
+
+def test_cache_key_normalizes_whitespace():
+    """Test cosmetic prompt differences map to the same key"""
+    a = cache_key("m", [{"role": "user", "content": "hi\r\n"}])
+    b = cache_key("m", [{"content": "hi", "role": "user"}])
+    assert a == b
+    assert a != cache_key("other", [{"role": "user", "content": "hi"}])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend_name", ["memory", "sqlite"])
+async def test_cached_client_replays_stream(tmp_path, backend_name):
+    """Test a repeated prompt is replayed from the cache as a stream"""
+    if backend_name == "memory":
+        backend = MemoryCacheBackend()
+    else:
+        backend = SQLiteCacheBackend(tmp_path / "llm.sqlite")
+    inner = FakeLLMClient()
+    client = CachedLLMClient(inner, backend)
+
+    assert await _collect(client, "DASH?") == ["Hold", " DASH"]
+    assert await _collect(client, "DASH?") == ["Hold", " DASH"]
+    assert inner.calls == 1
+    assert client.get_stats()["hits"] == 1
+    assert client.get_stats()["misses"] == 1
+
+
+def test_memory_backend_evicts_and_expires():
+    """Test LRU size eviction and TTL expiry"""
+    now = [0.0]
+    backend = MemoryCacheBackend(max_entries=2, ttl=10, clock=lambda: now[0])
+    backend.set("a", ["1"])
+    backend.set("b", ["2"])
+    backend.get("a")
+    backend.set("c", ["3"])
+    assert backend.get("b") is None
+    assert backend.get("a") == ["1"]
+
+    now[0] = 11.0
+    assert backend.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_cached_client_from_config(tmp_path):
+    """Test the configured backend, hit/miss metrics and close delegation"""
+    inner = FakeLLMClient()
+    client = CachedLLMClient.from_config(
+        inner,
+        {"llm_cache_path": str(tmp_path / "llm.sqlite"), "llm_cache_ttl": 60},
+    )
+    assert isinstance(client.backend, SQLiteCacheBackend)
+    assert client.backend.ttl == 60
+
+    hits = LLM_CACHE_LOOKUPS.labels("hit")
+    before = hits.value
+    await _collect(client, "ABNB?")
+    await _collect(client, "ABNB?")
+    assert hits.value == before + 1
+
+    await client.close()
+    assert inner.closed
+
+
+@pytest.mark.asyncio
+async def test_batched_results_are_cached_per_ticker():
+    """Test batches, whose streams are closed early, hit the cache per ticker"""
+    state = {}
+    client = CachedLLMClient(
+        OpenAIClientWrapper(
+            api_key="test-key",
+            base_url="http://mock.local/v1",
+            http_client=fake_openai_analyst_http_client(state=state),
+        ),
+    )
+    results = []
+    destination = LLMBatchDestination(
+        client,
+        "gpt-4o-mini",
+        on_result=lambda record, result: results.append(result["ticker"]),
+    )
+    records = [{"ticker": ticker, "currentPrice": 1.0} for ticker in ("A", "B")]
+    await destination.send_batch(records)
+    await destination.send_batch(records)
+    # A changed ticker is sent alone; the unchanged one is still a hit.
+    await destination.send_batch([dict(records[0], currentPrice=2.0), records[1]])
+    await client.close()
+
+    assert state["requests"] == 2
+    assert results == ["A", "B", "A", "B", "B", "A"]
+    assert client.get_stats()["hits"] == 3
+    assert client.get_stats()["entries"] == 3
@@ -0,0 +1,49 @@
+"""
+Tests for cryorithm/clients/llm_stream.py
+"""
+
+import pytest
+
+from cryorithm.bench.fakes import fake_openai_analyst_http_client
+from cryorithm.clients.llm_stream import JsonObjectParser, parse_stream
+from cryorithm.clients.openai import OpenAIClientWrapper
+
+
+def test_parser_emits_objects_as_they_complete():
+    """Test objects split across chunks are emitted on their closing brace"""
+    parser = JsonObjectParser()
+    assert parser.feed('```json\n{"ticker": "A", "summary": "up {') == []
+    assert parser.feed('sharply}"}\n{"ticker"') == [
+        {"ticker": "A", "summary": "up {sharply}"},
+    ]
+    assert parser.feed(': "B"}{"bad": }') == [{"ticker": "B"}]
+    assert parser.invalid == 1
+
+
+@pytest.mark.asyncio
+async def test_parse_stream_cancels_upstream_early():
+    """Test the HTTP stream is closed once the stop condition is met"""
+    state = {}
+    client = OpenAIClientWrapper(
+        api_key="test-key",
+        base_url="http://mock.local/v1",
+        http_client=fake_openai_analyst_http_client(chunk_chars=8, state=state),
+    )
+    prompt = "\n".join(f'{{"ticker": "T{i}"}}' for i in range(50))
+    stream = client.create_chat_completion_stream(
+        "gpt-test",
+        [{"role": "user", "content": prompt}],
+    )
+    results = [
+        result
+        async for result in parse_stream(
+            stream,
+            until=lambda result: result["ticker"] == "T1",
+            required=("ticker", "signal"),
+        )
+    ]
+    await client.close()
+
+    assert [result["ticker"] for result in results] == ["T0", "T1"]
+    full_answer = 50 * len('{"ticker": "T0", "signal": "bullish", "summary": ""}')
+    assert state["streamed_chars"] < full_answer / 5
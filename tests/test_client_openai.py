@@ -2,19 +2,164 @@
 Tests for cryorithm/clients/openai.py
 """
 
+import asyncio
+import json
+
+import httpx
 import pytest
 
-from cryorithm.clients.openai import OpenAIClientWrapper  # Assuming this is the path
+from cryorithm.clients.llm import count_tokens
+from cryorithm.clients.openai import TOKENS, OpenAIClientWrapper
+
 
 def test_openai_client_init_with_key():
-  """Test OpenAI client initialization with a provided API key"""
-  api_key = "YOUR_API_KEY"  # Replace with your actual API key
-  client = OpenAIClientWrapper(api_key=api_key)
-  assert isinstance(client, OpenAIClientWrapper)  # Check if the object is of the expected class
+    """Test OpenAI client initialization with a provided API key"""
+    api_key = "YOUR_API_KEY"  # Replace with your actual API key
+    client = OpenAIClientWrapper(api_key=api_key)
+    assert isinstance(
+        client, OpenAIClientWrapper
+    )  # Check if the object is of the expected class
+
 
 # TODO: Fix/improve this test, or just drop it.
-#def test_openai_client_init_no_key():
+# def test_openai_client_init_no_key():
 #    """Test OpenAI client initialization without a valid API key"""
-#    dummy_key = "INVALID_KEY"  # Placeholder key (replace with actual logic for handling missing keys)
+#    # Placeholder key (replace with actual logic for handling missing keys)
+#    dummy_key = "INVALID_KEY"
 #    with pytest.raises(ValueError):  # Expect an error since the key is invalid
 #        client = OpenAIClientWrapper(api_key=dummy_key)
+
+
+def _sse_chunk(content):
+    chunk = {
+        "id": "chatcmpl-test",
+        "object": "chat.completion.chunk",
+        "created": 0,
+        "model": "gpt-test",
+        "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": None}],
+    }
+    return f"data: {json.dumps(chunk)}\n\n"
+
+
+def _mock_http_client(state, delay=0.0):
+    """Builds an httpx client whose transport plays a local streaming server"""
+
+    async def handler(request):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        await asyncio.sleep(delay)
+        state["active"] -= 1
+        body = "".join(_sse_chunk(part) for part in ["Hello", ", ", "world"])
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/event-stream"},
+            content=(body + "data: [DONE]\n\n").encode(),
+        )
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.asyncio
+async def test_openai_client_streams_chunks():
+    """Test streamed completion fragments are yielded in order"""
+    state = {"active": 0, "peak": 0}
+    client = OpenAIClientWrapper(
+        api_key="test-key",
+        base_url="http://mock.local/v1",
+        http_client=_mock_http_client(state),
+    )
+    stream = client.create_chat_completion_stream(
+        model="gpt-test",
+        messages=[{"role": "user", "content": "hi"}],
+    )
+    assert [chunk async for chunk in stream] == ["Hello", ", ", "world"]
+
+
+@pytest.mark.asyncio
+async def test_openai_client_limits_concurrency():
+    """Test in-flight completions never exceed max_concurrency"""
+    state = {"active": 0, "peak": 0}
+    client = OpenAIClientWrapper(
+        api_key="test-key",
+        base_url="http://mock.local/v1",
+        max_concurrency=2,
+        http_client=_mock_http_client(state, delay=0.01),
+    )
+
+    async def collect():
+        stream = client.create_chat_completion_stream(
+            model="gpt-test",
+            messages=[{"role": "user", "content": "hi"}],
+        )
+        return "".join([chunk async for chunk in stream])
+
+    results = await asyncio.gather(*(collect() for _ in range(6)))
+    assert results == ["Hello, world"] * 6
+    assert state["peak"] <= 2
+
+
+def _usage_http_client(requests):
+    """Builds an httpx client whose transport ends the stream with usage"""
+
+    async def handler(request):
+        requests.append(json.loads(request.content))
+        usage = {
+            "id": "chatcmpl-test",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "gpt-test",
+            "choices": [],
+            "usage": {"prompt_tokens": 7, "completion_tokens": 3, "total_tokens": 10},
+        }
+        body = _sse_chunk("Hello") + f"data: {json.dumps(usage)}\n\n"
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/event-stream"},
+            content=(body + "data: [DONE]\n\n").encode(),
+        )
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.asyncio
+async def test_openai_client_counts_reported_usage():
+    """Test tokens come from the usage report the stream asks for"""
+    requests = []
+    client = OpenAIClientWrapper(
+        api_key="test-key",
+        base_url="http://mock.local/v1",
+        http_client=_usage_http_client(requests),
+    )
+    prompt = TOKENS.labels("gpt-usage", "prompt")
+    completion = TOKENS.labels("gpt-usage", "completion")
+    before = (prompt.value, completion.value)
+
+    stream = client.create_chat_completion_stream(
+        model="gpt-usage",
+        messages=[{"role": "user", "content": "hi"}],
+    )
+    assert [chunk async for chunk in stream] == ["Hello"]
+    assert requests[0]["stream_options"] == {"include_usage": True}
+    assert (prompt.value, completion.value) == (before[0] + 7, before[1] + 3)
+
+
+@pytest.mark.asyncio
+async def test_openai_client_estimates_tokens_without_usage():
+    """Test completion tokens are counted from the text, not the chunks"""
+    state = {"active": 0, "peak": 0}
+    client = OpenAIClientWrapper(
+        api_key="test-key",
+        base_url="http://mock.local/v1",
+        http_client=_mock_http_client(state),
+    )
+    completion = TOKENS.labels("gpt-estimate", "completion")
+    before = completion.value
+
+    stream = client.create_chat_completion_stream(
+        model="gpt-estimate",
+        messages=[{"role": "user", "content": "hi"}],
+    )
+    assert "".join([chunk async for chunk in stream]) == "Hello, world"
+    assert completion.value == before + sum(
+        count_tokens(part, "gpt-estimate") for part in ["Hello", ", ", "world"]
+    )
@@ -0,0 +1,161 @@
+"""
+Tests for cryorithm/clients/ratelimit.py
+"""
+
+import asyncio
+
+import pytest
+
+from cryorithm.clients.ratelimit import (
+    CircuitBreaker,
+    CircuitOpenError,
+    UpstreamError,
+    UpstreamGuard,
+)
+from cryorithm.sensors.stock.fundamentals import StockBatchSensor
+
+
+class ThrottlingUpstream:
+    """Fake upstream that answers 429 to the first `throttle` calls."""
+
+    def __init__(self, throttle=0, status=429):
+        self.throttle = throttle
+        self.status = status
+        self.calls = 0
+
+    async def fetch(self, ticker):
+        self.calls += 1
+        if self.calls <= self.throttle:
+            raise UpstreamError(self.status, retry_after=0)
+        return {"symbol": ticker}
+
+
+async def _no_sleep(delay):
+    return None
+
+
+@pytest.mark.asyncio
+async def test_guard_retries_and_backs_off_on_throttling():
+    """Test 429s are retried and halve the request rate"""
+    upstream = ThrottlingUpstream(throttle=2)
+    guard = UpstreamGuard("fake", rate=1000, burst=10, sleep=_no_sleep)
+
+    assert await guard.call(upstream.fetch, "DASH") == {"symbol": "DASH"}
+    assert upstream.calls == 3
+    assert guard.bucket.rate < 1000
+
+
+@pytest.mark.asyncio
+async def test_guard_does_not_retry_client_errors():
+    """Test non-retryable errors propagate immediately"""
+    upstream = ThrottlingUpstream(throttle=1, status=404)
+    guard = UpstreamGuard("fake", rate=1000, sleep=_no_sleep)
+
+    with pytest.raises(UpstreamError):
+        await guard.call(upstream.fetch, "NOPE")
+    assert upstream.calls == 1
+    assert guard.breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_network_errors_count_as_failures():
+    """Test status-less connection errors are retried and trip the breaker"""
+    calls = []
+
+    async def unreachable(ticker):
+        calls.append(ticker)
+        raise ConnectionError("connection reset")
+
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10)
+    guard = UpstreamGuard(
+        "fake", rate=1000, max_retries=5, breaker=breaker, sleep=_no_sleep
+    )
+    with pytest.raises(ConnectionError):
+        await guard.call(unreachable, "DASH")
+    assert len(calls) == 3
+    assert breaker.state == "open"
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_and_recovers():
+    """Test the breaker fails fast while open and closes after a good trial"""
+    now = [0.0]
+    breaker = CircuitBreaker(
+        failure_threshold=2, reset_timeout=10, clock=lambda: now[0]
+    )
+    upstream = ThrottlingUpstream(throttle=2, status=503)
+    guard = UpstreamGuard(
+        "fake", rate=1000, max_retries=5, breaker=breaker, sleep=_no_sleep
+    )
+
+    with pytest.raises(UpstreamError):
+        await guard.call(upstream.fetch, "DASH")
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        await guard.call(upstream.fetch, "DASH")
+    assert upstream.calls == 2
+
+    now[0] = 11.0
+    assert await guard.call(upstream.fetch, "DASH") == {"symbol": "DASH"}
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_local_errors_do_not_count_as_failures():
+    """Test errors that are not upstream failures are raised, not recorded"""
+    calls = []
+
+    async def unparsable(ticker):
+        calls.append(ticker)
+        raise ValueError("unexpected payload")
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    guard = UpstreamGuard(
+        "fake", rate=1000, max_retries=5, breaker=breaker, sleep=_no_sleep
+    )
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            await guard.call(unparsable, "DASH")
+    assert len(calls) == 3
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_trial_is_given_back():
+    """Test a cancelled half-open trial does not keep the circuit half-open"""
+    now = [0.0]
+    breaker = CircuitBreaker(
+        failure_threshold=1, reset_timeout=10, clock=lambda: now[0]
+    )
+    breaker.record_failure()
+    now[0] = 11.0
+    guard = UpstreamGuard("fake", rate=1000, breaker=breaker, sleep=_no_sleep)
+    started = asyncio.Event()
+
+    async def hang(ticker):
+        started.set()
+        await asyncio.sleep(60)
+
+    trial = asyncio.create_task(guard.call(hang, "DASH"))
+    await started.wait()
+    trial.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await trial
+
+    assert breaker.state == "half_open"
+    upstream = ThrottlingUpstream()
+    assert await guard.call(upstream.fetch, "DASH") == {"symbol": "DASH"}
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_batch_sensor_shares_guard():
+    """Test batch fetches go through the shared guard and survive throttling"""
+    upstream = ThrottlingUpstream(throttle=3)
+    guard = UpstreamGuard("fake", rate=1000, burst=50, sleep=_no_sleep)
+    sensor = StockBatchSensor(["A", "B", "C"], fetcher=upstream.fetch, guard=guard)
+
+    batch = await sensor.fetch_data()
+    assert set(batch.results) == {"A", "B", "C"}
+    assert not batch.errors
+    assert upstream.calls == 6
@@ -0,0 +1,56 @@
+"""
+Tests for cryorithm/managers/cluster.py
+"""
+
+import time
+
+from cryorithm.bench.fakes import FakeBroker, FakeConsumer
+from cryorithm.managers.cluster import ClusterManager
+
+
+def _node(broker, member_id, tickers):
+    return ClusterManager(
+        "localhost:9092",
+        "control",
+        tickers,
+        member_id=member_id,
+        poll_interval=0.01,
+        consumer_factory=lambda config: FakeConsumer(config, broker),
+    )
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+def test_nodes_partition_tickers_and_rebalance():
+    """Test each ticker has one owner and ownership moves when a node leaves"""
+    broker = FakeBroker(partitions=6)
+    tickers = [f"T{i}" for i in range(60)]
+    first = _node(broker, "node-a", tickers)
+    second = _node(broker, "node-b", tickers)
+    first.start()
+    second.start()
+    try:
+
+        def split_evenly():
+            a, b = set(first.owned_tickers()), set(second.owned_tickers())
+            return a and b and not a & b and a | b == set(tickers)
+
+        _wait_for(split_evenly)
+    finally:
+        second.stop()
+
+    _wait_for(lambda: first.owned_tickers() == tickers)
+    first.stop()
+    assert first.owned_tickers() == []
+
+
+def test_member_id_is_only_a_client_label():
+    """Test a named node is not a static member, so closing leaves the group"""
+    node = _node(FakeBroker(partitions=1), "node-a", ["T0"])
+    assert node.consumer_config["client.id"] == "node-a"
+    assert "group.instance.id" not in node.consumer_config
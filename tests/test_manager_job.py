@@ -0,0 +1,152 @@
+"""
+Tests for cryorithm/managers/job.py
+"""
+
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from cryorithm.managers.job import JobManager, SensorGroup, jitter_offset
+from cryorithm.managers.log import LogManager
+
+
+class FakeSensor:
+    active = 0
+    peak = 0
+
+    def __init__(self, ticker, schedule_time="* * * * *", delay=0.0):
+        self.ticker = ticker
+        self.name = f"FakeSensor[{ticker}]"
+        self.schedule_time = schedule_time
+        self.delay = delay
+        self.fetches = 0
+
+    async def fetch_data(self):
+        FakeSensor.active += 1
+        FakeSensor.peak = max(FakeSensor.peak, FakeSensor.active)
+        try:
+            await asyncio.sleep(self.delay)
+            self.fetches += 1
+            return {"price": float(self.fetches)}
+        finally:
+            FakeSensor.active -= 1
+
+
+@pytest.fixture
+def log_manager(tmp_path):
+    manager = LogManager(sink=tmp_path / "test.log")
+    yield manager
+    manager.close()
+
+
+def _group(sensors, **options):
+    defaults = {"max_instances": 1, "coalesce": True, "misfire_grace_time": 30}
+    return SensorGroup("* * * * *", sensors, dict(defaults, **options))
+
+
+@pytest.mark.asyncio
+async def test_sensors_are_grouped_by_schedule(log_manager):
+    """Test sensors sharing a cron expression are scheduled as one job"""
+    sensors = [
+        FakeSensor("A"),
+        FakeSensor("B"),
+        FakeSensor("C", schedule_time="*/5 * * * *"),
+    ]
+    job_manager = JobManager(
+        sensors,
+        log_manager,
+        schedule_options={"*/5 * * * *": {"jitter": 60}},
+        jitter_seed="host-a",
+    )
+    await job_manager.start_jobs()
+    try:
+        assert len(job_manager.scheduler.get_jobs()) == 2
+        stats = job_manager.get_stats()
+        assert stats["tick[* * * * *]"]["sensors"] == 2
+        assert stats["tick[* * * * *]"]["jitter"] == 0
+        assert stats["tick[*/5 * * * *]"]["jitter"] == pytest.approx(
+            jitter_offset("host-a:*/5 * * * *", 60),
+            abs=1e-3,
+        )
+    finally:
+        job_manager.scheduler.shutdown(wait=False)
+
+
+@pytest.mark.asyncio
+async def test_overlapping_ticks_are_coalesced(log_manager):
+    """Test ticks fired during a running tick merge into one follow-up run"""
+    sensor = FakeSensor("A", delay=0.05)
+    job_manager = JobManager([sensor], log_manager)
+    group = _group([sensor])
+
+    first = asyncio.create_task(job_manager.tick(group))
+    await asyncio.sleep(0.01)
+    await job_manager.tick(group)
+    await job_manager.tick(group)
+    await first
+
+    assert sensor.fetches == 2
+    assert group.stats["run"] == 2
+    assert group.stats["coalesced"] == 2
+
+
+@pytest.mark.asyncio
+async def test_overlapping_ticks_are_dropped_without_coalesce(log_manager):
+    """Test ticks fired during a running tick are dropped when not coalescing"""
+    sensor = FakeSensor("A", delay=0.05)
+    job_manager = JobManager([sensor], log_manager)
+    group = _group([sensor], coalesce=False)
+
+    first = asyncio.create_task(job_manager.tick(group))
+    await asyncio.sleep(0.01)
+    await job_manager.tick(group)
+    await first
+
+    assert sensor.fetches == 1
+    assert group.stats["dropped"] == 1
+
+
+@pytest.mark.asyncio
+async def test_global_concurrency_bound(log_manager):
+    """Test sensor jobs of all groups share the max_concurrent_jobs bound"""
+    FakeSensor.active = FakeSensor.peak = 0
+    groups = [
+        _group([FakeSensor(f"{g}{i}", delay=0.01) for i in range(4)]) for g in "AB"
+    ]
+    job_manager = JobManager([], log_manager, max_concurrent_jobs=2)
+    await asyncio.gather(*(job_manager.tick(group) for group in groups))
+
+    assert FakeSensor.peak == 2
+    assert all(sensor.fetches == 1 for g in groups for sensor in g.sensors)
+
+
+def test_jitter_offset_is_stable_and_bounded():
+    """Test the same key always gets the same offset within the jitter"""
+    offsets = [jitter_offset(f"host-{i}:* * * * *", 30) for i in range(50)]
+    assert offsets == [jitter_offset(f"host-{i}:* * * * *", 30) for i in range(50)]
+    assert all(0 <= offset < 30 for offset in offsets)
+    assert len(set(offsets)) == 50
+    assert jitter_offset("anything", 0) == 0
+
+
+@pytest.mark.asyncio
+async def test_fires_merged_by_the_scheduler_are_counted(log_manager):
+    """Test fires skipped while the event loop was blocked count as coalesced"""
+    job_manager = JobManager([FakeSensor("A")], log_manager)
+    await job_manager.start_jobs()
+    job_manager.scheduler.shutdown(wait=False)
+    (job,) = job_manager.scheduler.get_jobs()
+    fire = job.next_run_time
+
+    job_manager._on_job_submitted(
+        SimpleNamespace(job_id=job.id, scheduled_run_times=[fire]),
+    )
+    job_manager._on_job_submitted(
+        SimpleNamespace(
+            job_id=job.id,
+            scheduled_run_times=[fire + timedelta(minutes=3)],
+        ),
+    )
+    assert job_manager.get_stats()["tick[* * * * *]"]["coalesced"] == 2
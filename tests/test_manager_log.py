@@ -0,0 +1,120 @@
+"""
+Tests for cryorithm/managers/log.py
+"""
+
+import json
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from cryorithm.managers.log import (
+    AsyncJsonSink,
+    LevelSampler,
+    LogManager,
+    parse_rotation,
+)
+
+
+def _message(text, level="INFO", **extra):
+    return SimpleNamespace(
+        record={
+            "time": datetime(2026, 1, 1, tzinfo=timezone.utc),
+            "level": SimpleNamespace(name=level),
+            "message": text,
+            "name": "tests",
+            "function": "test",
+            "line": 1,
+            "extra": extra,
+        },
+    )
+
+
+def _read_lines(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_structured_logs_are_json_lines(tmp_path):
+    """Test records and their extra fields are written by the writer thread"""
+    path = tmp_path / "app.log"
+    log_manager = LogManager(sink=path, structured=True)
+    log_manager.info("Fetched {ticker}", ticker="DASH", event="data")
+    log_manager.close()
+
+    entries = _read_lines(path)
+    assert entries[-1]["message"] == "Fetched DASH"
+    assert entries[-1]["level"] == "INFO"
+    assert entries[-1]["ticker"] == "DASH"
+    assert entries[-1]["event"] == "data"
+
+
+def test_full_queue_drops_and_counts(tmp_path):
+    """Test records beyond the queue capacity are dropped, not blocking"""
+    sink = AsyncJsonSink(tmp_path / "app.log", queue_size=2)
+    # Without a running writer, nothing leaves the queue.
+    sink.stop()
+    for i in range(5):
+        sink(_message(f"record-{i}"))
+    assert sink.dropped == 3
+    assert sink._queue.qsize() == 2
+
+
+def test_level_sampler_only_samples_data_events():
+    """Test sampling applies per level and to data events only"""
+    draws = iter([0.05, 0.5])
+    sampler = LevelSampler({"debug": 0.1}, rng=lambda: next(draws))
+    debug = {"level": SimpleNamespace(name="DEBUG"), "extra": {"event": "data"}}
+    info = {"level": SimpleNamespace(name="INFO"), "extra": {"event": "data"}}
+    startup = {"level": SimpleNamespace(name="DEBUG"), "extra": {"event": "x"}}
+
+    assert sampler(debug)
+    assert not sampler(debug)
+    assert sampler(info)
+    assert sampler(startup)
+
+
+def test_size_rotation(tmp_path):
+    """Test the file is rotated once it reaches the configured size"""
+    path = tmp_path / "app.log"
+    sink = AsyncJsonSink(path, rotation="100 B", flush_interval=0.01)
+    sink(_message("x" * 200))
+    sink.stop()
+    (rotated,) = tmp_path.glob("app.log.*")
+    assert _read_lines(rotated)[0]["message"] == "x" * 200
+    assert path.read_text() == ""
+
+
+def test_rotations_within_a_second_keep_every_file(tmp_path):
+    """Test rotated files never overwrite each other"""
+    path = tmp_path / "app.log"
+    sink = AsyncJsonSink(path, rotation="10 B", batch_size=1, flush_interval=0.01)
+    for i in range(5):
+        sink(_message(f"record-{i}"))
+    sink.stop()
+    rotated = sorted(tmp_path.glob("app.log.*"))
+    messages = sorted(e["message"] for p in rotated for e in _read_lines(p))
+    assert messages == [f"record-{i}" for i in range(5)]
+
+
+def test_time_rotation(tmp_path):
+    """Test the file is rotated once it is older than a duration rotation"""
+    path = tmp_path / "app.log"
+    sink = AsyncJsonSink(path, rotation="0.05 seconds", flush_interval=0.01)
+    sink(_message("first"))
+    time.sleep(0.1)
+    sink(_message("second"))
+    sink.stop()
+    (rotated,) = tmp_path.glob("app.log.*")
+    assert [e["message"] for e in _read_lines(rotated)] == ["first", "second"]
+
+
+def test_parse_rotation():
+    """Test sizes, durations and periods, and a clear error otherwise"""
+    assert parse_rotation("10 MB") == (10_000_000, None)
+    assert parse_rotation("12 hours") == (None, 43200)
+    assert parse_rotation("daily") == (None, 86400)
+    with pytest.raises(ValueError, match="Unsupported rotation"):
+        parse_rotation("00:00")
+    with pytest.raises(ValueError, match="Unsupported rotation"):
+        LogManager(sink="unused.log", rotation="monday", structured=True)
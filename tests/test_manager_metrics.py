@@ -0,0 +1,32 @@
+"""
+Tests for cryorithm/managers/metrics.py
+"""
+
+from cryorithm.managers.metrics import MetricsRegistry
+
+
+def test_registry_renders_prometheus_text():
+    """Test counters, gauges and histograms render in the exposition format"""
+    registry = MetricsRegistry()
+    jobs = registry.counter("jobs_total", "Jobs.", ["sensor", "status"])
+    jobs.labels("DASH", "ok").inc()
+    jobs.labels(sensor="DASH", status="ok").inc(2)
+    registry.gauge("queue_depth", "Depth.").set(7)
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    text = registry.render()
+    assert 'jobs_total{sensor="DASH",status="ok"} 3.0' in text
+    assert "queue_depth 7.0" in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_count 3" in text
+
+
+def test_registering_twice_returns_same_metric():
+    """Test modules can declare the same metric independently"""
+    registry = MetricsRegistry()
+    assert registry.counter("a_total", "A.") is registry.counter("a_total", "A.")
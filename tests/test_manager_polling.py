@@ -0,0 +1,143 @@
+"""
+Tests for cryorithm/managers/polling.py
+"""
+
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from cryorithm.managers.job import JobManager
+from cryorithm.managers.log import LogManager
+from cryorithm.managers.polling import (
+    CLOSED,
+    EXTENDED,
+    REGULAR,
+    AdaptivePoller,
+    MarketCalendar,
+)
+from cryorithm.sensors.stock.fundamentals import BatchResult
+
+NEW_YORK = ZoneInfo("America/New_York")
+
+
+def _ts(*args):
+    return datetime(*args, tzinfo=NEW_YORK).timestamp()
+
+
+@pytest.fixture
+def calendar():
+    return MarketCalendar(
+        holidays=["2026-11-26"],
+        early_closes={"2026-11-27": 780},  # 13:00, as YAML reads it.
+    )
+
+
+def test_sessions(calendar):
+    """Test regular, extended, weekend, holiday and early close sessions"""
+    assert calendar.session(_ts(2026, 11, 24, 10, 0)) == REGULAR
+    assert calendar.session(_ts(2026, 11, 24, 7, 0)) == EXTENDED
+    assert calendar.session(_ts(2026, 11, 24, 17, 0)) == EXTENDED
+    assert calendar.session(_ts(2026, 11, 24, 21, 0)) == CLOSED
+    assert calendar.session(_ts(2026, 11, 26, 10, 0)) == CLOSED
+    assert calendar.session(_ts(2026, 11, 27, 12, 59)) == REGULAR
+    assert calendar.session(_ts(2026, 11, 27, 13, 30)) == CLOSED
+    assert calendar.session(_ts(2026, 11, 28, 10, 0)) == CLOSED
+
+
+def test_next_transition_skips_weekends_and_holidays(calendar):
+    """Test the next session start is found across non-trading days"""
+    assert calendar.next_transition(_ts(2026, 11, 25, 21, 0)) == _ts(2026, 11, 27, 4, 0)
+    assert calendar.next_transition(_ts(2026, 11, 27, 13, 0)) == _ts(2026, 11, 30, 4, 0)
+
+
+def test_change_rate_scales_interval(calendar):
+    """Test stale tickers slow down and volatile tickers speed up"""
+    poller = AdaptivePoller(calendar, window=4, max_factor=4.0)
+    now = _ts(2026, 11, 24, 10, 0)
+    for _ in range(4):
+        poller.observe("STALE", False, now)
+        poller.observe("HOT", True, now)
+    poller.observe("HALF", True, now)
+    poller.observe("HALF", False, now)
+
+    assert poller.interval("STALE", now) == 240
+    assert poller.interval("HOT", now) == 15
+    assert poller.interval("HALF", now) == 60
+    assert poller.interval("NEW", now) == 60
+    assert poller.interval("NEW", _ts(2026, 11, 28, 10, 0)) == 3600
+
+
+def test_due_wakes_at_session_start(calendar):
+    """Test an overnight ticker is due again when the pre-market opens"""
+    poller = AdaptivePoller(calendar)
+    night = _ts(2026, 11, 24, 3, 30)
+    poller.observe("DASH", False, night)
+
+    assert poller.due(["DASH", "NEW"], night + 60) == ["NEW"]
+    assert poller.due(["DASH"], _ts(2026, 11, 24, 4, 0)) == ["DASH"]
+
+
+class FakeBatchSensor:
+    name = "FakeBatchSensor"
+    schedule_time = "* * * * *"
+
+    def __init__(self, tickers):
+        self.tickers = tickers
+        self.requested = []
+
+    async def fetch_data(self, tickers=None):
+        tickers = self.tickers if tickers is None else tickers
+        self.requested.append(list(tickers))
+        return BatchResult({ticker: {"price": 1.0} for ticker in tickers})
+
+
+@pytest.mark.asyncio
+async def test_job_fetches_only_due_tickers(tmp_path, calendar, monkeypatch):
+    """Test the JobManager skips tickers the poller reports as not due"""
+    now = [_ts(2026, 11, 24, 10, 0)]
+    monkeypatch.setattr("cryorithm.managers.job.time.time", lambda: now[0])
+    sensor = FakeBatchSensor(["A", "B"])
+    poller = AdaptivePoller(calendar)
+    log_manager = LogManager(sink=tmp_path / "test.log")
+    job_manager = JobManager([sensor], log_manager, poller=poller)
+    try:
+        await job_manager.job(sensor)
+        poller.observe("B", True, now[0] - 120)
+        now[0] += 30
+        await job_manager.job(sensor)
+    finally:
+        log_manager.close()
+
+    assert sensor.requested == [["A", "B"], ["B"]]
+
+
+class MovingBatchSensor(FakeBatchSensor):
+    """Fake sensor whose 'A' price moves on every fetch while 'B' stays put."""
+
+    async def fetch_data(self, tickers=None):
+        result = await super().fetch_data(tickers)
+        if "A" in result.results:
+            result.results["A"] = {"price": float(len(self.requested))}
+        return result
+
+
+@pytest.mark.asyncio
+async def test_change_rate_is_tracked_without_differ(tmp_path, calendar, monkeypatch):
+    """Test the poller learns which tickers move when snapshot_diff is off"""
+    now = [_ts(2026, 11, 24, 10, 0)]
+    monkeypatch.setattr("cryorithm.managers.job.time.time", lambda: now[0])
+    sensor = MovingBatchSensor(["A", "B"])
+    poller = AdaptivePoller(calendar)
+    log_manager = LogManager(sink=tmp_path / "test.log")
+    job_manager = JobManager([sensor], log_manager, poller=poller)
+    try:
+        for _ in range(4):
+            await job_manager.job(sensor)
+            now[0] += 3600
+    finally:
+        log_manager.close()
+
+    assert all(tickers == ["A", "B"] for tickers in sensor.requested)
+    assert poller.change_rate("A") == 1.0
+    assert poller.change_rate("B") == 0.0
@@ -0,0 +1,144 @@
+"""
+Tests for cryorithm/managers/replay.py
+"""
+
+import json
+
+import pytest
+
+from cryorithm.managers.job import JobManager
+from cryorithm.managers.log import LogManager
+from cryorithm.managers.replay import Replayer, iter_capture, iter_ticks
+from cryorithm.stores.history import HistoryStore
+from cryorithm.transforms.diff import SnapshotDiffer
+
+
+class RecordingDestination:
+    def __init__(self):
+        self.records = []
+
+    async def __call__(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def log_manager(tmp_path):
+    manager = LogManager(sink=tmp_path / "test.log")
+    yield manager
+    manager.close()
+
+
+@pytest.mark.asyncio
+async def test_history_replay_keeps_original_timestamps(tmp_path, log_manager):
+    """Test stored snapshots are diffed and forwarded in time order"""
+    history = HistoryStore(tmp_path / "history")
+    history.append_many(
+        [
+            ("DASH", 1_700_000_120.0, {"price": 101.0}),
+            ("DASH", 1_700_000_000.0, {"price": 100.0}),
+            ("ABNB", 1_700_000_000.0, {"price": 150.0}),
+            ("DASH", 1_700_000_060.0, {"price": 100.0}),
+        ],
+    )
+    destination = RecordingDestination()
+    job_manager = JobManager(
+        [],
+        log_manager,
+        differ=SnapshotDiffer(),
+        destinations=[destination],
+        history=history,
+    )
+
+    replayer = Replayer(job_manager)
+    assert await replayer.run(history.iter_snapshots()) == 4
+
+    # The unchanged DASH snapshot at +60s is dropped by the differ.
+    assert [(r["ticker"], r["timestamp"]) for r in destination.records] == [
+        ("ABNB", 1_700_000_000.0),
+        ("DASH", 1_700_000_000.0),
+        ("DASH", 1_700_000_120.0),
+    ]
+    assert destination.records[-1]["changes"] == {"price": 101.0}
+    # Replays from the history store do not append to it again.
+    assert len(list(history.iter_snapshots())) == 4
+
+
+@pytest.mark.asyncio
+async def test_speed_compresses_time(tmp_path, log_manager):
+    """Test ticks are spaced by their original interval divided by speed"""
+    now = [0.0]
+    sleeps = []
+
+    async def sleep(delay):
+        sleeps.append(delay)
+        now[0] += delay
+
+    capture = tmp_path / "capture.jsonl"
+    lines = [
+        {"ticker": "DASH", "timestamp": 0.0, "snapshot": {"price": 1.0}},
+        {"ticker": "DASH", "timestamp": 60.0, "changes": {"price": 2.0}},
+        {"ticker": "DASH", "timestamp": 60.0, "type": "signal", "signal": "x"},
+        {"ticker": "DASH", "timestamp": 180.0, "snapshot": {"price": 3.0}},
+    ]
+    capture.write_text("".join(json.dumps(line) + "\n" for line in lines))
+
+    destination = RecordingDestination()
+    job_manager = JobManager([], log_manager, destinations=[destination])
+    replayer = Replayer(job_manager, speed=60, clock=lambda: now[0], sleep=sleep)
+
+    assert await replayer.run(iter_capture(capture)) == 3
+    assert sleeps == pytest.approx([1.0, 2.0])
+    assert [r["changes"]["price"] for r in destination.records] == [1.0, 2.0, 3.0]
+
+
+def test_iter_ticks_groups_by_timestamp():
+    """Test snapshots sharing a timestamp form one bounded tick"""
+    rows = [(0.0, "A", {}), (0.0, "B", {}), (0.0, "C", {}), (5.0, "A", {})]
+    ticks = [
+        (ts, [ticker for ticker, _ in tick])
+        for ts, tick in iter_ticks(rows, max_tick_size=2)
+    ]
+    assert ticks == [(0.0, ["A", "B"]), (0.0, ["C"]), (5.0, ["A"])]
+
+
+def test_capture_deltas_are_merged_onto_the_last_snapshot(tmp_path):
+    """Test delta records rebuild full snapshots per ticker"""
+    capture = tmp_path / "capture.jsonl"
+    lines = [
+        {
+            "ticker": "DASH",
+            "timestamp": 0.0,
+            "keyframe": True,
+            "changes": {"price": 1.0, "volume": 10, "sector": "Tech"},
+            "removed": [],
+        },
+        {
+            "ticker": "ABNB",
+            "timestamp": 0.0,
+            "keyframe": True,
+            "changes": {"price": 5.0},
+            "removed": [],
+        },
+        {
+            "ticker": "DASH",
+            "timestamp": 60.0,
+            "keyframe": False,
+            "changes": {"price": 2.0},
+            "removed": ["sector"],
+        },
+        {
+            "ticker": "DASH",
+            "timestamp": 120.0,
+            "keyframe": False,
+            "changes": {"volume": 11},
+            "removed": [],
+        },
+    ]
+    capture.write_text("".join(json.dumps(line) + "\n" for line in lines))
+
+    assert list(iter_capture(capture)) == [
+        (0.0, "DASH", {"price": 1.0, "volume": 10, "sector": "Tech"}),
+        (0.0, "ABNB", {"price": 5.0}),
+        (60.0, "DASH", {"price": 2.0, "volume": 10}),
+        (120.0, "DASH", {"price": 2.0, "volume": 11}),
+    ]
@@ -0,0 +1,94 @@
+"""
+Tests for cryorithm/managers/router.py
+"""
+
+import asyncio
+
+import pytest
+
+from cryorithm.managers.log import LogManager
+from cryorithm.managers.router import Router
+
+
+class RecordingDestination:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.records = []
+        self.batches = []
+
+    async def __call__(self, record):
+        await asyncio.sleep(self.delay)
+        self.records.append(record)
+
+    async def send_batch(self, records):
+        self.batches.append(len(records))
+        self.records.extend(records)
+
+
+@pytest.fixture
+def log_manager(tmp_path):
+    manager = LogManager(sink=tmp_path / "test.log")
+    yield manager
+    manager.close()
+
+
+@pytest.mark.asyncio
+async def test_slow_destination_does_not_delay_others(log_manager):
+    """Test a slow lane fills its own queue while the fast lane keeps up"""
+    fast, slow = RecordingDestination(), RecordingDestination(delay=10)
+    router = Router(log_manager)
+    router.add(fast, name="fast", batch_size=50)
+    router.add(slow, name="slow", queue_size=5, overflow="drop_oldest")
+
+    for i in range(100):
+        await asyncio.wait_for(router.route({"ticker": f"T{i}"}), 1)
+    router.start()
+    await asyncio.wait_for(router.lanes[0].queue.join(), 1)
+
+    assert len(fast.records) == 100
+    assert max(fast.batches) > 1
+    assert router.lanes[1].dropped > 0
+    await router.close(timeout=0.1)
+
+
+@pytest.mark.asyncio
+async def test_drop_policy_and_error_isolation(log_manager):
+    """Test 'drop' discards new records and failures do not stop a lane"""
+    calls = []
+
+    async def flaky(record):
+        calls.append(record)
+        if record["n"] == 0:
+            raise RuntimeError("boom")
+
+    router = Router(log_manager)
+    lane = router.add(flaky, name="flaky", queue_size=2, overflow="drop")
+    for n in range(4):
+        await router.route({"n": n})
+    router.start()
+    await router.close()
+
+    assert [record["n"] for record in calls] == [0, 1]
+    assert lane.dropped == 2
+
+
+@pytest.mark.asyncio
+async def test_close_without_timeout_drains_every_lane(log_manager):
+    """Test close(timeout=None) delivers everything and a timeout reports loss"""
+    slow = RecordingDestination(delay=0.01)
+    router = Router(log_manager)
+    router.add(slow, name="slow", queue_size=100)
+    for i in range(20):
+        await router.route({"ticker": f"T{i}"})
+    router.start()
+    assert await router.close(timeout=None) == 0
+    assert len(slow.records) == 20
+
+    stuck = RecordingDestination(delay=10)
+    router = Router(log_manager)
+    router.add(stuck, name="stuck", queue_size=100)
+    for i in range(5):
+        await router.route({"ticker": f"T{i}"})
+    router.start()
+    assert await router.close(timeout=0.05) == 4
+    assert router.undelivered == 4
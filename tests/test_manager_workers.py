@@ -0,0 +1,169 @@
+"""
+Tests for cryorithm/managers/workers.py
+"""
+
+import threading
+import time
+from pathlib import Path
+
+from cryorithm.managers.log import LogManager
+from cryorithm.managers.metrics import MetricsRegistry, registry
+from cryorithm.managers.workers import HashRing, WorkerPool, _PoolRegistry
+
+
+def crash_once_worker(name, config):
+    """Worker target that crashes on its first run and then counts tickers."""
+    marker = Path(config["marker_dir"]) / name
+    if not marker.exists():
+        marker.touch()
+        raise SystemExit(1)
+    registry.counter("test_worker_tickers_total", "Tickers handled.").inc(
+        len(config["ticker"]),
+    )
+
+
+def flush_on_stop_worker(name, config):
+    """Worker target that runs until stopped and flushes its output on exit."""
+    output = (Path(config["marker_dir"]) / f"{name}.out").open("a")
+    output.write("started\n")
+    try:
+        (Path(config["marker_dir"]) / f"{name}.ready").touch()
+        while True:
+            time.sleep(0.01)
+    finally:
+        registry.counter("test_worker_stopped_total", "Workers stopped.").inc()
+        output.write("flushed\n")
+        output.close()
+
+
+def test_hash_ring_is_balanced_and_stable():
+    """Test keys spread evenly and few move when a node is added"""
+    tickers = [f"T{i}" for i in range(4000)]
+    before = HashRing(["a", "b", "c", "d"])
+    after = HashRing(["a", "b", "c", "d", "e"])
+
+    sizes = [len(shard) for shard in before.assign(tickers).values()]
+    assert min(sizes) > 700
+    moved = sum(before.node_for(t) != after.node_for(t) for t in tickers)
+    assert moved < len(tickers) * 0.3
+
+
+def test_registry_merge_sums_snapshots():
+    """Test snapshots from several processes are summed"""
+    worker = MetricsRegistry()
+    worker.counter("jobs_total", "Jobs.", ["status"]).labels("ok").inc(2)
+    worker.histogram("job_seconds", "Job time.").observe(0.2)
+
+    merged = MetricsRegistry()
+    merged.merge(worker.collect())
+    merged.merge(worker.collect())
+    text = merged.render()
+    assert 'jobs_total{status="ok"} 4.0' in text
+    assert "job_seconds_count 2" in text
+
+
+def test_pool_registry_labels_worker_gauges():
+    """Test per-process gauges are kept per worker while counters are summed"""
+    parent = MetricsRegistry()
+    parent.gauge("job_interval_seconds", "Interval.", ["job"])
+    pool_registry = _PoolRegistry(parent)
+    for name in ("worker-0", "worker-1"):
+        worker = MetricsRegistry()
+        worker.gauge("job_interval_seconds", "Interval.", ["job"]).labels("t").set(60)
+        worker.counter("jobs_total", "Jobs.").inc()
+        pool_registry.update(name, worker.collect())
+
+    text = pool_registry.render()
+    assert 'job_interval_seconds{job="t",worker="worker-0"} 60.0' in text
+    assert 'job_interval_seconds{job="t",worker="worker-1"} 60.0' in text
+    assert "jobs_total 2.0" in text
+
+
+def test_pool_restarts_crashed_workers_and_aggregates(tmp_path):
+    """Test crashed workers are restarted and their metrics reach the parent"""
+    log_manager = LogManager(sink=tmp_path / "test.log")
+    tickers = [f"T{i}" for i in range(20)]
+    pool = WorkerPool(
+        crash_once_worker,
+        {"marker_dir": str(tmp_path)},
+        tickers,
+        workers=2,
+        log_manager=log_manager,
+        restart_delay=0.01,
+    )
+    try:
+        pool.run(poll_interval=0.05)
+    finally:
+        log_manager.close()
+
+    assert sorted(t for shard in pool.shards.values() for t in shard) == sorted(
+        tickers,
+    )
+    assert all(pool.restarts[name] == 1 for name in pool.shards)
+    assert "test_worker_tickers_total 20.0" in pool.registry.render()
+
+
+def test_stopped_workers_shut_down_cleanly(tmp_path):
+    """Test stop() lets workers flush their output and report final metrics"""
+    log_manager = LogManager(sink=tmp_path / "test.log")
+    pool = WorkerPool(
+        flush_on_stop_worker,
+        {"marker_dir": str(tmp_path)},
+        ["A", "B", "C", "D"],
+        workers=2,
+        log_manager=log_manager,
+    )
+    runner = threading.Thread(target=pool.run, kwargs={"poll_interval": 0.05})
+    runner.start()
+    try:
+        deadline = time.monotonic() + 30
+        while len(list(tmp_path.glob("*.ready"))) < len(pool.shards):
+            assert time.monotonic() < deadline, "workers did not start"
+            time.sleep(0.05)
+        pool.stop()
+        runner.join(10)
+    finally:
+        log_manager.close()
+
+    for name in pool.shards:
+        assert (tmp_path / f"{name}.out").read_text() == "started\nflushed\n"
+    text = pool.registry.render()
+    assert f"test_worker_stopped_total {float(len(pool.shards))}" in text
+    assert not pool.restarts
+
+
+def test_crash_backoff_starts_over_after_a_stable_run(tmp_path):
+    """Test only consecutive crashes grow the restart delay"""
+    log_manager = LogManager(sink=tmp_path / "test.log")
+    pool = WorkerPool(
+        crash_once_worker,
+        {},
+        ["A"],
+        workers=1,
+        log_manager=log_manager,
+        restart_delay=1.0,
+        stable_after=60.0,
+    )
+    (name,) = pool.shards
+
+    class Crashed:
+        exitcode = 1
+
+        def is_alive(self):
+            return False
+
+    def crash(uptime):
+        pool._restart_at.clear()
+        pool._processes[name] = Crashed()
+        pool._started_at[name] = time.monotonic() - uptime
+        pool._stopping.set()  # Delays are computed without restarting.
+        pool._check_workers()
+        return pool._restart_at[name] - time.monotonic()
+
+    try:
+        assert crash(1.0) <= 1.0
+        assert 1.0 < crash(1.0) <= 2.0
+        assert 2.0 < crash(1.0) <= 4.0
+        assert crash(120.0) <= 1.0
+    finally:
+        log_manager.close()
@@ -0,0 +1,58 @@
+"""
+Tests for cryorithm/schemas/record.py
+"""
+
+import pickle
+
+import pytest
+
+from cryorithm.schemas.record import Projection, record_type
+
+
+def test_projection_types_and_drops_fields():
+    """Test only projected fields are kept, cast to their declared types"""
+    projection = Projection(
+        {"currentPrice": "float", "volume": "int", "shortName": "str"},
+        "StockRecord",
+    )
+    record = projection(
+        {"currentPrice": 101, "volume": "2500", "longBusinessSummary": "..."},
+    )
+
+    assert record.currentPrice == 101.0
+    assert isinstance(record.currentPrice, float)
+    assert record.volume == 2500
+    assert record.shortName is None
+    assert dict(record) == {"currentPrice": 101.0, "volume": 2500}
+    assert "shortName" not in record
+    assert record.get("shortName", "n/a") == "n/a"
+    assert not hasattr(record, "__dict__")
+
+
+def test_untyped_fields_and_bad_values():
+    """Test listed fields keep values as-is and uncastable values go missing"""
+    record = Projection(["beta", "sector"])({"beta": 1.2, "sector": ["x"]})
+    assert dict(record) == {"beta": 1.2, "sector": ["x"]}
+
+    record = Projection({"beta": "float"})({"beta": "n/a"})
+    assert len(record) == 0
+
+
+def test_records_share_classes_and_pickle():
+    """Test equal projections share one class and records survive pickling"""
+    a = Projection({"currentPrice": "float"}, "StockRecord")
+    b = Projection({"currentPrice": "float"}, "StockRecord")
+    assert a.record_type is b.record_type
+
+    record = a({"currentPrice": 3.5})
+    assert pickle.loads(pickle.dumps(record)) == record
+
+
+@pytest.mark.parametrize(
+    "pairs",
+    [(("not-a-name", "float"),), (("items", "float"),), (("price", "decimal"),)],
+)
+def test_invalid_projections(pairs):
+    """Test invalid field names and unknown types are rejected"""
+    with pytest.raises(ValueError):
+        record_type(pairs)
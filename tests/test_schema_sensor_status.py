@@ -0,0 +1,53 @@
+"""
+Tests for cryorithm/schemas/sensor_status.py
+"""
+
+import pytest
+
+from cryorithm.schemas import sensor_status
+from cryorithm.schemas.sensor_status import SchemaError, StatusCodec
+
+RECORD = {
+    "ticker": "DASH",
+    "keyframe": False,
+    "timestamp": 1700000000.5,
+    "changes": {"currentPrice": 131.2, "beta": float("nan")},
+    "removed": [],
+}
+
+
+@pytest.mark.parametrize(
+    "encoding",
+    [
+        "json",
+        pytest.param(
+            "msgpack",
+            marks=pytest.mark.skipif(
+                sensor_status.msgpack is None,
+                reason="msgpack is not installed",
+            ),
+        ),
+    ],
+)
+def test_round_trip(encoding):
+    """Test a delta record survives encoding and decoding"""
+    codec = StatusCodec(encoding)
+    payload = codec.encode(RECORD)
+    decoded = StatusCodec.decode(payload, headers=codec.headers)
+    assert decoded["ticker"] == "DASH"
+    assert decoded["timestamp"] == RECORD["timestamp"]
+    assert decoded["changes"]["currentPrice"] == 131.2
+
+
+def test_invalid_envelope_is_rejected():
+    """Test envelope validation happens at the encode edge"""
+    with pytest.raises(SchemaError):
+        StatusCodec().encode({**RECORD, "changes": "not a dict"})
+
+
+@pytest.mark.parametrize("version", [0, 99])
+def test_other_versions_are_rejected(version):
+    """Test messages from another schema version are refused"""
+    payload = b'{"schema":"cryorithm.sensor_status","v":%d,"type":"delta"}' % version
+    with pytest.raises(SchemaError, match="version"):
+        StatusCodec.decode(payload)
@@ -0,0 +1,180 @@
+"""
+Tests for cryorithm/sensors/stock/cache.py
+"""
+
+import asyncio
+
+import pytest
+
+from cryorithm.sensors.stock.cache import FetchCache, SQLiteFetchStore
+from cryorithm.sensors.stock.fundamentals import StockBatchSensor
+
+GROUPS = {
+    "quote": {"fields": ["currentPrice"], "ttl": 60, "stale": 240},
+    "profile": {"fields": ["shortName"], "ttl": 86400, "stale": 86400},
+}
+
+
+class Loader:
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return {"currentPrice": float(self.calls), "shortName": "DoorDash"}
+
+
+def _cache(now, **kwargs):
+    return FetchCache(field_groups=GROUPS, clock=lambda: now[0], **kwargs)
+
+
+def test_policy_uses_shortest_ttl_of_touched_groups():
+    """Test TTLs depend on the fields a caller uses"""
+    cache = FetchCache(field_groups=GROUPS, default_policy={"ttl": 900})
+    assert cache.policy(["shortName"]) == (86400, 86400)
+    assert cache.policy(["shortName", "currentPrice"]) == (60, 240)
+    assert cache.policy(["shortName", "beta"])[0] == 900
+    assert cache.policy()[0] == 60
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_upstream_call():
+    """Test single-flight collapses concurrent lookups of a ticker"""
+    now = [0.0]
+    cache = _cache(now)
+    loader = Loader(delay=0.01)
+
+    results = await asyncio.gather(*(cache.get("DASH", loader) for _ in range(10)))
+    assert loader.calls == 1
+    assert all(result is results[0] for result in results)
+
+    assert await cache.get("DASH", loader) is results[0]
+    assert cache.get_stats()["memory"] == 1
+    assert cache.get_stats()["miss"] == 10
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate():
+    """Test stale entries are served at once while a refresh runs"""
+    now = [0.0]
+    cache = _cache(now)
+    loader = Loader()
+    await cache.get("DASH", loader)
+
+    now[0] = 100.0
+    stale = await cache.get("DASH", loader, ["currentPrice"])
+    assert stale["currentPrice"] == 1.0
+    await cache.close()
+    fresh = await cache.get("DASH", loader, ["currentPrice"])
+    assert fresh["currentPrice"] == 2.0
+    assert loader.calls == 2
+
+    # Profile fields are still fresh after the quote TTL.
+    now[0] = 200.0
+    assert (await cache.get("DASH", loader, ["shortName"]))["shortName"]
+    assert loader.calls == 2
+
+    # Past the stale window, callers wait for the refresh.
+    now[0] = 1000.0
+    assert (await cache.get("DASH", loader))["currentPrice"] == 3.0
+
+
+@pytest.mark.asyncio
+async def test_scheduled_lookups_do_not_lag_a_tick():
+    """Test a per-minute schedule with a 60s TTL fetches fresh data each fire"""
+    now = [0.0]
+    cache = _cache(now)
+    calls = []
+
+    async def loader():
+        # Upstream latency; the entry is stamped when the request started.
+        calls.append(now[0])
+        now[0] += 2.0
+        return {"currentPrice": float(len(calls))}
+
+    prices = []
+    for fire in range(5):
+        # Fires land early or late of the cron time by jitter and latency.
+        now[0] = fire * 60.0 + (0.5 if fire % 2 else -0.5)
+        record = await cache.get("DASH", loader, ["currentPrice"], interval=60)
+        prices.append(record["currentPrice"])
+        # A second sensor reading the ticker at the same fire shares the fetch.
+        await cache.get("DASH", loader, ["currentPrice"], interval=60)
+
+    assert prices == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert len(calls) == 5
+    assert cache.get_stats()["stale"] == 0
+    assert cache.get_stats()["memory"] == 5
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_stale_entry():
+    """Test a failing background refresh keeps serving the stale entry"""
+    now = [0.0]
+    cache = _cache(now)
+    await cache.get("DASH", Loader())
+
+    now[0] = 100.0
+    assert (await cache.get("DASH", Loader(fail=True)))["currentPrice"] == 1.0
+    await cache.close()
+    assert cache.get_stats()["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_is_shared(tmp_path):
+    """Test a second cache, e.g. in another process, reads the stored fetch"""
+    now = [0.0]
+    path = tmp_path / "fetch.sqlite"
+    first = _cache(now, store=SQLiteFetchStore(path))
+    await first.get("DASH", Loader())
+    await first.close()
+
+    second = _cache(now, store=SQLiteFetchStore(path))
+    loader = Loader()
+    assert (await second.get("DASH", loader))["currentPrice"] == 1.0
+    assert loader.calls == 0
+    assert second.get_stats()["disk"] == 1
+    await second.close()
+
+
+@pytest.mark.asyncio
+async def test_batch_sensor_uses_cache():
+    """Test repeated batch fetches are answered from the cache"""
+    calls = []
+
+    def fetcher(ticker):
+        calls.append(ticker)
+        return {"currentPrice": 10.0}
+
+    sensor = StockBatchSensor(
+        ["A", "B"],
+        fetcher=fetcher,
+        fields={"currentPrice": "float"},
+        cache=FetchCache(field_groups=GROUPS),
+    )
+    try:
+        await sensor.fetch_data()
+        batch = await sensor.fetch_data()
+    finally:
+        sensor.close()
+
+    assert sorted(calls) == ["A", "B"]
+    assert dict(batch.results["B"]) == {"currentPrice": 10.0}
+
+
+@pytest.mark.asyncio
+async def test_only_kept_fields_are_cached(tmp_path):
+    """Test payloads are reduced to the kept fields in both tiers"""
+    store = SQLiteFetchStore(tmp_path / "fetch.sqlite")
+    cache = FetchCache(store, field_groups=GROUPS, fields={"currentPrice": "float"})
+    loader = Loader()
+    assert await cache.get("DASH", loader) == {"currentPrice": 1.0}
+    assert await cache.get("DASH", loader) == {"currentPrice": 1.0}
+    assert loader.calls == 1
+    assert store.get("DASH")[1] == {"currentPrice": 1.0}
+    await cache.close()
@@ -0,0 +1,105 @@
+"""
+Tests for cryorithm/sensors/stock/fundamentals.py
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from cryorithm.sensors.stock.fundamentals import StockBatchSensor, StockSensor
+
+
+class FakeFetcher:
+    """Blocking stand-in for yfinance that records peak concurrency."""
+
+    def __init__(self, delay=0.01, failing=()):
+        self.delay = delay
+        self.failing = set(failing)
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, ticker):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            if ticker in self.failing:
+                raise RuntimeError(f"upstream failure for {ticker}")
+            return {"symbol": ticker}
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+@pytest.mark.asyncio
+async def test_stock_sensor_uses_pluggable_fetcher():
+    """Test the single-ticker sensor calls the configured data source"""
+    sensor = StockSensor("DASH", fetcher=lambda ticker: {"symbol": ticker})
+    assert await sensor.fetch_data() == {"symbol": "DASH"}
+
+
+@pytest.mark.asyncio
+async def test_batch_sensor_bounds_concurrency():
+    """Test the batch sensor never exceeds max_concurrency in-flight fetches"""
+    fetcher = FakeFetcher()
+    tickers = [f"T{i}" for i in range(40)]
+    sensor = StockBatchSensor(tickers, max_concurrency=4, fetcher=fetcher)
+    try:
+        batch = await sensor.fetch_data()
+    finally:
+        sensor.close()
+
+    assert set(batch.results) == set(tickers)
+    assert not batch.errors
+    assert fetcher.peak <= 4
+
+
+@pytest.mark.asyncio
+async def test_batch_sensor_collects_per_ticker_errors():
+    """Test a failing ticker is reported without aborting the batch"""
+    fetcher = FakeFetcher(delay=0, failing={"BAD"})
+    sensor = StockBatchSensor(["GOOD", "BAD"], fetcher=fetcher)
+    try:
+        batch = await sensor.fetch_data()
+    finally:
+        sensor.close()
+
+    assert batch.results == {"GOOD": {"symbol": "GOOD"}}
+    assert isinstance(batch.errors["BAD"], RuntimeError)
+
+
+@pytest.mark.asyncio
+async def test_batch_sensor_accepts_coroutine_fetcher():
+    """Test coroutine fetchers are awaited directly"""
+
+    async def fetcher(ticker):
+        await asyncio.sleep(0)
+        return {"symbol": ticker}
+
+    sensor = StockBatchSensor(["A", "B"], fetcher=fetcher)
+    batch = await sensor.fetch_data()
+    assert batch.results == {"A": {"symbol": "A"}, "B": {"symbol": "B"}}
+
+
+@pytest.mark.asyncio
+async def test_batch_sensor_projects_fields():
+    """Test fetched payloads are reduced to the configured fields"""
+
+    def fetcher(ticker):
+        return {"symbol": ticker, "currentPrice": 10, "longBusinessSummary": "..."}
+
+    sensor = StockBatchSensor(
+        ["A"],
+        fetcher=fetcher,
+        fields={"symbol": "str", "currentPrice": "float"},
+    )
+    try:
+        batch = await sensor.fetch_data()
+    finally:
+        sensor.close()
+
+    assert dict(batch.results["A"]) == {"symbol": "A", "currentPrice": 10.0}
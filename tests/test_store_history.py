@@ -0,0 +1,145 @@
+"""
+Tests for cryorithm/stores/history.py
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from cryorithm.stores.history import HistoryStore
+
+DAY = 86400.0
+
+
+def test_query_projects_fields_over_time_range(tmp_path):
+    """Test a time-range query returns only the requested rows and fields"""
+    store = HistoryStore(tmp_path)
+    store.append_many(
+        [
+            ("DASH", 0 * DAY + 10, {"price": 100.0, "sector": "Tech"}),
+            ("DASH", 1 * DAY + 10, {"price": 101.0, "sector": "Tech"}),
+            ("DASH", 2 * DAY + 10, {"price": 102.0, "sector": "Tech"}),
+            ("AAPL", 1 * DAY + 20, {"price": 190.0, "sector": "Tech"}),
+        ],
+    )
+
+    result = store.query(["DASH", "AAPL"], start=DAY, end=3 * DAY, fields=["price"])
+    assert list(result) == ["ticker", "timestamp", "price"]
+    assert list(result["ticker"]) == ["DASH", "DASH", "AAPL"]
+    np.testing.assert_array_equal(result["price"], [101.0, 102.0, 190.0])
+
+
+def test_new_and_missing_fields_are_backfilled(tmp_path):
+    """Test fields appearing or disappearing between rows read back as missing"""
+    store = HistoryStore(tmp_path)
+    store.append("DASH", {"price": 100.0}, timestamp=10)
+    store.append("DASH", {"beta": 1.5, "name": "DoorDash"}, timestamp=20)
+
+    result = store.query(["DASH"])
+    assert np.isnan(result["price"][1])
+    assert np.isnan(result["beta"][0])
+    assert list(result["name"]) == [None, "DoorDash"]
+
+
+def test_numeric_column_is_widened_for_other_values(tmp_path):
+    """Test a non-numeric value in a numeric column is kept, not lost as NaN"""
+    store = HistoryStore(tmp_path)
+    store.append("DASH", {"price": 100.0}, timestamp=10)
+    store.append("DASH", {"beta": 1.5}, timestamp=20)
+    store.append("DASH", {"price": "n/a", "beta": True}, timestamp=30)
+    store.append("DASH", {"price": 101.0}, timestamp=40)
+
+    result = store.query(["DASH"])
+    assert list(result["price"]) == [100.0, None, "n/a", 101.0]
+    assert list(result["beta"]) == [None, 1.5, True, None]
+    partition = tmp_path / "DASH" / "1970-01-01"
+    assert sorted(p.name for p in partition.iterdir()) == [
+        "_schema.json",
+        "beta.jsonl",
+        "price.jsonl",
+        "timestamp.f8",
+    ]
+
+
+def test_append_syncs_once_before_committing(tmp_path, monkeypatch):
+    """Test every written file is synced once, before any schema is replaced"""
+    events = []
+    monkeypatch.setattr(
+        "cryorithm.stores.history._fsync",
+        lambda path: events.append(("fsync", path)),
+    )
+    real_replace = os.replace
+    monkeypatch.setattr(
+        "cryorithm.stores.history.os.replace",
+        lambda src, dst: events.append(("replace", dst)) or real_replace(src, dst),
+    )
+    store = HistoryStore(tmp_path)
+    store.append_many(
+        [(ticker, 0.0, {"price": 1.0, "name": ticker}) for ticker in ("A", "B")],
+    )
+
+    kinds = [kind for kind, _ in events]
+    first_replace = kinds.index("replace")
+    synced = [path for kind, path in events[:first_replace]]
+    assert len(synced) == len(set(synced))
+    for ticker in ("A", "B"):
+        partition = tmp_path / ticker / "1970-01-01"
+        assert {partition / name for name in ("price.f8", "name.jsonl")} <= set(
+            synced,
+        )
+        assert partition / "_schema.json.tmp" in synced
+    assert kinds[first_replace:] == ["replace"] * 2 + ["fsync"] * 2
+
+
+def test_partial_append_is_ignored_and_repaired(tmp_path):
+    """Test uncommitted trailing bytes are invisible and truncated on append"""
+    store = HistoryStore(tmp_path)
+    store.append("DASH", {"price": 100.0}, timestamp=10)
+    with (tmp_path / "DASH" / "1970-01-01" / "price.f8").open("ab") as f:
+        f.write(b"garbage!")
+
+    assert list(store.query(["DASH"])["price"]) == [100.0]
+    store.append("DASH", {"price": 101.0}, timestamp=20)
+    assert list(store.query(["DASH"])["price"]) == [100.0, 101.0]
+
+
+def test_iter_snapshots_reads_each_day_once(tmp_path, monkeypatch):
+    """Test windows are sliced from one read of each day partition"""
+    store = HistoryStore(tmp_path)
+    store.append_many(
+        [
+            ("DASH", 7200.0, {"price": 102.0}),
+            ("DASH", 10.0, {"price": 100.0}),
+            ("AAPL", 3700.0, {"price": 190.0}),
+            ("DASH", DAY + 10, {"price": 103.0}),
+        ],
+    )
+    reads = []
+    query_partition = store._query_partition
+    monkeypatch.setattr(
+        store,
+        "_query_partition",
+        lambda partition, *args: reads.append(partition)
+        or query_partition(partition, *args),
+    )
+
+    snapshots = list(store.iter_snapshots(start=5.0, window=60))
+    assert [(ts, ticker) for ts, ticker, _ in snapshots] == [
+        (10.0, "DASH"),
+        (3700.0, "AAPL"),
+        (7200.0, "DASH"),
+        (DAY + 10, "DASH"),
+    ]
+    assert len(reads) == len(set(reads)) == 3
+
+
+@pytest.mark.parametrize("ticker", ["../escape", "/tmp/escape", "..", "", "A/B"])
+def test_invalid_tickers_are_rejected(tmp_path, ticker):
+    """Test tickers that are not plain symbols never become paths"""
+    history = HistoryStore(tmp_path / "history")
+    with pytest.raises(ValueError, match="Invalid ticker"):
+        history.append_many([("DASH", 0.0, {"a": 1.0}), (ticker, 0.0, {"a": 1.0})])
+    assert list(tmp_path.iterdir()) == [tmp_path / "history"]
+    assert history.tickers() == []
+    assert history.query([ticker])["timestamp"].size == 0
@@ -0,0 +1,161 @@
+"""
+Tests for cryorithm/stores/spool.py
+"""
+
+import os
+
+import pytest
+
+from cryorithm.bench.fakes import FakeProducer
+from cryorithm.clients.kafka import (
+    DEDUP_HEADER,
+    KafkaProducerClient,
+    SpoolDrainer,
+    send_to_kafka,
+)
+from cryorithm.stores.spool import Spool
+
+
+class FlakyProducer(FakeProducer):
+    """Fake producer whose deliveries fail while `down` is set."""
+
+    down = True
+    dedup_keys = []
+
+    def produce(self, topic, value=None, key=None, headers=None, on_delivery=None):
+        self.dedup_keys.append(dict(headers)[DEDUP_HEADER])
+        super().produce(topic, value, key, headers, on_delivery)
+
+    def poll(self, timeout=None):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for value, on_delivery in pending:
+            on_delivery("broker down" if self.down else None, value)
+        return len(pending)
+
+
+def _crash(spool):
+    """Drops a spool's files without sealing, as a killed process would."""
+    spool._file.close()
+    spool._lock_file.close()
+
+
+@pytest.mark.asyncio
+async def test_spool_survives_restart_and_rotates(tmp_path):
+    """Test appended records are durable, rotated by size and recovered"""
+    spool = Spool(tmp_path, segment_bytes=200)
+    for i in range(10):
+        await spool.append("DASH", f"record-{i}".encode(), [("h", b"v")])
+
+    # A new instance seals the segment left open by the previous one.
+    _crash(spool)
+    reopened = Spool(tmp_path, segment_bytes=200)
+    assert len(reopened.sealed_segments()) > 1
+    records = []
+    while batch := reopened.read(max_records=3):
+        records.extend(batch)
+        reopened.ack(batch[-1])
+    assert [r.value for r in records] == [f"record-{i}".encode() for i in range(10)]
+    assert records[0].key == b"DASH"
+    assert records[0].headers == [("h", b"v")]
+    assert reopened.sealed_segments() == []
+
+
+def test_torn_tail_is_skipped(tmp_path):
+    """Test a partially written final frame is ignored on recovery"""
+    spool = Spool(tmp_path)
+    spool.write(None, b"complete")
+    spool.sync()
+    with open(next(tmp_path.glob("*.open")), "ab") as f:
+        f.write(b"\x00\x00\x00\x20torn")
+
+    _crash(spool)
+    records = Spool(tmp_path).read()
+    assert [r.value for r in records] == [b"complete"]
+
+
+@pytest.mark.asyncio
+async def test_drainer_is_at_least_once_with_dedup_keys(tmp_path):
+    """Test failed deliveries stay spooled and are re-sent with the same key"""
+    FlakyProducer.down = True
+    FlakyProducer.dedup_keys = []
+    spool = Spool(tmp_path)
+    for i in range(5):
+        spool.write("DASH", f"record-{i}".encode())
+    spool.roll(force=True)
+
+    producer = KafkaProducerClient(
+        "localhost", "signals", producer_factory=FlakyProducer
+    )
+    drainer = SpoolDrainer(spool, producer, node_id="node-a")
+    async with producer:
+        with pytest.raises(Exception):
+            await drainer.drain_once()
+        assert len(spool.read()) == 5
+
+        FlakyProducer.down = False
+        assert await drainer.drain_once() == 5
+    assert spool.read() == []
+    assert drainer.drained == 5
+    first, retried = FlakyProducer.dedup_keys[:5], FlakyProducer.dedup_keys[5:]
+    assert first == retried
+    assert len(set(first)) == 5
+
+
+def test_spool_directory_is_not_shared(tmp_path):
+    """Test a second spool on a directory in use is refused until closed"""
+    spool = Spool(tmp_path)
+    with pytest.raises(RuntimeError, match="in use"):
+        Spool(tmp_path)
+    spool.close()
+    Spool(tmp_path).close()
+
+
+@pytest.mark.asyncio
+async def test_spooled_records_keep_their_key(tmp_path):
+    """Test send_to_kafka keys spooled records by ticker"""
+    spool = Spool(tmp_path)
+    record = {
+        "ticker": "DASH",
+        "timestamp": 0.0,
+        "keyframe": True,
+        "changes": {"price": 1.0},
+        "removed": [],
+    }
+    await send_to_kafka(record, {}, spool=spool)
+    spool.roll(force=True)
+    assert [r.key for r in spool.read()] == [b"DASH"]
+
+
+@pytest.mark.asyncio
+async def test_backlog_skips_segments_sealed_meanwhile(tmp_path, monkeypatch):
+    """Test a segment renamed during a backlog update is skipped"""
+    spool = Spool(tmp_path)
+    await spool.append("DASH", b"record", [])
+    segments = spool._segments
+
+    def with_vanished(include_open=False):
+        return [*segments(include_open), (10**6, "open")]
+
+    monkeypatch.setattr(spool, "_segments", with_vanished)
+    spool._update_backlog()
+    spool.close()
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_is_synced_before_it_replaces(tmp_path, monkeypatch):
+    """Test the checkpoint temp file is fsynced before it is renamed"""
+    spool = Spool(tmp_path)
+    await spool.append("DASH", b"record", [])
+    spool.roll(force=True)
+    calls = []
+    fsync, replace = os.fsync, os.replace
+    monkeypatch.setattr(os, "fsync", lambda fd: calls.append("fsync") or fsync(fd))
+    monkeypatch.setattr(
+        os,
+        "replace",
+        lambda src, dst: calls.append("replace") or replace(src, dst),
+    )
+    spool.ack(spool.read()[-1])
+    assert calls == ["fsync", "replace"]
+    spool.close()
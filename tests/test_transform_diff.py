@@ -0,0 +1,73 @@
+"""
+Tests for cryorithm/transforms/diff.py
+"""
+
+import pytest
+
+from cryorithm.transforms.diff import SnapshotDiffer
+
+NAN = float("nan")
+INF = float("inf")
+
+
+def test_first_snapshot_is_keyframe():
+    """Test the first snapshot of a ticker is emitted in full"""
+    differ = SnapshotDiffer()
+    delta = differ.diff("DASH", {"price": 100.0, "name": "DoorDash"})
+    assert delta.keyframe
+    assert delta.changes == {"price": 100.0, "name": "DoorDash"}
+
+
+def test_unchanged_and_tolerated_fields_are_dropped():
+    """Test moves within tolerance and ignored fields produce no delta"""
+    differ = SnapshotDiffer(rel_tolerance=0.01, ignore_fields={"fetchedAt"})
+    differ.diff("DASH", {"price": 100.0, "fetchedAt": 1})
+
+    assert not differ.diff("DASH", {"price": 100.5, "fetchedAt": 2})
+    delta = differ.diff("DASH", {"price": 101.5, "beta": 1.2, "fetchedAt": 3})
+    assert delta.changes == {"price": 101.5, "beta": 1.2}
+
+
+def test_drift_accumulates_and_removed_fields_reported():
+    """Test sub-tolerance drift is reported once it exceeds the tolerance"""
+    differ = SnapshotDiffer(abs_tolerance=1.0)
+    differ.diff("DASH", {"price": 100.0, "beta": 1.2})
+
+    assert not differ.diff("DASH", {"price": 100.6, "beta": 1.2})
+    delta = differ.diff("DASH", {"price": 101.2})
+    assert delta.changes == {"price": 101.2}
+    assert delta.removed == ["beta"]
+
+
+def test_keyframe_interval():
+    """Test a full keyframe is re-sent once the interval has elapsed"""
+    now = [0.0]
+    differ = SnapshotDiffer(keyframe_interval=60, clock=lambda: now[0])
+    differ.diff("DASH", {"price": 100.0})
+
+    now[0] = 30.0
+    assert not differ.diff("DASH", {"price": 100.0})
+    now[0] = 61.0
+    delta = differ.diff("DASH", {"price": 100.0})
+    assert delta.keyframe
+    assert delta.changes == {"price": 100.0}
+
+
+@pytest.mark.parametrize(
+    "old, new, changed",
+    [
+        (NAN, 100.0, True),
+        (100.0, NAN, True),
+        (INF, 100.0, True),
+        (100.0, INF, True),
+        (INF, -INF, True),
+        (NAN, INF, True),
+        (NAN, NAN, False),
+        (INF, INF, False),
+    ],
+)
+def test_non_finite_transitions(old, new, changed):
+    """Test NaN and infinity transitions are changes whatever the tolerance"""
+    differ = SnapshotDiffer(abs_tolerance=1.0, rel_tolerance=0.5)
+    differ.diff("DASH", {"price": old})
+    assert bool(differ.diff("DASH", {"price": new})) is changed